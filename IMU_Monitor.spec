@@ -10,7 +10,8 @@ a = Analysis(
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    # Не используются приложением — меньше архив и быстрее распаковка onefile
+    excludes=['tkinter', 'setuptools', 'distutils', 'pkg_resources'],
     noarchive=False,
     optimize=0,
 )
@@ -0,0 +1,80 @@
+"""Проверка и бенчмарк фильтров ориентации на синтетическом движении.
+
+Трасса строится synthetic_motion (известные углы + шум), фильтр получает
+её блоками TIMED_DTYPE с метками времени, как из DataReader. Печатается
+СКО ошибки углов после установления и пропускная способность.
+
+Запуск: python benchmarks/bench_attitude.py [--duration 30] [--rate 1000] [--block 20]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from imu.attitude import ComplementaryFilter, MadgwickFilter  # noqa: E402
+from imu.decoder import TIMED_DTYPE  # noqa: E402
+from imu.sources import synthetic_attitude, synthetic_motion  # noqa: E402
+
+
+def make_trace(duration, rate, noise, jitter, seed=0):
+    """Блок TIMED_DTYPE и эталонные углы (градусы) на тех же отсчётах"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(duration * rate)) / rate
+    if jitter:
+        # Неравномерный шаг: метки времени сдвинуты, но монотонны
+        t = np.maximum.accumulate(t + rng.uniform(0, jitter / rate, len(t)))
+    samples = synthetic_motion(t, noise, rng)
+    trace = np.empty(len(t), dtype=TIMED_DTYPE)
+    trace['t'] = t
+    for name in samples.dtype.names:
+        trace[name] = samples[name]
+    return trace, [np.degrees(a) for a in synthetic_attitude(t)]
+
+
+def run(estimator, trace, block):
+    out = []
+    t0 = time.perf_counter()
+    for start in range(0, len(trace), block):
+        out.append(estimator.update_block(trace[start:start + block]))
+    elapsed = time.perf_counter() - t0
+    return np.concatenate(out), elapsed
+
+
+def rms(error):
+    return float(np.sqrt(np.mean(error ** 2)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--duration', type=float, default=30.0)
+    parser.add_argument('--rate', type=float, default=1000.0)
+    parser.add_argument('--block', type=int, default=20, help="отсчётов в блоке")
+    parser.add_argument('--noise', type=float, default=0.02)
+    parser.add_argument('--jitter', type=float, default=0.5,
+                        help="разброс меток времени, доля периода")
+    parser.add_argument('--settle', type=float, default=5.0,
+                        help="секунд в начале, не входящих в ошибку")
+    args = parser.parse_args()
+
+    trace, truth = make_trace(args.duration, args.rate, args.noise, args.jitter)
+    settled = trace['t'] >= args.settle
+    filters = [
+        ("комплементарный", ComplementaryFilter()),
+        ("комплементарный tau=0.5", ComplementaryFilter(tau=0.5)),
+        ("Маджвик beta=0.05", MadgwickFilter(beta=0.05)),
+    ]
+    print(f"{len(trace)} отсчётов, блоки по {args.block}, шум {args.noise}")
+    for name, estimator in filters:
+        att, elapsed = run(estimator, trace, args.block)
+        errors = [rms(att[axis][settled] - ref[settled])
+                  for axis, ref in zip(('roll', 'pitch', 'yaw'), truth)]
+        print(f"{name:26s} СКО roll {errors[0]:6.3f}°, pitch {errors[1]:6.3f}°, "
+              f"yaw {errors[2]:6.3f}° — {len(trace) / elapsed:,.0f} отсчётов/с")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""Поведение очередей потребителей при остановке потребителя.
+
+Поток чтения выдаёт отсчёты генератора без задержек; потребитель
+«дисплея» забирает пачки из своей очереди, но посередине прогона на
+--stall секунд замирает (как GUI-поток с открытым QFileDialog).
+Одновременно всё пишется Recorder (очередь без потерь). Для каждой
+политики печатается пик очереди, потери и сколько записей дошло до файла.
+
+Запуск: python benchmarks/bench_backpressure.py [--packets N] [--stall S] [--capacity N]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from imu.blockqueue import BlockQueue  # noqa: E402
+from imu.decoder import TIMED_DTYPE  # noqa: E402
+from imu.reader import DataReader  # noqa: E402
+from imu.recording import Recorder, Recording  # noqa: E402
+from imu.sources import SyntheticSource  # noqa: E402
+
+
+def run(policy, capacity, packets, stall, workdir):
+    path = os.path.join(workdir, f"{policy}.imurec")
+    reader = DataReader(batch_interval=0.005)
+    reader.recorder = Recorder(path)
+    queue = reader.add_consumer(BlockQueue(capacity, policy), 'display')
+    received = {'samples': 0}
+    done = threading.Event()
+
+    def consume():
+        stalled = False
+        while not (done.is_set() and not len(queue)):
+            for block, _ in queue.get_all(timeout=0.01):
+                received['samples'] += len(block)
+            if not stalled and reader.stats.packets >= packets // 3:
+                stalled = True
+                time.sleep(stall)
+
+    consumer = threading.Thread(target=consume, daemon=True)
+    consumer.start()
+    t0 = time.perf_counter()
+    reader.start_source(SyntheticSource(speed=None, duration=packets / 1000.0))
+    reader.thread.join()
+    elapsed = time.perf_counter() - t0
+    done.set()
+    consumer.join()
+    reader.recorder.close()
+    written = len(Recording(path))
+    counters = queue.counters()
+    return {
+        'elapsed': elapsed,
+        'received': received['samples'],
+        'peak_mb': counters['high_water'] * TIMED_DTYPE.itemsize / 2**20,
+        'dropped': counters['dropped_samples'],
+        'blocked': counters['blocked_s'],
+        'recorded': written,
+        'packets': reader.stats.packets,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--packets', type=int, default=300_000)
+    parser.add_argument('--stall', type=float, default=1.0, help="пауза потребителя, с")
+    parser.add_argument('--capacity', type=int, default=20_000, help="ёмкость очереди, отсчётов")
+    args = parser.parse_args()
+
+    print(f"{'политика':>12} {'время, с':>9} {'получено':>9} {'потери':>8} "
+          f"{'пик, МБ':>8} {'ожидание, с':>12} {'в файле':>9}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for policy, capacity in (('drop_oldest', args.capacity), ('drop_newest', args.capacity),
+                                 ('block', args.capacity), ('без границы', 10**12)):
+            r = run('drop_oldest' if capacity == 10**12 else policy, capacity,
+                    args.packets, args.stall, workdir)
+            lossless = "да" if r['recorded'] == r['packets'] else "НЕТ"
+            print(f"{policy:>12} {r['elapsed']:>9.2f} {r['received']:>9} {r['dropped']:>8} "
+                  f"{r['peak_mb']:>8.2f} {r['blocked']:>12.2f} {r['recorded']:>9} ({lossless})",
+                  flush=True)
+
+
+if __name__ == '__main__':
+    main()
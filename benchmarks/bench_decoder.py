@@ -0,0 +1,146 @@
+"""Бенчмарк пропускной способности декодера (байт/с).
+
+Сравнивает прежний побайтовый разбор из SerialDataReader._read_loop
+с пакетным PacketDecoder на одном и том же потоке байт, затем — разбор
+по каждой схеме из imu.protocols с заданной схемой и с выбором схемы
+по потоку ('auto').
+
+Запуск: python benchmarks/bench_decoder.py [--packets N] [--chunk BYTES]
+"""
+import argparse
+import os
+import struct
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from imu.decoder import PacketDecoder, SAMPLE_DTYPE, encode_packets  # noqa: E402
+from imu.protocols import PROTOCOLS, make_decoder  # noqa: E402
+
+
+def legacy_parse_packet(data):
+    """Копия прежнего SerialDataReader._parse_packet"""
+    if len(data) != 34:
+        return None
+    if data[0] != 0xBD or data[1] != 0xDB or data[2] != 0x0A:
+        return None
+
+    checksum = 0
+    for i in range(33):
+        checksum ^= data[i]
+    if checksum != data[33]:
+        return None
+
+    gx = struct.unpack('<f', data[3:7])[0]
+    gy = struct.unpack('<f', data[7:11])[0]
+    gz = struct.unpack('<f', data[11:15])[0]
+    ax = struct.unpack('<f', data[15:19])[0]
+    ay = struct.unpack('<f', data[19:23])[0]
+    az = struct.unpack('<f', data[23:27])[0]
+    return {'gx': gx, 'gy': gy, 'gz': gz, 'ax': ax, 'ay': ay, 'az': az}
+
+
+def legacy_decode(stream, chunk_size):
+    """Прежний цикл разбора буфера, кусками по chunk_size байт"""
+    buffer = bytearray()
+    out = []
+    for start in range(0, len(stream), chunk_size):
+        buffer.extend(stream[start:start + chunk_size])
+        while len(buffer) >= 34:
+            if buffer[0] == 0xBD and buffer[1] == 0xDB and buffer[2] == 0x0A:
+                packet = buffer[:34]
+                buffer = buffer[34:]
+                data = legacy_parse_packet(packet)
+                if data:
+                    out.append(data)
+            else:
+                buffer.pop(0)
+    return out
+
+
+def batch_decode(stream, chunk_size):
+    decoder = PacketDecoder()
+    blocks = [decoder.feed(stream[start:start + chunk_size])
+              for start in range(0, len(stream), chunk_size)]
+    return np.concatenate(blocks)
+
+
+def make_stream(n_packets, noise_every=1000, seed=0, schema=None):
+    """Поток корректных кадров с редкими вставками мусора и битыми суммами"""
+    rng = np.random.default_rng(seed)
+    dtype = SAMPLE_DTYPE if schema is None else schema.sample_dtype
+    samples = np.zeros(n_packets, dtype=dtype)
+    for name in dtype.names:
+        samples[name] = rng.normal(0, 5, n_packets)
+    frames = bytearray(encode_packets(samples) if schema is None else schema.encode(samples))
+    size = len(frames) // n_packets
+    out = bytearray()
+    for i in range(n_packets):
+        frame = frames[i * size:(i + 1) * size]
+        if noise_every and i % noise_every == noise_every - 1:
+            out.extend(rng.integers(0, 256, 7, dtype=np.uint8).tobytes())
+            frame[size - 1] ^= 0xFF
+        out.extend(frame)
+    return bytes(out)
+
+
+def schema_decode(protocol):
+    def decode(stream, chunk_size):
+        decoder = make_decoder(protocol)
+        blocks = [decoder.feed(stream[start:start + chunk_size])
+                  for start in range(0, len(stream), chunk_size)]
+        return decoder, np.concatenate([block for block in blocks if len(block)])
+    return decode
+
+
+def measure(func, stream, chunk_size, repeat):
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = func(stream, chunk_size)
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--packets', type=int, default=50000)
+    parser.add_argument('--chunk', type=int, default=4096)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    stream = make_stream(args.packets)
+    t_legacy, legacy = measure(legacy_decode, stream, args.chunk, args.repeat)
+    t_batch, batch = measure(batch_decode, stream, args.chunk, args.repeat)
+
+    if len(legacy) != len(batch):
+        raise SystemExit(f"Расхождение: {len(legacy)} vs {len(batch)} отсчётов")
+    for name in SAMPLE_DTYPE.names:
+        ref = np.array([d[name] for d in legacy], dtype=np.float32)
+        if not np.array_equal(ref, batch[name]):
+            raise SystemExit(f"Расхождение в канале {name}")
+
+    size = len(stream)
+    print(f"Поток: {size} байт, {len(batch)} отсчётов, кусок {args.chunk} байт")
+    print(f"legacy: {size / t_legacy / 1e6:8.2f} МБ/с ({t_legacy * 1e3:.1f} мс)")
+    print(f"batch:  {size / t_batch / 1e6:8.2f} МБ/с ({t_batch * 1e3:.1f} мс)")
+    print(f"ускорение: x{t_legacy / t_batch:.1f}")
+    print(f"921600 бод ≈ {921600 / 10 / 1e6:.3f} МБ/с")
+
+    print(f"{'схема':>10} {'байт':>6} {'задана, МБ/с':>13} {'auto, МБ/с':>11} {'выбрана':>10}")
+    for name, schema in PROTOCOLS.items():
+        stream = make_stream(args.packets, schema=schema)
+        t_fixed, (_, fixed) = measure(schema_decode(name), stream, args.chunk, args.repeat)
+        t_auto, (decoder, auto) = measure(schema_decode('auto'), stream, args.chunk, args.repeat)
+        if len(fixed) != len(auto):
+            raise SystemExit(f"{name}: auto потерял кадры ({len(auto)} из {len(fixed)})")
+        print(f"{name:>10} {schema.size:>6} {len(stream) / t_fixed / 1e6:13.2f} "
+              f"{len(stream) / t_auto / 1e6:11.2f} {decoder.schema.name:>10}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,530 @@
+"""Сквозной бенчмарк «порт → пиксель» с машиночитаемым результатом.
+
+Без оборудования: байты кадров идут из памяти (--source memory) или через
+пару псевдотерминалов (--source pty, только POSIX; пишет дочерний
+процесс, читает SerialSource), с темпом не выше --rate кадров/с и
+--baud бод (10 бит на байт); --unpaced — без задержек. Этапы:
+
+  decode   — PacketDecoder.feed на потоке в памяти кусками --chunk
+  read     — поток чтения DataReader (_read_loop) с источником: отсчётов/с,
+             CPU, время декодирования, ошибки
+  store    — Device.extend пачками, как из потока чтения
+  plots    — update_plots и autoscale_charts окна с --points точками
+  horizon  — HorizonWidget.paintEvent (repaint)
+  live     — окно и поток чтения --duration с: кадров/с, время кадра,
+             задержка «приход отсчёта → кадр GUI»
+
+После каждого этапа записывается пиковый RSS процесса. Qt — offscreen.
+Результат — JSON (--json FILE, «-» — stdout); --compare BASE.json
+сравнивает с прошлым прогоном и завершается с кодом 1, если метрика
+ухудшилась больше чем на --tolerance (сравниваются среднее, медиана и
+скорости; хвосты p95/p99/max только печатаются). --profile DIR пишет профиль
+cProfile каждого этапа (DIR/этап.prof, см. imu.profiling), --py-spy —
+ещё и py-spy record живого этапа, если py-spy установлен.
+
+Запуск: python benchmarks/bench_e2e.py [--source memory|pty] [--rate 1000] [--baud 921600]
+        [--stages decode read ...] [--json result.json] [--compare base.json]
+"""
+import argparse
+import datetime
+import json
+import multiprocessing
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from imu.decoder import TIMED_DTYPE, PacketDecoder, encode_packets  # noqa: E402
+from imu.devices import Device  # noqa: E402
+from imu.profiling import SessionProfiler  # noqa: E402
+from imu.reader import DataReader  # noqa: E402
+from imu.sources import PacedSource, SerialSource, synthetic_motion  # noqa: E402
+
+STAGES = ('decode', 'read', 'store', 'plots', 'horizon', 'live')
+GUI_STAGES = ('plots', 'horizon', 'live')
+
+# Направление метрик для --compare: по окончанию имени. Хвосты (p95, p99,
+# max) печатаются, но не сравниваются — на общей машине они шумят
+HIGHER_IS_BETTER = ('_per_s', '_fps')
+LOWER_IS_BETTER = ('_ms', '_us', '_mb', '_percent')
+TAILS = ('_p95_', '_p99_', '_max_')
+
+WARMUP_FRAMES = 5  # первые кадры plots и horizon (кэши, шрифты) не учитываются
+
+
+def make_stream(packets, rate, seed=0):
+    """Байты packets кадров покачивания с частотой rate"""
+    rng = np.random.default_rng(seed)
+    return encode_packets(synthetic_motion(np.arange(packets) / rate, 0.02, rng))
+
+
+class StreamSource(PacedSource):
+    """Поток байт из памяти не быстрее rate кадров/с и baud_rate бод"""
+
+    name = "память"
+
+    def __init__(self, data, rate, baud_rate, speed=1.0, frame_size=34, chunk_bytes=4096):
+        super().__init__(speed, chunk_bytes)
+        self.data = data
+        self.frame_rate = rate
+        self.byte_rate = baud_rate / 10.0
+        self.frame_size = frame_size
+
+    def _count(self):
+        return len(self.data)
+
+    def _due(self, stream_time):
+        frames = (int(stream_time * self.frame_rate) + 1) * self.frame_size
+        return min(int(stream_time * self.byte_rate) + 1, frames)
+
+    def _unit_time(self, i):
+        return max(i / self.byte_rate, (i // self.frame_size) / self.frame_rate)
+
+    def _take(self, i, j):
+        return self.data[i:j]
+
+
+def _write_pty(fd, data, rate, baud_rate, unpaced):
+    """Писатель pty: тот же темп, что у StreamSource"""
+    source = StreamSource(data, rate, baud_rate, speed=None if unpaced else 1.0)
+    source.open()
+    while True:
+        chunk = source.read_chunk()
+        if chunk is None:
+            break
+        view = memoryview(chunk)
+        while view:
+            view = view[os.write(fd, view):]
+
+
+class PtyLink:
+    """Пара pty: дочерний процесс пишет поток в ведущий конец,
+    source — SerialSource на ведомом"""
+
+    def __init__(self, data, rate, baud_rate, unpaced, chunk_size):
+        import pty
+        import tty
+
+        self.master, self.slave = pty.openpty()
+        tty.setraw(self.master)
+        tty.setraw(self.slave)
+        self.source = SerialSource(os.ttyname(self.slave), baud_rate, timeout=0.2,
+                                   chunk_size=chunk_size)
+        self.writer = multiprocessing.get_context('fork').Process(
+            target=_write_pty, args=(self.master, data, rate, baud_rate, unpaced), daemon=True)
+
+    def start(self):
+        self.writer.start()
+
+    def close(self):
+        if self.writer.is_alive():
+            self.writer.terminate()
+        self.writer.join(timeout=1)
+        os.close(self.master)
+        os.close(self.slave)
+
+
+def open_link(args, data):
+    """(источник, старт писателя, закрытие) по --source"""
+    if args.source == 'pty':
+        link = PtyLink(data, args.rate, args.baud, args.unpaced, args.chunk_size)
+        return link.source, link.start, link.close
+    source = StreamSource(data, args.rate, args.baud, speed=None if args.unpaced else 1.0,
+                          chunk_bytes=args.chunk)
+    return source, lambda: None, lambda: None
+
+
+def stream_packets(args):
+    """Сколько кадров посылать в этапах read и live"""
+    if args.unpaced:
+        return args.packets
+    link_rate = args.baud / 10.0 / 34
+    return int(min(args.rate, link_rate) * args.duration)
+
+
+def cpu_time():
+    return time.process_time()
+
+
+def peak_rss_mb():
+    """Пиковый RSS процесса, МБ (None — нет модуля resource)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux — килобайты, macOS — байты
+    return round(peak / (1 << 20 if sys.platform == 'darwin' else 1 << 10), 1)
+
+
+class Samples:
+    """Времена (с) с точными процентилями — корзины imu.stats.Histogram
+    (~26 %) грубее допуска --compare. Подменяет Histogram окна
+    (record/reset/summary)."""
+
+    def __init__(self):
+        self.values = []
+
+    def record(self, value):
+        self.values.append(value)
+
+    def reset(self):
+        self.values.clear()
+
+    def summary(self, scale=1.0, digits=3):
+        values = np.asarray(self.values) * scale
+        if not len(values):
+            return {'count': 0, 'mean': None, 'p50': None, 'p95': None, 'p99': None, 'max': None}
+        p50, p95, p99 = np.percentile(values, [50, 95, 99])
+        return {'count': len(values), 'mean': round(float(values.mean()), digits),
+                'p50': round(float(p50), digits), 'p95': round(float(p95), digits),
+                'p99': round(float(p99), digits), 'max': round(float(values.max()), digits)}
+
+    def metrics(self, prefix, unit='ms'):
+        """Плоские поля prefix_p50_ms и т. д."""
+        summary = self.summary(scale=1e3 if unit == 'ms' else 1e6)
+        return {f"{prefix}_{key}_{unit}": summary[key] for key in ('mean', 'p50', 'p95', 'p99', 'max')}
+
+
+def stage_decode(args, context):
+    data = make_stream(args.packets, args.rate)
+    decoder = PacketDecoder()
+    t0 = time.perf_counter()
+    decoded = 0
+    for start in range(0, len(data), args.chunk):
+        decoded += len(decoder.feed(data[start:start + args.chunk]))
+    elapsed = time.perf_counter() - t0
+    return {
+        'packets': decoded,
+        'decode_mb_per_s': round(len(data) / elapsed / 1e6, 2),
+        'decode_packets_per_s': round(decoded / elapsed),
+    }
+
+
+def stage_read(args, context):
+    packets = stream_packets(args)
+    source, start_writer, close = open_link(args, make_stream(packets, args.rate))
+    received = {'samples': 0}
+
+    def on_block(block):
+        received['samples'] += len(block)
+
+    reader = DataReader(on_block=on_block)
+    reader.profiler = context['profiler']
+    try:
+        result = reader.start_source(source)
+        if result is not True:
+            raise OSError(result[1])
+        cpu0, t0 = cpu_time(), time.perf_counter()
+        start_writer()
+        deadline = t0 + (packets / args.rate if not args.unpaced else 0) + args.timeout
+        while received['samples'] < packets and time.perf_counter() < deadline and reader.thread.is_alive():
+            time.sleep(0.01)
+        elapsed = time.perf_counter() - t0
+        cpu = cpu_time() - cpu0
+        report = reader.stats.report()
+    finally:
+        reader.stop_reading()
+        close()
+    return {
+        'source': args.source,
+        'packets_sent': packets,
+        'packets_received': received['samples'],
+        'read_packets_per_s': round(received['samples'] / elapsed),
+        'read_mb_per_s': round(report['bytes'] / elapsed / 1e6, 3),
+        # В режиме memory в CPU входит и выдача байт источником
+        'read_cpu_percent': round(cpu / elapsed * 100, 1),
+        'decode_p50_us': report['decode_us']['p50'],
+        'decode_p99_us': report['decode_us']['p99'],
+        'checksum_errors': report['checksum_errors'],
+        'resync_bytes': report['resync_bytes'],
+        'rate_hz': report['rate_hz'],
+        'jitter_ms': report['jitter_ms'],
+    }
+
+
+def make_block(n, t0=0.0, rate=1000.0, seed=0):
+    rng = np.random.default_rng(seed)
+    block = np.zeros(n, dtype=TIMED_DTYPE)
+    block['t'] = t0 + np.arange(n) / rate
+    samples = synthetic_motion(block['t'], 0.02, rng)
+    for name in samples.dtype.names:
+        block[name] = samples[name]
+    return block
+
+
+def stage_store(args, context):
+    batch = max(int(args.rate * 0.02), 1)  # пачка DataReader за batch_interval=0.02
+    device = Device("bench", capacity=100_000, window=args.points)
+    blocks = [make_block(batch, k * batch / args.rate, args.rate, k) for k in range(64)]
+    timing = Samples()
+    total = 0
+    t0 = time.perf_counter()
+    for k in range(args.store_batches):
+        block = blocks[k % len(blocks)]
+        start = time.perf_counter()
+        device.extend(block)
+        timing.record(time.perf_counter() - start)
+        total += len(block)
+    elapsed = time.perf_counter() - t0
+    return {
+        'batch': batch,
+        **timing.metrics('extend', 'us'),
+        'extend_samples_per_s': round(total / elapsed),
+    }
+
+
+def make_window(context, points):
+    from imu import gui
+    window = gui.RIM1AMonitorApp(plot_backend='software')
+    window.resize(1280, 900)
+    window.show()
+    window.max_points = points
+    window.store.capacity = max(points, window.store.capacity)
+    window.store.set_window(points)
+    context['app'].processEvents()
+    return window
+
+
+def stage_plots(args, context):
+    app = context['app']
+    window = make_window(context, args.points)
+    device = window.store[window.register_device("bench")]
+    device.extend(make_block(args.points))
+    autoscale, update, frame = Samples(), Samples(), Samples()
+    indices = window.plotted_devices()
+    for k in range(WARMUP_FRAMES + args.frames):
+        # Новая пачка за кадр — как при живом чтении
+        device.extend(make_block(50, (args.points + 50 * k) / 1000.0, seed=k))
+        t0 = time.perf_counter()
+        window.autoscale_charts(indices)
+        t1 = time.perf_counter()
+        window.update_plots()  # сам снова вызывает autoscale_charts — уже без изменений
+        t2 = time.perf_counter()
+        window.chart_view_gyro.viewport().repaint()
+        window.chart_view_acc.viewport().repaint()
+        app.processEvents()
+        t3 = time.perf_counter()
+        if k >= WARMUP_FRAMES:
+            autoscale.record(t1 - t0)
+            update.record(t2 - t1)
+            frame.record(t3 - t1)
+    window.close()
+    return {'points': args.points, **autoscale.metrics('autoscale_charts'),
+            **update.metrics('update_plots'), **frame.metrics('frame')}
+
+
+def stage_horizon(args, context):
+    from imu.gui import HorizonWidget
+    app = context['app']
+    widget = HorizonWidget()
+    widget.resize(600, 600)
+    widget.show()
+    app.processEvents()
+    paint = Samples()
+    for k in range(WARMUP_FRAMES + args.frames):
+        widget.roll_deg = 30.0 * np.sin(k / 10.0)
+        widget.pitch_deg = 15.0 * np.cos(k / 13.0)
+        t0 = time.perf_counter()
+        widget.repaint()  # paintEvent синхронно
+        if k >= WARMUP_FRAMES:
+            paint.record(time.perf_counter() - t0)
+    widget.close()
+    return paint.metrics('paint')
+
+
+def stage_live(args, context):
+    app = context['app']
+    packets = stream_packets(args)
+    source, start_writer, close = open_link(args, make_stream(packets, args.rate))
+    window = make_window(context, 500)
+    window.register_device(f"bench ({args.source})")
+    window.profiler = context['profiler']
+    window.render_time = Samples()
+    latency = Samples()
+    frames = {'count': 0}
+
+    def on_frame():
+        frames['count'] += 1
+        latest = window.store[0].latest
+        if latest is not None:
+            latency.record(max(time.time() - float(latest['t']), 0.0))
+
+    # После update_plots — тот же таймер, подключён позже
+    window.timer.timeout.connect(on_frame)
+    spy = start_py_spy(args, 'live')
+    try:
+        if window.start_sources([source]) is not True:
+            raise OSError("не удалось открыть источник")
+        for reader in window.readers:
+            reader.profiler = context['profiler']
+        t0 = time.perf_counter()
+        start_writer()
+        deadline = t0 + (args.duration if not args.unpaced else 0) + args.timeout
+        while (window.store.total < packets and time.perf_counter() < deadline
+               and any(reader.thread.is_alive() for reader in window.readers)):
+            app.processEvents()
+            time.sleep(0.002)
+        elapsed = time.perf_counter() - t0
+        samples = window.store.total
+    finally:
+        window.stop_reading()
+        window.close()
+        close()
+        stop_py_spy(spy)
+    return {
+        'source': args.source,
+        'packets_sent': packets,
+        'packets_shown': samples,
+        'live_fps': round(frames['count'] / elapsed, 1),
+        **window.render_time.metrics('frame'),
+        **latency.metrics('latency'),
+    }
+
+
+def start_py_spy(args, stage):
+    """py-spy record на этом процессе (None — не запрошен или не установлен)"""
+    if not args.py_spy:
+        return None
+    exe = shutil.which('py-spy')
+    if exe is None:
+        print("py-spy не найден — профиль py-spy пропущен", file=sys.stderr)
+        return None
+    out = os.path.join(args.profile or '.', f"{stage}.svg")
+    return subprocess.Popen([exe, 'record', '--pid', str(os.getpid()), '--output', out,
+                             '--nonblocking', '--threads'])
+
+
+def stop_py_spy(process):
+    if process is not None:
+        process.send_signal(2)  # SIGINT — py-spy дописывает файл и выходит
+        process.wait(timeout=30)
+
+
+STAGE_FUNCTIONS = {
+    'decode': stage_decode,
+    'read': stage_read,
+    'store': stage_store,
+    'plots': stage_plots,
+    'horizon': stage_horizon,
+    'live': stage_live,
+}
+
+
+def run(args):
+    context = {'app': None, 'profiler': None}
+    if any(stage in GUI_STAGES for stage in args.stages):
+        from PyQt5.QtWidgets import QApplication
+        context['app'] = QApplication(sys.argv[:1])
+    result = {
+        'benchmark': 'e2e',
+        'time': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'qt_platform': os.environ.get('QT_QPA_PLATFORM'),
+        'args': {key: value for key, value in vars(args).items()
+                 if key not in ('json', 'compare', 'profile', 'py_spy')},
+        'stages': {},
+    }
+    for stage in args.stages:
+        profiler = None
+        if args.profile:
+            os.makedirs(args.profile, exist_ok=True)
+            profiler = SessionProfiler(os.path.join(args.profile, f"{stage}.prof"))
+            profiler.sync()
+        context['profiler'] = profiler
+        metrics = STAGE_FUNCTIONS[stage](args, context)
+        if profiler is not None:
+            profiler.stop()
+        metrics['peak_rss_mb'] = peak_rss_mb()
+        result['stages'][stage] = metrics
+        print(f"{stage:>8}: " + ", ".join(f"{key}={value}" for key, value in metrics.items()),
+              file=sys.stderr, flush=True)
+    return result
+
+
+def compare(result, baseline, tolerance):
+    """Ухудшения метрик относительно baseline: [(этап, метрика, было, стало)]"""
+    regressions = []
+    for stage, metrics in result['stages'].items():
+        base = baseline.get('stages', {}).get(stage, {})
+        for key, value in metrics.items():
+            old = base.get(key)
+            if not isinstance(value, (int, float)) or not isinstance(old, (int, float)) or not old:
+                continue
+            if any(tail in key for tail in TAILS):
+                continue
+            if key.endswith(HIGHER_IS_BETTER):
+                worse = value < old * (1 - tolerance)
+            elif key.endswith(LOWER_IS_BETTER):
+                worse = value > old * (1 + tolerance)
+            else:
+                continue
+            if worse:
+                regressions.append((stage, key, old, value))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=list(STAGES))
+    parser.add_argument('--source', choices=('memory', 'pty'), default='memory')
+    parser.add_argument('--rate', type=float, default=1000.0, help="кадров в секунду")
+    parser.add_argument('--baud', type=int, default=921600)
+    parser.add_argument('--unpaced', action='store_true', help="источник без задержек")
+    parser.add_argument('--duration', type=float, default=5.0, help="секунд потока в read и live")
+    parser.add_argument('--packets', type=int, default=200_000,
+                        help="кадров в decode и в read/live при --unpaced")
+    parser.add_argument('--chunk', type=int, default=4096,
+                        help="байт на кусок в decode и у источника memory")
+    parser.add_argument('--chunk-size', type=int, default=34,
+                        help="байт на блокирующее чтение pty (как --chunk-size main.py)")
+    parser.add_argument('--points', type=int, default=2000, help="точек окна графиков")
+    parser.add_argument('--frames', type=int, default=100, help="кадров в plots и horizon")
+    parser.add_argument('--store-batches', type=int, default=20_000)
+    parser.add_argument('--timeout', type=float, default=10.0,
+                        help="запас ожидания конца потока, с")
+    parser.add_argument('--json', metavar='FILE', help="записать результат (\"-\" — stdout)")
+    parser.add_argument('--compare', metavar='FILE', help="JSON прошлого прогона")
+    parser.add_argument('--tolerance', type=float, default=0.15,
+                        help="допустимое ухудшение метрики, доля")
+    parser.add_argument('--profile', metavar='DIR', help="cProfile этапов в DIR/этап.prof")
+    parser.add_argument('--py-spy', action='store_true',
+                        help="py-spy record этапа live (если py-spy установлен)")
+    args = parser.parse_args()
+    if args.source == 'pty' and os.name != 'posix':
+        parser.error("--source pty работает только в POSIX")
+
+    result = run(args)
+    text = json.dumps(result, ensure_ascii=False, indent=1)
+    if args.json == '-':
+        print(text)
+    elif args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            f.write(text + "\n")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        differ = [key for key in ('source', 'rate', 'baud', 'unpaced', 'points', 'chunk_size')
+                  if baseline.get('args', {}).get(key) != result['args'].get(key)]
+        if differ:
+            print(f"внимание: параметры прогонов различаются: {', '.join(differ)}", file=sys.stderr)
+        regressions = compare(result, baseline, args.tolerance)
+        for stage, key, old, new in regressions:
+            print(f"хуже: {stage}.{key}: {old} → {new}", file=sys.stderr)
+        if regressions:
+            return 1
+        print(f"регрессий нет (допуск {args.tolerance:.0%})", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
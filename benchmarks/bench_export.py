@@ -0,0 +1,69 @@
+"""Бенчмарк экспорта записи: МБ/с по форматам.
+
+Создаёт временную запись .imurec из N записей генератора и экспортирует
+её через Exporter (фоновый поток, куски по --chunk-size) в каждый
+доступный формат. МБ/с считаются по объёму исходных записей и по
+размеру результата.
+
+Запуск: python benchmarks/bench_export.py [--records N] [--chunk-size N]
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import numpy as np  # noqa: E402
+
+from imu.decoder import CHANNELS, TIMED_DTYPE  # noqa: E402
+from imu.export import CHUNK_SIZE, Exporter  # noqa: E402
+from imu.recording import Recorder, Recording  # noqa: E402
+from imu.sources import synthetic_motion  # noqa: E402
+
+EXTENSIONS = {'csv': '.csv', 'npz': '.npz', 'hdf5': '.h5', 'parquet': '.parquet'}
+
+
+def make_recording(path, count, block=100_000):
+    rng = np.random.default_rng(0)
+    recorder = Recorder(path)
+    for start in range(0, count, block):
+        t = np.arange(start, min(start + block, count)) / 1000.0
+        samples = synthetic_motion(t, 0.02, rng)
+        records = np.empty(len(t), dtype=TIMED_DTYPE)
+        records['t'] = 1.7e9 + t
+        for name in CHANNELS:
+            records[name] = samples[name]
+        recorder.write(records)
+    recorder.close()
+
+
+def main_bench():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--records', type=int, default=2_000_000)
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--formats', default='csv,npz,hdf5,parquet')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, 'session.imurec')
+        make_recording(source, args.records)
+        recording = Recording(source)
+        print(f"запись: {len(recording)} записей, {os.path.getsize(source) / 1e6:.1f} МБ")
+        for fmt in args.formats.split(','):
+            out = os.path.join(tmp, 'export' + EXTENSIONS[fmt])
+            exporter = Exporter(recording.records, out, fmt, args.chunk_size,
+                                meta=recording.meta).start()
+            exporter.wait()
+            if exporter.error is not None:
+                print(f"{fmt:>8}: пропущен — {exporter.error}")
+                continue
+            mb = exporter.bytes / 1e6
+            out_mb = os.path.getsize(out) / 1e6
+            print(f"{fmt:>8}: {exporter.elapsed:6.2f} с — {mb / exporter.elapsed:7.1f} МБ/с записей, "
+                  f"файл {out_mb:.1f} МБ ({out_mb / exporter.elapsed:.1f} МБ/с)")
+            os.remove(out)
+
+
+if __name__ == '__main__':
+    main_bench()
@@ -0,0 +1,119 @@
+"""Бенчмарк раздачи по сети: много клиентов на localhost.
+
+Поток чтения выдаёт отсчёты генератора с частотой --rate, StreamServer
+раздаёт их по TCP. В отдельном процессе подключаются --clients
+читающих клиентов (asyncio) и --slow клиентов, которые ничего не
+читают. Печатается суммарный поток к клиентам (МБ/с, отсчётов/с),
+сколько медленных отключено и скорость чтения источника — она должна
+совпадать с прогоном без сервера.
+
+Запуск: python benchmarks/bench_network.py [--clients N] [--slow N] [--rate HZ] [--duration S]
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import socket
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from imu.reader import DataReader  # noqa: E402
+from imu.server import FrameParser, KIND_SAMPLES, StreamServer  # noqa: E402
+from imu.sources import SyntheticSource  # noqa: E402
+
+
+async def _clients(host, port, count, slow, duration):
+    totals = {'bytes': 0, 'samples': 0}
+    sockets = []
+    for _ in range(slow):
+        # Маленький буфер приёма и никакого чтения — очередь на сервере переполнится
+        sock = socket.socket()
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+        sock.connect((host, port))
+        sockets.append(sock)
+
+    async def fast(check):
+        reader, writer = await asyncio.open_connection(host, port)
+        parser = FrameParser() if check else None
+        deadline = time.monotonic() + duration
+        while time.monotonic() < deadline:
+            try:
+                data = await asyncio.wait_for(reader.read(1 << 20), 0.5)
+            except asyncio.TimeoutError:
+                continue
+            if not data:
+                break
+            totals['bytes'] += len(data)
+            if parser is not None:
+                # Один клиент разбирает кадры — по нему считаются отсчёты
+                totals['samples'] += sum(len(records) for kind, _, records in parser.feed(data)
+                                         if kind == KIND_SAMPLES)
+        writer.close()
+
+    await asyncio.gather(*(fast(i == 0) for i in range(count)))
+    for sock in sockets:
+        sock.close()
+    return totals
+
+
+def client_process(host, port, count, slow, duration, results):
+    results.put(asyncio.run(_clients(host, port, count, slow, duration)))
+
+
+def read_rate(rate, duration, server=None):
+    """Отсчётов/с источника за duration (с сервером или без)"""
+    reader = DataReader(batch_interval=0.02)
+    if server is not None:
+        server.attach(reader, 0, "генератор", rate)
+    reader.start_source(SyntheticSource(rate=rate))
+    time.sleep(duration)
+    packets = reader.stats.packets
+    reader.stop_reading()
+    return packets / duration
+
+
+def main_bench():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clients', type=int, default=50)
+    parser.add_argument('--slow', type=int, default=3, help="клиентов, которые не читают")
+    parser.add_argument('--rate', type=float, default=10_000.0, help="частота генератора, Гц")
+    parser.add_argument('--duration', type=float, default=5.0)
+    parser.add_argument('--client-buffer', type=int, default=1 << 20,
+                        help="байт в очереди отправки клиента")
+    args = parser.parse_args()
+
+    baseline = read_rate(args.rate, args.duration)
+    print(f"без сервера: {baseline:9.0f} отсчётов/с")
+
+    server = StreamServer(port=0, client_buffer=args.client_buffer).start()
+    host, port = server.addresses['tcp']
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    process = context.Process(target=client_process,
+                              args=(host, port, args.clients, args.slow, args.duration + 2.0, results))
+    process.start()
+    deadline = time.monotonic() + 10.0
+    while server.counters()['clients_total'] < args.clients + args.slow and time.monotonic() < deadline:
+        time.sleep(0.05)
+    sent_before = server.counters()['bytes_sent']
+    served = read_rate(args.rate, args.duration, server)
+    counters = server.counters()
+    totals = results.get(timeout=args.duration + 30)
+    process.join()
+    server.stop()
+
+    mb = (counters['bytes_sent'] - sent_before) / 1e6
+    print(f"с сервером:  {served:9.0f} отсчётов/с "
+          f"({served / baseline * 100:.0f}% от прогона без сервера)")
+    print(f"клиентов: {args.clients} читающих + {args.slow} медленных, "
+          f"отключено медленных: {counters['dropped_clients']}")
+    print(f"отправлено: {mb / args.duration:7.1f} МБ/с, "
+          f"{totals['bytes'] / args.duration / 1e6:7.1f} МБ/с получено клиентами, "
+          f"{totals['samples'] * args.clients / args.duration:10.0f} отсчётов/с суммарно")
+    print(f"потери входной очереди сервера: {counters['input_dropped']} отсчётов")
+
+
+if __name__ == '__main__':
+    main_bench()
@@ -0,0 +1,94 @@
+"""Сквозной бенчмарк конвейера без оборудования.
+
+Источник (генератор кадров или файл записи) → SerialDataReader →
+RIM1AMonitorApp в режиме «так быстро, как возможно». С --devices N окно
+читает N источников одновременно (поток чтения на каждый). Работает без
+дисплея и без COM-порта (QT_QPA_PLATFORM=offscreen).
+
+Запуск: python benchmarks/bench_pipeline.py [--packets N] [--devices N] [--file PATH] [--speed X]
+"""
+import argparse
+import os
+import sys
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from PyQt5.QtWidgets import QApplication  # noqa: E402
+
+from imu import gui  # noqa: E402
+from imu.reader import DataReader  # noqa: E402
+from imu.sources import FileReplaySource, SyntheticSource  # noqa: E402
+
+
+def run_reader_only(source):
+    """Только чтение и декодирование: отсчёты считаются в потоке чтения"""
+    counter = {'samples': 0}
+
+    def count(block):
+        counter['samples'] += len(block)
+
+    reader = DataReader(on_block=count)
+    t0 = time.perf_counter()
+    reader.start_source(source)
+    reader.thread.join()
+    elapsed = time.perf_counter() - t0
+    reader.stop_reading()
+    return counter['samples'], elapsed
+
+
+def run_app(app, sources):
+    """Полный конвейер с окном: по устройству и потоку чтения на источник"""
+    window = gui.RIM1AMonitorApp()
+    window.show()
+    for k in range(len(sources)):
+        window.register_device(f"bench {k + 1}")
+    frames = {'count': 0}
+    window.timer.timeout.connect(lambda: frames.__setitem__('count', frames['count'] + 1))
+    t0 = time.perf_counter()
+    window.start_sources(sources)
+    for reader in window.readers:
+        # Окно останавливает чтение, когда закончатся все источники
+        reader.finished.connect(lambda: window.readers or app.quit())
+    window.timer.start(16)
+    app.exec_()
+    elapsed = time.perf_counter() - t0
+    samples = window.store.total
+    window.close()
+    return samples, elapsed, frames['count']
+
+
+def make_source(args, seed=0):
+    if args.file:
+        return FileReplaySource(args.file, speed=args.speed)
+    return SyntheticSource(rate=args.rate, speed=args.speed,
+                           duration=args.packets / args.rate, seed=seed)
+
+
+def main_bench():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--packets', type=int, default=200000)
+    parser.add_argument('--rate', type=float, default=1000.0,
+                        help="частота кадров генератора, Гц")
+    parser.add_argument('--devices', type=int, default=1,
+                        help="число одновременно читаемых источников в окне")
+    parser.add_argument('--file', help="файл .imurec или сырой дамп вместо генератора")
+    parser.add_argument('--speed', type=float, default=None,
+                        help="множитель скорости (по умолчанию — без задержек)")
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+
+    samples, elapsed = run_reader_only(make_source(args))
+    print(f"чтение+декодирование: {samples} отсчётов за {elapsed:.2f} с "
+          f"— {samples / elapsed:,.0f} пакетов/с")
+
+    sources = [make_source(args, seed) for seed in range(args.devices)]
+    samples, elapsed, frames = run_app(app, sources)
+    print(f"с окном ({args.devices} устр.): {samples} отсчётов за {elapsed:.2f} с "
+          f"— {samples / elapsed:,.0f} пакетов/с, {frames / elapsed:.1f} кадров/с")
+
+
+if __name__ == '__main__':
+    main_bench()
@@ -0,0 +1,107 @@
+"""Бенчмарк времени кадра графиков (update_plots + перерисовка).
+
+Сравнивает прежнее обновление (clear() и поточечный append())
+с текущим update_plots (прореживание + replace()) при разной длине окна.
+Работает без дисплея: QT_QPA_PLATFORM=offscreen. --backend opengl
+рисует серии через OpenGL — для этого нужен дисплей (например,
+QT_QPA_PLATFORM=xcb); без OpenGL графики откатываются на QPainter,
+выбранный путь печатается первой строкой.
+
+Прежний путь квадратичен по длине окна, поэтому для окон длиннее
+--legacy-limit он не измеряется.
+
+Запуск: python benchmarks/bench_plots.py [--points 500 2000 20000 100000] [--frames 20]
+        [--backend auto|opengl|software]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from PyQt5.QtWidgets import QApplication  # noqa: E402
+
+from imu import gui  # noqa: E402
+from imu.decoder import TIMED_DTYPE  # noqa: E402
+
+
+def legacy_update_plots(window):
+    """Прежний update_plots: очистка и поточечное добавление"""
+    device = window.store[0]
+    gyro_series, acc_series = window.series_for(device)
+    series = gyro_series + acc_series
+    rows = device.history.last(window.max_points).tolist()
+    for s in series:
+        s.clear()
+    for i in range(len(rows[0])):
+        for s, row in zip(series, rows):
+            s.append(i, row[i])
+
+
+def current_update_plots(window):
+    window.update_plots()
+
+
+def measure(app, window, update, frames):
+    """Среднее время (мс) обновления серий и полного кадра с перерисовкой"""
+    t_update = 0.0
+    t_frame = 0.0
+    for _ in range(frames):
+        t0 = time.perf_counter()
+        update(window)
+        t1 = time.perf_counter()
+        window.chart_view_gyro.viewport().repaint()
+        window.chart_view_acc.viewport().repaint()
+        app.processEvents()
+        t2 = time.perf_counter()
+        t_update += t1 - t0
+        t_frame += t2 - t0
+    return t_update / frames * 1e3, t_frame / frames * 1e3
+
+
+def main_bench():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--points', type=int, nargs='+', default=[500, 2000, 20000, 100000])
+    parser.add_argument('--frames', type=int, default=20)
+    parser.add_argument('--legacy-limit', type=int, default=2000)
+    parser.add_argument('--backend', choices=gui.PLOT_BACKENDS, default='software')
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    window = gui.RIM1AMonitorApp(plot_backend=args.backend)
+    window.show()
+    app.processEvents()
+    print(f"отрисовка: {window.plot_backend} ({window.plot_backend_reason})")
+
+    rng = np.random.default_rng(0)
+    window.store.capacity = max(max(args.points), window.store.capacity)
+    block = np.zeros(max(args.points), dtype=TIMED_DTYPE)
+    block['t'] = np.arange(len(block)) / 1000.0
+    for name in TIMED_DTYPE.names[1:]:
+        block[name] = np.cumsum(rng.normal(0, 0.5, len(block)))
+    window.store[window.register_device("bench")].extend(block)
+
+    print(f"{'точек':>8} {'legacy, мс':>22} {'replace, мс':>22}")
+    print(f"{'':>8} {'серии':>10} {'кадр':>11} {'серии':>10} {'кадр':>11}")
+    for points in args.points:
+        window.max_points = points
+        window.store.set_window(points)
+        for axis in (window.chart_gyro.axes(gui.Qt.Horizontal)
+                     + window.chart_acc.axes(gui.Qt.Horizontal)):
+            axis.setRange(0, points)
+        if points <= args.legacy_limit:
+            legacy = measure(app, window, legacy_update_plots, args.frames)
+            legacy_text = f"{legacy[0]:>10.2f} {legacy[1]:>11.2f}"
+        else:
+            legacy_text = f"{'—':>10} {'—':>11}"
+        current = measure(app, window, current_update_plots, args.frames)
+        print(f"{points:>8} {legacy_text} {current[0]:>10.2f} {current[1]:>11.2f}",
+              flush=True)
+
+
+if __name__ == '__main__':
+    main_bench()
@@ -0,0 +1,83 @@
+"""Бенчмарк: чтение в потоке против чтения в дочернем процессе.
+
+Одно и то же окно RIM1AMonitorApp читает N генераторов «так быстро, как
+возможно» сначала потоками (SerialDataReader, декодирование делит GIL с
+отрисовкой), потом в дочерних процессах (ProcessReader + разделяемая
+память). Печатаются пакеты/с, частота кадров окна и отсчёты, потерянные
+кольцом (GUI не успел забрать). Работает без дисплея (offscreen).
+
+Запуск: python benchmarks/bench_process.py [--packets N] [--devices N]
+"""
+import argparse
+import os
+import sys
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from PyQt5.QtCore import QTimer  # noqa: E402
+from PyQt5.QtWidgets import QApplication  # noqa: E402
+
+from imu import gui  # noqa: E402
+from imu.sources import SyntheticSource  # noqa: E402
+
+
+def run_app(app, sources, process):
+    """Прогон окна до конца всех источников; (отсчёты, с, кадры, потери кольца)"""
+    window = gui.RIM1AMonitorApp()
+    window.show()
+    window.process_check.setChecked(process)
+    for k in range(len(sources)):
+        window.register_device(f"bench {k + 1}")
+    frames = {'count': 0}
+    window.timer.timeout.connect(lambda: frames.__setitem__('count', frames['count'] + 1))
+    lost = {'ring': 0}
+
+    def check():
+        # Потери считаются до остановки: stop_reading сбрасывает список читателей
+        for reader in window.readers:
+            if isinstance(reader, gui.ProcessReader) and reader._samples is not None:
+                lost['ring'] = max(lost['ring'], reader._samples.lost)
+        if not window.readers:
+            app.quit()
+
+    done = QTimer()
+    done.timeout.connect(check)
+    if not window.start_sources(sources):
+        raise SystemExit("не удалось запустить чтение")
+    # Запуск дочернего процесса (импорт numpy и т. п.) в замер не входит
+    t0 = time.perf_counter()
+    window.timer.start(16)
+    done.start(20)
+    app.exec_()
+    elapsed = time.perf_counter() - t0
+    done.stop()
+    samples = window.store.total
+    window.close()
+    return samples, elapsed, frames['count'], lost['ring']
+
+
+def main_bench():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--packets', type=int, default=300000,
+                        help="отсчётов на устройство")
+    parser.add_argument('--rate', type=float, default=1000.0,
+                        help="частота кадров генератора, Гц")
+    parser.add_argument('--devices', type=int, default=1)
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    for process in (False, True):
+        sources = [SyntheticSource(rate=args.rate, speed=None,
+                                   duration=args.packets / args.rate, seed=seed)
+                   for seed in range(args.devices)]
+        samples, elapsed, frames, lost = run_app(app, sources, process)
+        mode = "процесс" if process else "поток  "
+        print(f"{mode} ({args.devices} устр.): {samples} отсчётов за {elapsed:.2f} с "
+              f"— {samples / elapsed:,.0f} пакетов/с, {frames / elapsed:.1f} кадров/с, "
+              f"потеряно кольцом {lost}")
+
+
+if __name__ == '__main__':
+    main_bench()
@@ -0,0 +1,68 @@
+"""Бенчмарк вкладки спектра: время кадра в зависимости от частоты отсчётов.
+
+Устройство получает отсчёты пачками по 50 мс (как кадр GUI), после
+каждой пачки SpectrumWidget.update_device() досчитывает новые сегменты
+Уэлча и перерисовывает график и водопад. Печатается время кадра p50/p99
+и максимум. Работает без дисплея (offscreen).
+
+Запуск: python benchmarks/bench_spectrum.py [--frames N] [--nperseg N]
+"""
+import argparse
+import os
+import sys
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import numpy as np  # noqa: E402
+from PyQt5.QtWidgets import QApplication  # noqa: E402
+
+from imu import gui  # noqa: E402
+from imu.decoder import CHANNELS, TIMED_DTYPE  # noqa: E402
+from imu.devices import Device  # noqa: E402
+from imu.stats import Histogram  # noqa: E402
+
+FRAME = 0.05
+
+
+def run(app, rate, frames, nperseg):
+    widget = gui.SpectrumWidget()
+    widget.resize(1200, 700)
+    widget.show()
+    widget.length_combo.setCurrentText(str(nperseg))
+    device = Device("bench", capacity=max(100_000, int(rate)))
+    rng = np.random.default_rng(0)
+    per_frame = int(rate * FRAME)
+    frame_time = Histogram()
+    t = 0.0
+    for _ in range(frames):
+        block = np.zeros(per_frame, dtype=TIMED_DTYPE)
+        block['t'] = t + np.arange(per_frame) / rate
+        t += per_frame / rate
+        for k, name in enumerate(CHANNELS):
+            block[name] = np.sin(2 * np.pi * (50 + 10 * k) * block['t']) + 0.1 * rng.standard_normal(per_frame)
+        device.extend(block)
+        t0 = time.perf_counter()
+        widget.update_device(device)
+        app.processEvents()
+        frame_time.record(time.perf_counter() - t0)
+    widget.close()
+    return frame_time.summary(scale=1e3), widget.analyzer.segments
+
+
+def main_bench():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--frames', type=int, default=100)
+    parser.add_argument('--nperseg', type=int, default=1024)
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    for rate in (1_000, 10_000, 100_000):
+        summary, segments = run(app, rate, args.frames, args.nperseg)
+        print(f"{rate:>7} Гц: кадр p50 {summary['p50']} мс, p99 {summary['p99']} мс, "
+              f"макс. {summary['max']} мс; сегментов {segments}")
+
+
+if __name__ == '__main__':
+    main_bench()
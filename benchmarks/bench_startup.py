@@ -0,0 +1,90 @@
+"""Бенчмарк холодного старта: время импорта и время до первого кадра.
+
+Каждое измерение — в отдельном процессе (медиана по --runs запускам).
+Результат печатается одной строкой JSON, чтобы сравнивать между релизами.
+Без дисплея: QT_QPA_PLATFORM=offscreen.
+
+Запуск: python benchmarks/bench_startup.py [--runs 5]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Импорт модуля GUI целиком (PyQt5, QtChart, numpy и ядро)
+IMPORT_GUI = """
+import time
+t0 = time.perf_counter()
+import imu.gui
+print(time.perf_counter() - t0)
+"""
+
+# Импорт безоконного конвейера (без Qt)
+IMPORT_HEADLESS = """
+import sys, time
+t0 = time.perf_counter()
+import imu.pipeline
+assert 'PyQt5' not in sys.modules
+print(time.perf_counter() - t0)
+"""
+
+# От начала импорта до первого обработанного кадра окна
+FIRST_FRAME = """
+import sys, time
+t0 = time.perf_counter()
+from imu.gui import RIM1AMonitorApp
+from PyQt5.QtCore import QTimer
+from PyQt5.QtWidgets import QApplication
+app = QApplication(sys.argv)
+window = RIM1AMonitorApp()
+window.show()
+def done():
+    print(time.perf_counter() - t0)
+    app.quit()
+QTimer.singleShot(0, done)
+app.exec_()
+"""
+
+
+def run_child(code):
+    """(время из процесса, полное время жизни процесса) в секундах"""
+    env = dict(os.environ)
+    env.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    t0 = time.perf_counter()
+    out = subprocess.run([sys.executable, '-c', code], cwd=ROOT, env=env,
+                         capture_output=True, text=True, check=True).stdout
+    wall = time.perf_counter() - t0
+    return float(out.strip().splitlines()[-1]), wall
+
+
+def median_of(code, runs):
+    inner, wall = zip(*(run_child(code) for _ in range(runs)))
+    return statistics.median(inner), statistics.median(wall)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    import_gui, _ = median_of(IMPORT_GUI, args.runs)
+    import_headless, process_headless = median_of(IMPORT_HEADLESS, args.runs)
+    first_frame, process_first_frame = median_of(FIRST_FRAME, args.runs)
+    print(json.dumps({
+        'python': sys.version.split()[0],
+        'runs': args.runs,
+        'import_gui_s': round(import_gui, 4),
+        'import_headless_s': round(import_headless, 4),
+        'first_frame_s': round(first_frame, 4),
+        'process_first_frame_s': round(process_first_frame, 4),
+        'process_headless_s': round(process_headless, 4),
+    }))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""Бенчмарк обзора записи: построение пирамиды и время перерисовки.
+
+Создаёт запись на --hours часов при --rate Гц, строит min/max-пирамиду
+и прогоняет в TimelineWidget серию приближений от всего файла до
+отдельных отсчётов и обратно, а затем сдвиги. Печатается время
+построения, размер пирамиды и время кадра (запрос + отрисовка)
+p50/p99/максимум. Работает без дисплея (offscreen).
+
+Запуск: python benchmarks/bench_timeline.py [--hours H] [--rate R]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import numpy as np  # noqa: E402
+from PyQt5.QtWidgets import QApplication  # noqa: E402
+
+from imu import gui  # noqa: E402
+from imu.decoder import CHANNELS, TIMED_DTYPE  # noqa: E402
+from imu.pyramid import build_pyramid  # noqa: E402
+from imu.recording import Recorder, Recording  # noqa: E402
+from imu.stats import Histogram  # noqa: E402
+
+
+def make_recording(path, count, rate, block=1_000_000):
+    rng = np.random.default_rng(0)
+    recorder = Recorder(path)
+    for start in range(0, count, block):
+        n = min(block, count - start)
+        records = np.empty(n, dtype=TIMED_DTYPE)
+        records['t'] = 1.7e9 + (start + np.arange(n)) / rate
+        for name in CHANNELS:
+            records[name] = rng.standard_normal(n).astype(np.float32)
+        recorder.write(records)
+    recorder.close()
+
+
+def main_bench():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--hours', type=float, default=2.0)
+    parser.add_argument('--rate', type=float, default=1000.0)
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'session.imurec')
+        make_recording(path, int(args.hours * 3600 * args.rate), args.rate)
+        recording = Recording(path)
+        t0 = time.perf_counter()
+        pyramid = build_pyramid(recording)
+        build = time.perf_counter() - t0
+        print(f"запись: {len(recording)} отсчётов, {os.path.getsize(path) / 1e6:.0f} МБ; "
+              f"пирамида: {build:.2f} с, {os.path.getsize(pyramid.path) / 1e6:.1f} МБ, "
+              f"уровней {len(pyramid.levels)}")
+
+        widget = gui.TimelineWidget()
+        widget.resize(1400, 800)
+        widget.show()
+        widget.pyramid = pyramid
+        widget.start, end = pyramid.time_range
+        widget.duration = end - widget.start
+        widget.show_all()
+        app.processEvents()
+
+        frame = Histogram()
+        steps = [(0.0, 0.7, 0.4)] * 40 + [(0.05, 1.0, 0.0)] * 20 + [(0.0, 1 / 0.7, 0.6)] * 40
+        for shift, zoom, anchor in steps:
+            t0 = time.perf_counter()
+            widget.change_view(shift, zoom, anchor)
+            app.processEvents()
+            frame.record(time.perf_counter() - t0)
+        summary = frame.summary(scale=1e3, digits=1)
+        print(f"кадр обзора: p50 {summary['p50']} мс, p99 {summary['p99']} мс, "
+              f"макс. {summary['max']} мс ({summary['count']} кадров)")
+        widget.close()
+        del widget, pyramid, recording
+
+
+if __name__ == '__main__':
+    main_bench()
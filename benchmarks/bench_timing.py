@@ -0,0 +1,94 @@
+"""Проверка оценки частоты, пропусков и передискретизации на модели порта.
+
+Датчик выдаёт кадры rim1a-tc с частотой --rate, его часы уходят на
+--drift ppm, часть кадров теряется (--loss). Кадры приходят пачками раз
+в --burst мс (таймер задержки USB-моста) с задержкой до --latency мс.
+Пачки проходят тот же путь, что в DataReader (_prepare: метки времени
+хоста, счётчик кадров, передискретизация), без реального ожидания.
+Печатаются оценённые частота, уход и джиттер против заданных, найденные
+потери, ошибка меток времени и скорость передискретизации.
+
+Запуск: python benchmarks/bench_timing.py [--rate 1000] [--drift 80] [--loss 0.001]
+"""
+import argparse
+import os
+import sys
+import time
+import types
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from imu.protocols import PROTOCOLS  # noqa: E402
+from imu.reader import DataReader  # noqa: E402
+from imu.sources import synthetic_motion  # noqa: E402
+from imu.timing import Resampler  # noqa: E402
+
+
+def make_stream(args, rng):
+    """Отсчёты с истинным временем датчика и моменты прихода пачек"""
+    schema = PROTOCOLS['rim1a-tc']
+    n = int(args.duration * args.rate)
+    true_t = np.arange(n) / (args.rate * (1 + args.drift * 1e-6))
+    samples = np.zeros(n, dtype=schema.sample_dtype)
+    motion = synthetic_motion(true_t, 0.02, rng)
+    for name in motion.dtype.names:
+        samples[name] = motion[name]
+    samples['counter'] = np.arange(n) + (1 << 32) - n // 2  # с переполнением
+    keep = rng.random(n) >= args.loss
+    # Пачка уходит по таймеру моста, приходит с задержкой
+    burst = args.burst / 1e3
+    flush = (np.floor(true_t / burst) + 1) * burst
+    arrival = flush + rng.uniform(0, args.latency / 1e3, n)
+    arrival = np.maximum.accumulate(arrival)
+    return samples[keep], true_t[keep], arrival[keep], n - int(keep.sum())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rate', type=float, default=1000.0, help="номинальная частота, Гц")
+    parser.add_argument('--drift', type=float, default=80.0, help="уход часов датчика, ppm")
+    parser.add_argument('--loss', type=float, default=0.001, help="доля потерянных кадров")
+    parser.add_argument('--burst', type=float, default=16.0, help="период пачек моста, мс")
+    parser.add_argument('--latency', type=float, default=2.0, help="разброс задержки, мс")
+    parser.add_argument('--duration', type=float, default=120.0, help="секунд потока")
+    parser.add_argument('--resample', type=float, default=500.0, help="частота сетки, Гц")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    samples, true_t, arrival, lost = make_stream(args, rng)
+    reader = DataReader(protocol='rim1a-tc')
+    reader.source = types.SimpleNamespace(rate=None, timed=False)  # метки — по часам хоста
+    reader.rate_estimator.nominal = args.rate
+
+    # Пачка — все кадры с одним моментом прихода
+    edges = np.flatnonzero(np.diff(arrival)) + 1
+    blocks = [reader._prepare(chunk, float(when[-1]) + 1.7e9)
+              for chunk, when in zip(np.split(samples, edges), np.split(arrival, edges))]
+    stamped = np.concatenate(blocks)
+    timing = reader.rate_estimator
+    # Ошибка меток: отклонение от истинного времени после вычета средней задержки
+    error = (stamped['t'] - 1.7e9) - true_t
+    error -= error.mean()
+
+    true_rate = args.rate * (1 + args.drift * 1e-6)
+    print(f"частота: {timing.rate:.4f} Гц (истинная {true_rate:.4f}), "
+          f"уход {timing.drift_ppm:+.1f} ppm (задан {args.drift:+.1f})")
+    print(f"джиттер прихода: {timing.jitter * 1e3:.2f} мс, "
+          f"ошибка меток: СКО {np.std(error) * 1e3:.2f} мс, макс. {np.abs(error).max() * 1e3:.2f} мс")
+    print(f"потеряно кадров: {reader.sequence.lost} в {reader.sequence.gaps} пропусках "
+          f"(на самом деле {lost}), повторов {reader.sequence.repeats}")
+
+    resampler = Resampler(args.resample)
+    t0 = time.perf_counter()
+    grid = [resampler.feed(block) for block in blocks]
+    elapsed = time.perf_counter() - t0
+    grid = np.concatenate(grid)
+    steps = np.diff(grid['t'])
+    print(f"сетка {args.resample:g} Гц: {len(grid)} отсчётов, шаг {steps.min() * 1e3:.4f}…"
+          f"{steps.max() * 1e3:.4f} мс, {len(stamped) / elapsed / 1e6:.2f} млн отсчётов/с на входе")
+
+
+if __name__ == '__main__':
+    main()
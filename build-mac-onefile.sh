@@ -16,6 +16,10 @@ pyinstaller \
   --name IMU_Monitor \
   --windowed \
   --onefile \
+  --exclude-module tkinter \
+  --exclude-module setuptools \
+  --exclude-module distutils \
+  --exclude-module pkg_resources \
   main.py
 
 echo "Onefile built: dist/IMU_Monitor"
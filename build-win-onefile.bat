@@ -23,6 +23,10 @@ pyinstaller --noconfirm --clean ^
   --name IMU_Monitor ^
   --windowed ^
   --onefile ^
+  --exclude-module tkinter ^
+  --exclude-module setuptools ^
+  --exclude-module distutils ^
+  --exclude-module pkg_resources ^
   main.py
 
 echo.
@@ -0,0 +1 @@
+"""Ядро обработки данных IMU (без зависимостей от Qt)"""
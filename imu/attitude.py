@@ -0,0 +1,193 @@
+"""Оценка ориентации по гироскопу и акселерометру.
+
+Фильтры обрабатывают блоки отсчётов с полем 't' (TIMED_DTYPE) целиком.
+Шаг по времени берётся из меток времени отсчётов или, если задана
+rate, из номинальной частоты устройства — но не из времени прихода
+блока в GUI. Результат — массив ATTITUDE_DTYPE (углы в градусах).
+"""
+import math
+
+import numpy as np
+
+ATTITUDE_DTYPE = np.dtype([('t', '<f8'), ('roll', '<f4'), ('pitch', '<f4'), ('yaw', '<f4')])
+
+
+def linear_recurrence(a, u, x0, chunk=64):
+    """Решение x[k] = a[k] * x[k-1] + u[k] без цикла по отсчётам.
+
+    Внутри куска x[k] = P[k] * (x0 + Σ u[j] / P[j]), где P — накопленное
+    произведение a; куски короткие, чтобы P не уходило в ноль.
+    """
+    out = np.empty(len(u), dtype=np.float64)
+    for start in range(0, len(u), chunk):
+        aa = a[start:start + chunk]
+        uu = u[start:start + chunk]
+        p = np.cumprod(aa)
+        out[start:start + len(uu)] = p * (x0 + np.cumsum(uu / p))
+        x0 = out[start + len(uu) - 1]
+    return out
+
+
+class AttitudeEstimator:
+    """Общая часть фильтров: шаг по времени и формат результата.
+
+    rate — номинальная частота отсчётов, Гц (None — брать шаг из 't').
+    max_dt — ограничение шага, чтобы пропуск данных не «раскручивал» углы.
+    """
+
+    def __init__(self, rate=None, max_dt=0.1):
+        self.rate = rate
+        self.max_dt = max_dt
+        self.reset()
+
+    def reset(self):
+        self.roll_deg = 0.0
+        self.pitch_deg = 0.0
+        self.yaw_deg = 0.0
+        self._last_t = None
+
+    def _dt(self, t):
+        if self.rate:
+            dt = np.full(len(t), 1.0 / self.rate)
+        else:
+            prev = t[0] if self._last_t is None else self._last_t
+            dt = np.diff(t, prepend=prev)
+        self._last_t = float(t[-1])
+        return np.clip(dt, 0.0, self.max_dt)
+
+    def update_block(self, block):
+        """Обработать блок отсчётов; возвращает массив ATTITUDE_DTYPE"""
+        out = np.empty(len(block), dtype=ATTITUDE_DTYPE)
+        if not len(block):
+            return out
+        t = np.asarray(block['t'], dtype=np.float64)
+        roll, pitch, yaw = self._process(block, self._dt(t))
+        out['t'] = t
+        out['roll'] = roll
+        out['pitch'] = pitch
+        out['yaw'] = yaw
+        self.roll_deg = float(roll[-1])
+        self.pitch_deg = float(pitch[-1])
+        self.yaw_deg = float(yaw[-1])
+        return out
+
+    def _process(self, block, dt):
+        raise NotImplementedError
+
+
+class ComplementaryFilter(AttitudeEstimator):
+    """Комплементарный фильтр для roll/pitch (рыскание — интеграл gz).
+
+    Гироскоп в °/с, акселерометр в м/с². Вес гироскопа — alpha на каждом
+    отсчёте либо, если задана постоянная времени tau (с),
+    tau / (tau + dt) — тогда поведение не зависит от частоты отсчётов.
+    """
+
+    def __init__(self, alpha=0.98, tau=None, rate=None, max_dt=0.1):
+        self.alpha = alpha
+        self.tau = tau
+        super().__init__(rate=rate, max_dt=max_dt)
+
+    def _process(self, block, dt):
+        gx = block['gx'].astype(np.float64)
+        gy = block['gy'].astype(np.float64)
+        gz = block['gz'].astype(np.float64)
+        ax = block['ax'].astype(np.float64)
+        ay = block['ay'].astype(np.float64)
+        az = block['az'].astype(np.float64)
+
+        # Оценка из акселерометра (в градусах)
+        # roll_acc: atan2(ay, az), pitch_acc: atan2(-ax, sqrt(ay^2+az^2))
+        roll_acc = np.where(np.abs(az) + np.abs(ay) > 1e-6, np.degrees(np.arctan2(ay, az)), 0.0)
+        pitch_acc = np.degrees(np.arctan2(-ax, np.hypot(ay, az)))
+
+        if self.tau is not None:
+            alpha = self.tau / (self.tau + dt)
+        else:
+            alpha = np.full(len(dt), self.alpha)
+        alpha = np.maximum(alpha, 1e-4)
+
+        # angle[k] = alpha * (angle[k-1] + g * dt) + (1 - alpha) * angle_acc
+        roll = linear_recurrence(alpha, alpha * gx * dt + (1 - alpha) * roll_acc, self.roll_deg)
+        pitch = linear_recurrence(alpha, alpha * gy * dt + (1 - alpha) * pitch_acc, self.pitch_deg)
+        yaw = self.yaw_deg + np.cumsum(gz * dt)
+        return roll, pitch, yaw
+
+
+class MadgwickFilter(AttitudeEstimator):
+    """Кватернионный фильтр Маджвика (гироскоп + акселерометр).
+
+    Даёт roll, pitch и yaw; без магнитометра рыскание — интеграл
+    гироскопа и медленно уходит. beta — вес коррекции по акселерометру.
+    Нормировка и перевод единиц делаются для блока в NumPy, сама
+    рекурсия — цикл по отсчётам на скалярах.
+    """
+
+    def __init__(self, beta=0.1, rate=None, max_dt=0.1):
+        self.beta = beta
+        super().__init__(rate=rate, max_dt=max_dt)
+
+    def reset(self):
+        super().reset()
+        self.q = (1.0, 0.0, 0.0, 0.0)
+
+    def _process(self, block, dt):
+        g = np.radians(np.stack([block['gx'], block['gy'], block['gz']]).astype(np.float64))
+        a = np.stack([block['ax'], block['ay'], block['az']]).astype(np.float64)
+        norm = np.sqrt((a * a).sum(axis=0))
+        valid = norm > 1e-9
+        a[:, valid] /= norm[valid]
+
+        quats = np.empty((4, len(dt)))
+        q0, q1, q2, q3 = self.q
+        beta = self.beta
+        rows = zip(g[0].tolist(), g[1].tolist(), g[2].tolist(),
+                   a[0].tolist(), a[1].tolist(), a[2].tolist(),
+                   valid.tolist(), dt.tolist())
+        for k, (gx, gy, gz, ax, ay, az, ok, h) in enumerate(rows):
+            # Производная кватерниона по гироскопу
+            d0 = 0.5 * (-q1 * gx - q2 * gy - q3 * gz)
+            d1 = 0.5 * (q0 * gx + q2 * gz - q3 * gy)
+            d2 = 0.5 * (q0 * gy - q1 * gz + q3 * gx)
+            d3 = 0.5 * (q0 * gz + q1 * gy - q2 * gx)
+            if ok:
+                # Шаг градиентного спуска к направлению g
+                s0 = 4 * q0 * q2 * q2 + 2 * q2 * ax + 4 * q0 * q1 * q1 - 2 * q1 * ay
+                s1 = (4 * q1 * q3 * q3 - 2 * q3 * ax + 4 * q0 * q0 * q1 - 2 * q0 * ay - 4 * q1
+                      + 8 * q1 * q1 * q1 + 8 * q1 * q2 * q2 + 4 * q1 * az)
+                s2 = (4 * q0 * q0 * q2 + 2 * q0 * ax + 4 * q2 * q3 * q3 - 2 * q3 * ay - 4 * q2
+                      + 8 * q2 * q1 * q1 + 8 * q2 * q2 * q2 + 4 * q2 * az)
+                s3 = 4 * q1 * q1 * q3 - 2 * q1 * ax + 4 * q2 * q2 * q3 - 2 * q2 * ay
+                sn = math.sqrt(s0 * s0 + s1 * s1 + s2 * s2 + s3 * s3)
+                if sn > 0.0:
+                    d0 -= beta * s0 / sn
+                    d1 -= beta * s1 / sn
+                    d2 -= beta * s2 / sn
+                    d3 -= beta * s3 / sn
+            q0 += d0 * h
+            q1 += d1 * h
+            q2 += d2 * h
+            q3 += d3 * h
+            qn = math.sqrt(q0 * q0 + q1 * q1 + q2 * q2 + q3 * q3)
+            q0, q1, q2, q3 = q0 / qn, q1 / qn, q2 / qn, q3 / qn
+            quats[0, k] = q0
+            quats[1, k] = q1
+            quats[2, k] = q2
+            quats[3, k] = q3
+        self.q = (q0, q1, q2, q3)
+        return quaternion_to_euler(quats)
+
+
+def quaternion_to_euler(q):
+    """(roll, pitch, yaw) в градусах из массива кватернионов формы (4, n)"""
+    q0, q1, q2, q3 = q
+    roll = np.degrees(np.arctan2(2 * (q0 * q1 + q2 * q3), 1 - 2 * (q1 * q1 + q2 * q2)))
+    pitch = np.degrees(np.arcsin(np.clip(2 * (q0 * q2 - q3 * q1), -1.0, 1.0)))
+    yaw = np.degrees(np.arctan2(2 * (q0 * q3 + q1 * q2), 1 - 2 * (q2 * q2 + q3 * q3)))
+    return roll, pitch, yaw
+
+
+ESTIMATORS = {
+    'complementary': ComplementaryFilter,
+    'madgwick': MadgwickFilter,
+}
@@ -0,0 +1,128 @@
+"""Инкрементальный автомасштаб осей графиков"""
+from collections import deque
+
+import numpy as np
+
+from imu.decoder import CHANNELS
+
+
+class SlidingExtrema:
+    """Минимум и максимум по скользящему окну для каждого канала.
+
+    Монотонные очереди: добавление отсчёта — O(1) в среднем, запрос
+    минимума/максимума — O(1). Блоки предварительно сокращаются в NumPy:
+    в очередь попадают только отсчёты, не перекрытые более поздними.
+    """
+
+    def __init__(self, window, channels=CHANNELS):
+        self.channels = tuple(channels)
+        self.window = int(window)
+        self._min = [deque() for _ in self.channels]
+        self._max = [deque() for _ in self.channels]
+        self.total = 0
+
+    def clear(self):
+        for q in self._min + self._max:
+            q.clear()
+        self.total = 0
+
+    def set_window(self, window, history=None):
+        """Сменить длину окна; history (RingBuffer) — для пересчёта с нуля"""
+        self.window = int(window)
+        self.clear()
+        if history is not None and len(history):
+            self.total = history.total - min(len(history), self.window)
+            self.extend(history.last(self.window).T)
+
+    def append(self, values):
+        """Добавить один отсчёт (значения в порядке channels)"""
+        index = self.total
+        self.total += 1
+        expired = self.total - self.window
+        for q_min, q_max, value in zip(self._min, self._max, values):
+            while q_min and q_min[-1][1] >= value:
+                q_min.pop()
+            q_min.append((index, value))
+            while q_max and q_max[-1][1] <= value:
+                q_max.pop()
+            q_max.append((index, value))
+            if q_min[0][0] < expired:
+                q_min.popleft()
+            if q_max[0][0] < expired:
+                q_max.popleft()
+
+    def extend(self, block):
+        """Добавить блок (структурированный массив или (n, channels))"""
+        n = len(block)
+        if n == 0:
+            return
+        start = self.total
+        self.total += n
+        expired = self.total - self.window
+        if n > self.window:
+            block = block[-self.window:]
+            start = self.total - self.window
+        for i, name in enumerate(self.channels):
+            values = block[name] if block.dtype.names else block[:, i]
+            self._push(self._min[i], values, start, expired, np.minimum, np.greater_equal)
+            self._push(self._max[i], values, start, expired, np.maximum, np.less_equal)
+
+    @staticmethod
+    def _push(q, values, start, expired, accumulate, dominated):
+        # Остаются только отсчёты, строго лучшие всех более поздних в блоке
+        tail = accumulate.accumulate(values[::-1])[::-1]
+        keep = np.ones(len(values), dtype=bool)
+        keep[:-1] = ~dominated(values[:-1], tail[1:])
+        idx = np.flatnonzero(keep)
+        first = values[idx[0]]
+        while q and dominated(q[-1][1], first):
+            q.pop()
+        q.extend(zip((idx + start).tolist(), values[idx].tolist()))
+        while q[0][0] < expired:
+            q.popleft()
+
+    def range(self, channels=None):
+        """(min, max) по окну для указанных каналов или None, если данных нет"""
+        names = self.channels if channels is None else channels
+        lows, highs = [], []
+        for name in names:
+            i = self.channels.index(name)
+            if self._min[i]:
+                lows.append(self._min[i][0][1])
+                highs.append(self._max[i][0][1])
+        if not lows:
+            return None
+        return min(lows), max(highs)
+
+
+class AxisAutoscaler:
+    """Диапазон оси с запасом и гистерезисом.
+
+    Ось расширяется сразу, как только данные выходят за её пределы, а
+    сужается, только когда нужный диапазон меньше текущего более чем на
+    долю hysteresis, — так ось не дрожит от кадра к кадру.
+    """
+
+    def __init__(self, margin=0.1, hysteresis=0.3, min_span=1e-3):
+        self.margin = margin
+        self.hysteresis = hysteresis
+        self.min_span = min_span
+        self.low = None
+        self.high = None
+
+    def reset(self):
+        self.low = None
+        self.high = None
+
+    def update(self, data_min, data_max):
+        """Пересчитать диапазон; возвращает True, если он изменился"""
+        span = max(data_max - data_min, self.min_span)
+        low = data_min - span * self.margin
+        high = data_max + span * self.margin
+        if self.low is not None:
+            inside = self.low <= data_min and data_max <= self.high
+            too_wide = (self.high - self.low) > (high - low) * (1 + self.hysteresis)
+            if inside and not too_wide:
+                return False
+        self.low, self.high = low, high
+        return True
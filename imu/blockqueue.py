@@ -0,0 +1,116 @@
+"""Ограниченная очередь блоков между потоком чтения и потребителем (без Qt)"""
+import threading
+import time
+from collections import deque
+
+POLICIES = ('drop_oldest', 'drop_newest', 'block')
+
+
+class BlockQueue:
+    """Очередь блоков (массивов или кортежей) на одного производителя
+    и одного потребителя с ограничением по числу отсчётов.
+
+    capacity — сколько отсчётов может ждать потребителя. При переполнении:
+    drop_oldest — выбрасываются самые старые блоки, drop_newest — новый
+    блок, block — производитель ждёт, пока потребитель освободит место
+    (без потерь; блок больше capacity принимается в пустую очередь).
+
+    on_ready() вызывается производителем, когда в очереди появились данные
+    и потребитель ещё не был уведомлён; флаг снимает get_all(). Так на
+    одну выборку приходится не больше одного уведомления.
+
+    Счётчики: overflows — сколько раз очередь была полна, dropped_blocks /
+    dropped_samples — потери, high_water — наибольшая заполненность,
+    blocked_time — сколько секунд производитель ждал места.
+    """
+
+    def __init__(self, capacity=100_000, policy='drop_oldest', on_ready=None):
+        if policy not in POLICIES:
+            raise ValueError(f"Неизвестная политика очереди: {policy}")
+        if capacity <= 0:
+            raise ValueError("capacity должен быть положительным")
+        self.capacity = int(capacity)
+        self.policy = policy
+        self.on_ready = on_ready
+        self.closed = False
+        self._items = deque()  # (элемент, размер)
+        self._size = 0
+        self._cond = threading.Condition()
+        self._notified = False
+        self.overflows = 0
+        self.dropped_blocks = 0
+        self.dropped_samples = 0
+        self.high_water = 0
+        self.blocked_time = 0.0
+
+    def __len__(self):
+        """Число ждущих отсчётов"""
+        return self._size
+
+    def put(self, item, size=None):
+        """Добавить блок; False — блок отброшен (drop_newest) или очередь закрыта"""
+        n = len(item) if size is None else int(size)
+        with self._cond:
+            if self.closed:
+                return False
+            if self._items and self._size + n > self.capacity:
+                self.overflows += 1
+                if self.policy == 'drop_newest':
+                    self.dropped_blocks += 1
+                    self.dropped_samples += n
+                    return False
+                if self.policy == 'drop_oldest':
+                    while self._items and self._size + n > self.capacity:
+                        _, old = self._items.popleft()
+                        self._size -= old
+                        self.dropped_blocks += 1
+                        self.dropped_samples += old
+                else:
+                    t0 = time.perf_counter()
+                    while self._items and self._size + n > self.capacity and not self.closed:
+                        self._cond.wait()
+                    self.blocked_time += time.perf_counter() - t0
+                    if self.closed:
+                        return False
+            self._items.append((item, n))
+            self._size += n
+            if self._size > self.high_water:
+                self.high_water = self._size
+            self._cond.notify_all()
+            notify = self.on_ready is not None and not self._notified
+            self._notified = True
+        if notify:
+            self.on_ready()
+        return True
+
+    def get_all(self, timeout=None):
+        """Забрать все ждущие блоки (список в порядке поступления).
+
+        timeout — сколько ждать, если очередь пуста (None — не ждать).
+        """
+        with self._cond:
+            self._notified = False
+            if not self._items and timeout and not self.closed:
+                self._cond.wait(timeout)
+            items = [item for item, _ in self._items]
+            self._items.clear()
+            self._size = 0
+            self._cond.notify_all()
+            return items
+
+    def close(self):
+        """Закрыть очередь: ждущий производитель освобождается, новые блоки не принимаются"""
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+    def counters(self):
+        return {
+            'policy': self.policy,
+            'depth': self._size,
+            'high_water': self.high_water,
+            'overflows': self.overflows,
+            'dropped_blocks': self.dropped_blocks,
+            'dropped_samples': self.dropped_samples,
+            'blocked_s': round(self.blocked_time, 3),
+        }
@@ -0,0 +1,228 @@
+"""Потоковая статистика каналов и калибровка датчиков (без Qt).
+
+ChannelStats ведёт по каждому каналу среднее и дисперсию (Уэлфорд,
+блоки сливаются формулой Чана), минимум/максимум и девиацию Аллана на
+октавных τ = 2^k отсчётов. Всё обновляется блоками в NumPy; на отсчёт
+приходится O(1) работы в среднем.
+
+Calibration — аффинная поправка: гироскоп g' = G (g − b_g),
+акселерометр a' = A (a − b_a), где диагональ матриц — масштаб, а
+внедиагональные элементы — перекосы осей. Применяется к блоку отсчётов
+на месте в потоке чтения, до фильтра ориентации, записи и графиков.
+
+PoseCalibrator собирает средние по неподвижным положениям и подбирает
+поправку методом наименьших квадратов: гироскоп в покое должен
+показывать ноль, акселерометр — ускорение свободного падения вдоль той
+оси, что смотрит вверх (или вниз).
+"""
+import json
+
+import numpy as np
+
+from imu.decoder import CHANNELS
+
+GRAVITY = 9.80665
+GYRO = CHANNELS[0:3]
+ACCEL = CHANNELS[3:6]
+
+
+class ChannelStats:
+    """Потоковые среднее, дисперсия, экстремумы и девиация Аллана.
+
+    levels — число октав τ для девиации Аллана (τ = 2^k / rate,
+    k = 0…levels-1). Кластерные средние каждого уровня получаются
+    попарным усреднением средних предыдущего; на уровне копится сумма
+    квадратов разностей соседних средних (неперекрывающаяся оценка).
+    """
+
+    def __init__(self, channels=CHANNELS, levels=16):
+        self.channels = tuple(channels)
+        self.levels = int(levels)
+        self.reset()
+
+    def reset(self):
+        n = len(self.channels)
+        self.count = 0
+        self.mean = np.zeros(n)
+        self._m2 = np.zeros(n)
+        self.min = np.full(n, np.inf)
+        self.max = np.full(n, -np.inf)
+        self._previous = [None] * self.levels  # последнее среднее уровня
+        self._carry = [np.empty((n, 0)) for _ in range(self.levels)]  # непарный остаток
+        self._allan_sum = np.zeros((self.levels, n))
+        self._allan_count = np.zeros(self.levels, dtype=np.int64)
+
+    @property
+    def variance(self):
+        """Несмещённая дисперсия (NaN, пока отсчётов меньше двух)"""
+        if self.count < 2:
+            return np.full(len(self.channels), np.nan)
+        return self._m2 / (self.count - 1)
+
+    @property
+    def std(self):
+        return np.sqrt(self.variance)
+
+    def update(self, data):
+        """Добавить отсчёты: массив (channels, n) или структурированный блок"""
+        if data.dtype.names:
+            data = np.stack([data[name] for name in self.channels])
+        data = np.asarray(data, dtype=np.float64)
+        n = data.shape[1]
+        if not n:
+            return
+        # Слияние (count, mean, M2) с блоком — формула Чана
+        block_mean = data.mean(axis=1)
+        block_m2 = ((data - block_mean[:, None]) ** 2).sum(axis=1)
+        total = self.count + n
+        delta = block_mean - self.mean
+        self.mean = self.mean + delta * (n / total)
+        self._m2 = self._m2 + block_m2 + delta ** 2 * (self.count * n / total)
+        self.count = total
+        np.minimum(self.min, data.min(axis=1), out=self.min)
+        np.maximum(self.max, data.max(axis=1), out=self.max)
+
+        values = data
+        for level in range(self.levels):
+            if not values.shape[1]:
+                break
+            previous = self._previous[level]
+            chain = values if previous is None else np.concatenate((previous, values), axis=1)
+            if chain.shape[1] > 1:
+                diff = np.diff(chain, axis=1)
+                self._allan_sum[level] += (diff ** 2).sum(axis=1)
+                self._allan_count[level] += diff.shape[1]
+            self._previous[level] = values[:, -1:]
+            # Средние следующего уровня — по парам (с остатком прошлого блока)
+            values = np.concatenate((self._carry[level], values), axis=1)
+            pairs = values.shape[1] // 2
+            self._carry[level] = values[:, 2 * pairs:]
+            values = 0.5 * (values[:, 0:2 * pairs:2] + values[:, 1:2 * pairs:2])
+
+    def allan(self, rate):
+        """(τ, с (k,), девиация Аллана (k, channels)) по уровням, где есть данные"""
+        used = self._allan_count > 0
+        tau = 2.0 ** np.arange(self.levels)[used] / rate
+        adev = np.sqrt(self._allan_sum[used] / (2.0 * self._allan_count[used, None]))
+        return tau, adev
+
+    def summary(self):
+        """Словарь канал → count/mean/std/min/max"""
+        std = self.std
+        return {name: {'count': self.count, 'mean': float(self.mean[k]), 'std': float(std[k]),
+                       'min': float(self.min[k]), 'max': float(self.max[k])}
+                for k, name in enumerate(self.channels)}
+
+
+class Calibration:
+    """Аффинная поправка гироскопа и акселерометра (по умолчанию — тождественная)"""
+
+    def __init__(self, gyro_bias=None, gyro_matrix=None, accel_bias=None, accel_matrix=None):
+        self.gyro_bias = np.zeros(3) if gyro_bias is None else np.asarray(gyro_bias, dtype=np.float64)
+        self.gyro_matrix = np.eye(3) if gyro_matrix is None else np.asarray(gyro_matrix, dtype=np.float64)
+        self.accel_bias = np.zeros(3) if accel_bias is None else np.asarray(accel_bias, dtype=np.float64)
+        self.accel_matrix = np.eye(3) if accel_matrix is None else np.asarray(accel_matrix, dtype=np.float64)
+
+    def apply(self, block):
+        """Исправить блок (поля gx…az) на месте; возвращает его же"""
+        for names, bias, matrix in ((GYRO, self.gyro_bias, self.gyro_matrix),
+                                    (ACCEL, self.accel_bias, self.accel_matrix)):
+            raw = np.stack([block[name] for name in names]).astype(np.float64)
+            corrected = matrix @ (raw - bias[:, None])
+            for k, name in enumerate(names):
+                block[name] = corrected[k]
+        return block
+
+    def then(self, other):
+        """Поправка «сначала self, потом other» одной аффинной поправкой.
+
+        A2 (A1 (x − b1) − b2) = A2 A1 (x − (b1 + A1⁻¹ b2)).
+        """
+        def combine(b1, a1, b2, a2):
+            return b1 + np.linalg.solve(a1, b2), a2 @ a1
+        gyro_bias, gyro_matrix = combine(self.gyro_bias, self.gyro_matrix,
+                                         other.gyro_bias, other.gyro_matrix)
+        accel_bias, accel_matrix = combine(self.accel_bias, self.accel_matrix,
+                                           other.accel_bias, other.accel_matrix)
+        return Calibration(gyro_bias, gyro_matrix, accel_bias, accel_matrix)
+
+    def to_dict(self):
+        return {
+            'gyro_bias': self.gyro_bias.tolist(),
+            'gyro_matrix': self.gyro_matrix.tolist(),
+            'accel_bias': self.accel_bias.tolist(),
+            'accel_matrix': self.accel_matrix.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data.get('gyro_bias'), data.get('gyro_matrix'),
+                   data.get('accel_bias'), data.get('accel_matrix'))
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    @classmethod
+    def load(cls, path):
+        """Поправка из JSON-файла (OSError, ValueError — файл не читается)"""
+        with open(path, encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+
+
+class PoseCalibrator:
+    """Сбор неподвижных положений и расчёт Calibration.
+
+    add_pose(stats) принимает ChannelStats, накопленный, пока датчик
+    лежал неподвижно; положение отвергается (ValueError), если разброс
+    гироскопа или акселерометра больше порогов. Для акселерометра нужно
+    не меньше четырёх положений с разными осями вверх, лучше шесть
+    (каждая ось вверх и вниз); с меньшим числом считается только
+    смещение гироскопа.
+    """
+
+    def __init__(self, gravity=GRAVITY, gyro_std_limit=1.0, accel_std_limit=0.2, min_samples=200):
+        self.gravity = gravity
+        self.gyro_std_limit = gyro_std_limit
+        self.accel_std_limit = accel_std_limit
+        self.min_samples = min_samples
+        self.poses = []  # (средние гироскопа (3,), средние акселерометра (3,))
+
+    def add_pose(self, stats):
+        if stats.count < self.min_samples:
+            raise ValueError(f"Мало отсчётов: {stats.count} < {self.min_samples}")
+        index = {name: k for k, name in enumerate(stats.channels)}
+        gyro = [index[name] for name in GYRO]
+        accel = [index[name] for name in ACCEL]
+        std = stats.std
+        if np.max(std[gyro]) > self.gyro_std_limit or np.max(std[accel]) > self.accel_std_limit:
+            raise ValueError("Датчик двигался: разброс больше порога")
+        self.poses.append((stats.mean[gyro].copy(), stats.mean[accel].copy()))
+        return len(self.poses)
+
+    def clear(self):
+        self.poses = []
+
+    def solve(self):
+        """Calibration по собранным положениям (ValueError — данных мало)"""
+        if not self.poses:
+            raise ValueError("Нет ни одного положения")
+        gyro = np.array([g for g, _ in self.poses])
+        accel = np.array([a for _, a in self.poses])
+        calibration = Calibration(gyro_bias=gyro.mean(axis=0))
+        if len(self.poses) < 4:
+            return calibration
+        # Опорный вектор: g вдоль оси с наибольшим по модулю показанием
+        axis = np.abs(accel).argmax(axis=1)
+        reference = np.zeros_like(accel)
+        reference[np.arange(len(accel)), axis] = np.sign(accel[np.arange(len(accel)), axis]) * self.gravity
+        # reference ≈ M a + c — 12 неизвестных, линейные наименьшие квадраты
+        design = np.hstack((accel, np.ones((len(accel), 1))))
+        solution, _, rank, _ = np.linalg.lstsq(design, reference, rcond=None)
+        if rank < 4:
+            raise ValueError("Положения лежат в одной плоскости — нужны разные оси вверх")
+        matrix = solution[:3].T
+        offset = solution[3]
+        calibration.accel_matrix = matrix
+        calibration.accel_bias = -np.linalg.solve(matrix, offset)
+        return calibration
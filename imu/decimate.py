@@ -0,0 +1,33 @@
+"""Прореживание рядов для отрисовки"""
+import numpy as np
+
+
+def minmax_decimate(y, buckets, x=None):
+    """Min/max-прореживание ряда до 2 * buckets точек.
+
+    Ряд делится на buckets корзин (обычно — по ширине графика в пикселях),
+    из каждой берутся минимум и максимум в порядке их следования, поэтому
+    пики не теряются. Возвращает (x, y); если точек мало — ряд как есть.
+    """
+    y = np.asarray(y)
+    n = len(y)
+    if x is None:
+        x = np.arange(n, dtype=np.float64)
+    buckets = int(buckets)
+    if buckets <= 0 or n <= 2 * buckets:
+        return np.asarray(x, dtype=np.float64), y.astype(np.float64)
+
+    # Дополняем ряд последним значением до кратной длины
+    size = -(-n // buckets)
+    padded = np.empty(size * buckets, dtype=y.dtype)
+    padded[:n] = y
+    padded[n:] = y[-1]
+    grid = padded.reshape(buckets, size)
+
+    base = np.arange(buckets) * size
+    i_min = np.minimum(base + grid.argmin(axis=1), n - 1)
+    i_max = np.minimum(base + grid.argmax(axis=1), n - 1)
+    idx = np.empty(2 * buckets, dtype=np.intp)
+    idx[0::2] = np.minimum(i_min, i_max)
+    idx[1::2] = np.maximum(i_min, i_max)
+    return np.asarray(x, dtype=np.float64)[idx], y[idx].astype(np.float64)
@@ -0,0 +1,354 @@
+"""Пакетный декодер кадров IMU.
+
+Кадр описывается FrameSchema: заголовок, длина, поля (dtype и смещение)
+и контрольная сумма. Схема компилируется в структурированный dtype
+кадра, поэтому серии кадров в буфере разбираются через np.frombuffer
+без копирования. Кадр по умолчанию (RIM1A) — 34 байта: заголовок
+0xBD 0xDB 0x0A, шесть float32 (little-endian) gx, gy, gz, ax, ay, az,
+6 служебных байт и XOR-сумма первых 33 байт. Другие схемы и выбор
+схемы по потоку — в imu.protocols.
+"""
+import numpy as np
+
+PACKET_SIZE = 34
+HEADER = b'\xBD\xDB\x0A'
+CHANNELS = ('gx', 'gy', 'gz', 'ax', 'ay', 'az')
+
+# Раскладка одного декодированного отсчёта
+SAMPLE_DTYPE = np.dtype([(name, '<f4') for name in CHANNELS])
+
+# Отсчёт с временем хоста (с, эпоха Unix) — так их выдаёт DataReader
+TIMED_DTYPE = np.dtype([('t', '<f8')] + [(name, '<f4') for name in CHANNELS])
+
+
+# Контрольные суммы по байтам кадра до поля суммы: (count, n) uint8 → (count,) uint8
+CHECKSUMS = {
+    'xor': lambda raw: np.bitwise_xor.reduce(raw, axis=1),
+    'sum8': lambda raw: raw.sum(axis=1, dtype=np.uint32).astype(np.uint8),
+    None: None,
+}
+
+
+class FrameSchema:
+    """Описание кадра одной версии прошивки.
+
+    header — байты заголовка, size — длина кадра, fields — [(имя, dtype,
+    смещение)] полей отсчёта, checksum — алгоритм из CHECKSUMS (или None)
+    над байтами [0, checksum_offset), сумма — один байт по смещению
+    checksum_offset (по умолчанию последний). Поля сверх CHANNELS
+    (температура, счётчик…) доходят до графиков и записи как есть.
+    counter — имя целого поля со счётчиком кадров прошивки (+1 за кадр,
+    переполняется): по нему находятся потерянные кадры (imu.timing).
+    """
+
+    def __init__(self, name, header, size, fields, checksum='xor', checksum_offset=None,
+                 description="", counter=None):
+        if checksum not in CHECKSUMS:
+            raise ValueError(f"Неизвестная контрольная сумма: {checksum}")
+        self.name = name
+        self.header = bytes(header)
+        self.size = int(size)
+        self.fields = tuple((field, np.dtype(fmt), int(offset)) for field, fmt, offset in fields)
+        self.checksum = checksum
+        self.checksum_offset = self.size - 1 if checksum_offset is None else int(checksum_offset)
+        self.description = description
+        if not self.header:
+            raise ValueError("Пустой заголовок кадра")
+        for field, fmt, offset in self.fields:
+            if offset < len(self.header) or offset + fmt.itemsize > self.size:
+                raise ValueError(f"Поле {field} выходит за пределы кадра")
+        missing = [name for name in CHANNELS if name not in self.names]
+        if missing:
+            raise ValueError(f"В схеме {name} нет каналов: {', '.join(missing)}")
+        self.counter = counter
+        if counter is not None:
+            kinds = {field: fmt.kind for field, fmt, _ in self.fields}
+            if kinds.get(counter) not in ('u', 'i'):
+                raise ValueError(f"Счётчик {counter} должен быть целым полем схемы")
+
+        names = ['header'] + list(self.names)
+        formats = [f'{len(self.header)}u1'] + [fmt for _, fmt, _ in self.fields]
+        offsets = [0] + [offset for _, _, offset in self.fields]
+        if checksum is not None:
+            names.append('checksum')
+            formats.append('u1')
+            offsets.append(self.checksum_offset)
+        # Раскладка кадра целиком — смотрит на буфер без копирования
+        self.packet_dtype = np.dtype({'names': names, 'formats': formats,
+                                      'offsets': offsets, 'itemsize': self.size})
+        # Отсчёт и отсчёт с временем хоста (каналы — первыми, как в TIMED_DTYPE)
+        ordered = list(CHANNELS) + [name for name in self.names if name not in CHANNELS]
+        formats = {field: fmt for field, fmt, _ in self.fields}
+        self.sample_dtype = np.dtype([(name, formats[name]) for name in ordered])
+        self.timed_dtype = np.dtype([('t', '<f8')] + self.sample_dtype.descr)
+        self._header_array = np.frombuffer(self.header, dtype=np.uint8)
+
+    @property
+    def names(self):
+        return tuple(field for field, _, _ in self.fields)
+
+    @property
+    def counter_bits(self):
+        """Разрядность счётчика кадров (None — счётчика нет)"""
+        if self.counter is None:
+            return None
+        return self.sample_dtype[self.counter].itemsize * 8
+
+    @property
+    def extra_fields(self):
+        """Поля сверх шести каналов"""
+        return tuple(name for name in self.sample_dtype.names if name not in CHANNELS)
+
+    def valid(self, raw):
+        """Маска кадров с верной суммой; raw — байты кадров (count, size)"""
+        if self.checksum is None:
+            return np.ones(len(raw), dtype=bool)
+        return CHECKSUMS[self.checksum](raw[:, :self.checksum_offset]) == raw[:, self.checksum_offset]
+
+    def encode(self, samples):
+        """Упаковка отсчётов в байты кадров с корректной суммой.
+
+        Недостающие в samples поля схемы заполняются нулями.
+        """
+        samples = np.asarray(samples)
+        frames = np.zeros(len(samples), dtype=self.packet_dtype)
+        frames['header'] = self._header_array
+        for name in self.names:
+            if name in samples.dtype.names:
+                frames[name] = samples[name]
+        if self.checksum is not None:
+            raw = frames.view(np.uint8).reshape(-1, self.size)
+            raw[:, self.checksum_offset] = CHECKSUMS[self.checksum](raw[:, :self.checksum_offset])
+        return frames.tobytes()
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'header': self.header.hex(),
+            'size': self.size,
+            'fields': [[field, fmt.str, offset] for field, fmt, offset in self.fields],
+            'checksum': self.checksum,
+            'checksum_offset': self.checksum_offset,
+            'description': self.description,
+            'counter': self.counter,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Схема из JSON-описания (см. to_dict); header — hex-строка"""
+        return cls(data['name'], bytes.fromhex(data['header']), data['size'],
+                   [tuple(field) for field in data['fields']], data.get('checksum', 'xor'),
+                   data.get('checksum_offset'), data.get('description', ""),
+                   data.get('counter'))
+
+    def __repr__(self):
+        return f"FrameSchema({self.name!r}, {self.size} байт)"
+
+
+RIM1A = FrameSchema('rim1a', HEADER, PACKET_SIZE,
+                    [(name, '<f4', 3 + 4 * k) for k, name in enumerate(CHANNELS)],
+                    description="34 байта: 6 × float32, 6 служебных байт, XOR")
+
+
+def to_timed(block):
+    """Блок только с полями TIMED_DTYPE (копия, если в нём есть поля протокола)"""
+    if block.dtype == TIMED_DTYPE:
+        return block
+    timed = np.empty(len(block), dtype=TIMED_DTYPE)
+    for name in TIMED_DTYPE.names:
+        timed[name] = block[name]
+    return timed
+
+
+def find_headers(arr, header=HEADER):
+    """Индексы всех позиций, с которых начинается заголовок"""
+    n = len(header)
+    if len(arr) < n:
+        return np.empty(0, dtype=np.intp)
+    mask = arr[:len(arr) - n + 1] == header[0]
+    for k in range(1, n):
+        mask &= arr[k:len(arr) - n + 1 + k] == header[k]
+    return np.flatnonzero(mask)
+
+
+def encode_packets(samples, schema=RIM1A):
+    """Упаковка отсчётов (SAMPLE_DTYPE) в байты кадров с корректной суммой"""
+    return schema.encode(samples)
+
+
+def detect_schema(data, schemas, min_frames=8):
+    """Схема, под которую подходит больше всего байт data (или None).
+
+    Каждая схема пробно разбирает data; побеждает та, чьи верные кадры
+    покрывают больше байт. Схема не годится, если верных кадров меньше
+    min_frames или ошибок суммы не меньше, чем верных кадров.
+    """
+    best, best_bytes = None, 0
+    for schema in schemas:
+        decoder = PacketDecoder(schema)
+        count = len(decoder.feed(data))
+        if count < min_frames or decoder.checksum_errors >= count:
+            continue
+        if count * schema.size > best_bytes:
+            best, best_bytes = schema, count * schema.size
+    return best
+
+
+class PacketDecoder:
+    """Потоковый декодер: принимает куски байт, возвращает массив отсчётов.
+
+    schema — FrameSchema кадра. Если schema=None, а candidates заданы,
+    схема выбирается по первым DETECT_BYTES байт потока (detect_schema)
+    и держится до reset(); до выбора feed() копит байты и отдаёт пустой
+    массив.
+
+    Буфер не перекопируется на каждый кадр — вместо этого хранится
+    текущее смещение, а обработанная часть отрезается разом.
+
+    Счётчики: checksum_errors — отброшенные кадры, resync_bytes —
+    пропущенные при поиске заголовка байты, high_water — наибольшее
+    число неразобранных байт в буфере. undetected — схема не выбрана,
+    хотя байт для выбора уже хватало (поток не похож ни на одну схему).
+    """
+
+    # Порог, после которого обработанные байты удаляются из буфера
+    COMPACT_THRESHOLD = 1 << 16
+    # Сколько байт потока смотреть при выборе схемы (и предел ожидания)
+    DETECT_BYTES = 1024
+    DETECT_LIMIT = 1 << 16
+
+    def __init__(self, schema=RIM1A, candidates=()):
+        self.fixed_schema = schema
+        self.candidates = tuple(candidates)
+        self.reset()
+
+    def reset(self):
+        self.schema = self.fixed_schema
+        self.buffer = bytearray()
+        self.offset = 0
+        self.checksum_errors = 0
+        self.resync_bytes = 0
+        self.high_water = 0
+
+    @property
+    def sample_dtype(self):
+        return (self.schema or RIM1A).sample_dtype
+
+    @property
+    def undetected(self):
+        return self.schema is None and self.pending() + self.resync_bytes >= self.DETECT_BYTES
+
+    def pending(self):
+        """Количество ещё не разобранных байт"""
+        return len(self.buffer) - self.offset
+
+    def feed(self, chunk):
+        """Добавить байты и разобрать все полные кадры.
+
+        Возвращает np.ndarray с dtype schema.sample_dtype (кадры с неверной
+        контрольной суммой отбрасываются).
+        """
+        if chunk:
+            self.buffer.extend(chunk)
+        pending = self.pending()
+        if pending > self.high_water:
+            self.high_water = pending
+        if self.schema is None and not self._detect():
+            return np.empty(0, dtype=self.sample_dtype)
+        schema = self.schema
+        size = schema.size
+        if pending < size:
+            return np.empty(0, dtype=schema.sample_dtype)
+        runs = self._locate_frames()
+
+        # Серии кадров лежат в буфере подряд — смотрим на них без копирования
+        blocks = []
+        for start, count in runs:
+            frames = np.frombuffer(self.buffer, dtype=schema.packet_dtype,
+                                   count=count, offset=start)
+            raw = frames.view(np.uint8).reshape(count, size)
+            valid = schema.valid(raw)
+            block = np.empty(count, dtype=schema.sample_dtype)
+            for name in schema.sample_dtype.names:
+                block[name] = frames[name]
+            if valid.all():
+                blocks.append(block)
+            else:
+                self.checksum_errors += count - int(valid.sum())
+                blocks.append(block[valid])
+            del frames, raw
+        self._compact()
+        if not blocks:
+            return np.empty(0, dtype=schema.sample_dtype)
+        return blocks[0] if len(blocks) == 1 else np.concatenate(blocks)
+
+    def _detect(self):
+        """Выбрать схему по накопленным байтам; False — байт пока мало"""
+        pending = self.pending()
+        if pending < self.DETECT_BYTES:
+            return False
+        schema = detect_schema(bytes(self.buffer[self.offset:]), self.candidates)
+        if schema is None:
+            if pending >= self.DETECT_LIMIT:
+                # Поток не похож ни на одну схему: старые байты — в пропущенные
+                self.resync_bytes += pending - self.DETECT_BYTES
+                self.offset += pending - self.DETECT_BYTES
+                self._compact()
+            return False
+        self.schema = schema
+        return True
+
+    def _locate_frames(self):
+        """Найти серии кадров (начало, количество) и сдвинуть смещение.
+
+        Поведение совпадает с побайтовым поиском: если на текущей позиции
+        заголовок — забираем кадр целиком, иначе пропускаем байт.
+        """
+        size = self.schema.size
+        header = self.schema.header
+        header_array = self.schema._header_array
+        arr = np.frombuffer(self.buffer, dtype=np.uint8)[self.offset:]
+        end = len(arr)
+        count = end // size
+        heads = arr[:count * size].reshape(count, size)[:, :len(header)]
+        if (heads == header_array).all():
+            # Быстрый путь: поток выровнен, все кадры идут подряд
+            del arr, heads
+            start = self.offset
+            self.offset += count * size
+            return [(start, count)]
+        del heads
+
+        headers = find_headers(arr, header)
+        is_header = np.zeros(end, dtype=bool)
+        is_header[headers] = True
+        del arr
+
+        runs = []
+        pos = 0
+        while end - pos >= size:
+            if not is_header[pos]:
+                # Ресинхронизация — переходим к следующему заголовку
+                i = np.searchsorted(headers, pos)
+                skip_to = int(headers[i]) if i < len(headers) else max(pos, end - (len(header) - 1))
+                self.resync_bytes += skip_to - pos
+                pos = skip_to
+                if i == len(headers):
+                    break
+                continue
+            # Серия кадров, идущих подряд с шагом size
+            count = (end - pos) // size
+            run = is_header[pos:pos + count * size:size]
+            broken = np.flatnonzero(~run)
+            n = int(broken[0]) if len(broken) else count
+            if n:
+                runs.append((self.offset + pos, n))
+            pos += n * size
+
+        self.offset += pos
+        return runs
+
+    def _compact(self):
+        if self.offset >= self.COMPACT_THRESHOLD or self.offset == len(self.buffer):
+            del self.buffer[:self.offset]
+            self.offset = 0
@@ -0,0 +1,231 @@
+"""Общее хранилище отсчётов нескольких устройств (без Qt).
+
+Каждый DataReader пишет в своё устройство прямо из потока чтения;
+GUI только читает снимки окон по таймеру. Блокировка у каждого
+устройства своя, поэтому потоки разных портов друг друга не ждут.
+"""
+import threading
+
+import numpy as np
+
+from imu.autoscale import SlidingExtrema
+from imu.decoder import TIMED_DTYPE
+from imu.ringbuffer import RingBuffer
+
+
+class Device:
+    """История одного устройства: каналы, метки времени хоста,
+    экстремумы окна графика и последние значения.
+
+    Дополнительные поля протокола (температура, счётчик…) хранятся
+    отдельно в extras (float64) — история шести каналов от них не зависит.
+    """
+
+    def __init__(self, name, capacity=100_000, window=500):
+        self.name = name
+        self.lock = threading.Lock()
+        self.history = RingBuffer(capacity)
+        self.times = RingBuffer(capacity, channels=('t',), dtype=np.float64)
+        self.extrema = SlidingExtrema(window)
+        self.extras = None  # RingBuffer дополнительных полей, если они есть
+        self.record_dtype = TIMED_DTYPE  # dtype блоков с полями протокола
+        self.latest = None    # последний отсчёт (запись TIMED_DTYPE)
+        self.attitude = None  # последняя оценка ориентации (ATTITUDE_DTYPE)
+
+    def __len__(self):
+        return len(self.history)
+
+    @property
+    def total(self):
+        return self.history.total
+
+    def extend(self, block):
+        """Добавить блок TIMED_DTYPE (вызывается из потока чтения)"""
+        if not len(block):
+            return
+        with self.lock:
+            self.history.extend(block)
+            self.times.extend(block)
+            self.extrema.extend(block)
+            if block.dtype != self.record_dtype:
+                self._set_record_dtype(block.dtype)
+            if self.extras is not None:
+                self.extras.extend(block)
+            self.latest = block[-1].copy()
+
+    def _set_record_dtype(self, dtype):
+        self.record_dtype = dtype
+        extra = tuple(name for name in dtype.names if name not in TIMED_DTYPE.names)
+        self.extras = RingBuffer(self.history.capacity, extra, dtype=np.float64) if extra else None
+
+    def set_attitude(self, attitude):
+        if len(attitude):
+            self.attitude = attitude[-1].copy()
+
+    def window(self, n):
+        """Копии последних n отсчётов: (метки времени (n,), каналы (channels, n))"""
+        with self.lock:
+            return self.times.last(n)[0].copy(), self.history.last(n).copy()
+
+    def extra_window(self, n):
+        """Как window(), но для дополнительных полей (None, если их нет)"""
+        with self.lock:
+            if self.extras is None:
+                return None
+            n = min(n, len(self.extras))
+            return self.times.last(n)[0].copy(), self.extras.last(n).copy()
+
+    def since(self, total, limit=None):
+        """Отсчёты, добавленные после первых total (не больше limit последних).
+
+        Возвращает (номер первого отданного отсчёта, метки времени (n,),
+        каналы (channels, n)) — копии. Номер больше total означает, что
+        часть отсчётов уже вытеснена из истории (или история очищена).
+        """
+        with self.lock:
+            n = max(min(self.history.total - total, len(self.history)), 0)
+            if limit is not None:
+                n = min(n, int(limit))
+            return (self.history.total - n, self.times.last(n)[0].copy(),
+                    self.history.last(n).copy())
+
+    def records(self):
+        """Копия всей истории записями (для экспорта) — с полями протокола"""
+        with self.lock:
+            t = self.times.last()[0]
+            data = self.history.last()
+            records = np.zeros(len(t), dtype=self.record_dtype)
+            records['t'] = t
+            for k, name in enumerate(self.history.channels):
+                records[name] = data[k]
+            if self.extras is not None:
+                # Поля, появившиеся позже начала истории, в начале — нули
+                extra = self.extras.last()
+                for k, name in enumerate(self.extras.channels):
+                    records[name][len(t) - extra.shape[1]:] = extra[k]
+        return records
+
+    def range(self, names):
+        with self.lock:
+            return self.extrema.range(names)
+
+    def set_window(self, window):
+        with self.lock:
+            self.extrema.set_window(window, self.history)
+
+    def clear(self):
+        with self.lock:
+            self.history.clear()
+            self.times.clear()
+            self.extrema.clear()
+            if self.extras is not None:
+                self.extras.clear()
+            self.latest = None
+            self.attitude = None
+
+
+class DeviceStore:
+    """Устройства по номерам; общая ёмкость истории и окно графика"""
+
+    def __init__(self, capacity=100_000, window=500):
+        self.capacity = capacity
+        self.window = window
+        self.devices = []
+
+    def __len__(self):
+        return len(self.devices)
+
+    def __getitem__(self, index):
+        return self.devices[index]
+
+    def __iter__(self):
+        return iter(self.devices)
+
+    def add(self, name):
+        """Новое устройство; возвращает его номер"""
+        self.devices.append(Device(name, self.capacity, self.window))
+        return len(self.devices) - 1
+
+    def remove(self, index):
+        del self.devices[index]
+
+    def clear(self):
+        """Очистить данные всех устройств (список устройств сохраняется)"""
+        for device in self.devices:
+            device.clear()
+
+    def set_window(self, window):
+        self.window = window
+        for device in self.devices:
+            device.set_window(window)
+
+    @property
+    def total(self):
+        return sum(device.total for device in self.devices)
+
+    def range(self, indices, names):
+        """(min, max) каналов names по окну сразу для нескольких устройств"""
+        ranges = [r for r in (self.devices[i].range(names) for i in indices) if r]
+        if not ranges:
+            return None
+        low, high = zip(*ranges)
+        return min(low), max(high)
+
+    def aligned(self, indices, n):
+        """Окна последних n отсчётов устройств в общей шкале по времени хоста.
+
+        Шкала — номера отсчётов первого (опорного) устройства; положения
+        отсчётов остальных получаются интерполяцией их меток времени по
+        меткам опорного, отсчёты вне его окна отбрасываются.
+        Возвращает список (x, каналы (channels, m)) в порядке indices.
+        """
+        result = []
+        ref_t = None
+        for index in indices:
+            t, data = self.devices[index].window(n)
+            if ref_t is None:
+                ref_t = t
+                result.append((np.arange(len(t), dtype=np.float64), data))
+                continue
+            if not len(ref_t) or not len(t):
+                result.append((np.empty(0), data[:, :0]))
+                continue
+            lo = np.searchsorted(t, ref_t[0], side='left')
+            hi = np.searchsorted(t, ref_t[-1], side='right')
+            x = np.interp(t[lo:hi], ref_t, np.arange(len(ref_t), dtype=np.float64))
+            result.append((x, data[:, lo:hi]))
+        return result
+
+    def extra_fields(self, indices):
+        """Дополнительные поля протокола устройств indices (без повторов, по порядку)"""
+        fields = []
+        for index in indices:
+            extras = self.devices[index].extras
+            for name in extras.channels if extras is not None else ():
+                if name not in fields:
+                    fields.append(name)
+        return fields
+
+    def extra_aligned(self, indices, n, field):
+        """Поле field последних n отсчётов в той же шкале, что и aligned().
+
+        Возвращает список (x, значения) в порядке indices; у устройств без
+        этого поля — пустые массивы.
+        """
+        result = []
+        ref_t = None
+        for index in indices:
+            device = self.devices[index]
+            if ref_t is None:
+                ref_t = device.window(n)[0]
+            window = device.extra_window(n)
+            if window is None or field not in device.extras.channels or not len(ref_t):
+                result.append((np.empty(0), np.empty(0)))
+                continue
+            t, data = window
+            values = data[device.extras.channels.index(field)]
+            lo = np.searchsorted(t, ref_t[0], side='left')
+            hi = np.searchsorted(t, ref_t[-1], side='right')
+            x = np.interp(t[lo:hi], ref_t, np.arange(len(ref_t), dtype=np.float64))
+            result.append((x, values[lo:hi]))
+        return result
@@ -0,0 +1,216 @@
+"""Экспорт записей в CSV, NPZ и (если установлены h5py / pyarrow) HDF5 и Parquet.
+
+Записи (структурированный массив TIMED_DTYPE — np.memmap записи или
+копия истории устройства) читаются кусками по chunk_size и сразу
+пишутся в файл, поэтому память не растёт с длиной сессии. Exporter
+выполняет экспорт в своём потоке и отдаёт прогресс через атрибуты,
+которые GUI опрашивает таймером.
+
+Запуск из командной строки:
+  python -m imu.export session.imurec session.csv [--format csv] [--chunk-size N]
+"""
+import argparse
+import json
+import os
+import threading
+import time
+import zipfile
+
+import numpy as np
+
+# Расширение файла → формат
+FORMATS = {'.csv': 'csv', '.npz': 'npz', '.h5': 'hdf5', '.hdf5': 'hdf5', '.parquet': 'parquet'}
+
+CHUNK_SIZE = 1 << 16
+
+
+class ExportCancelled(Exception):
+    """Экспорт прерван вызовом Exporter.cancel()"""
+
+
+def format_for(path):
+    """Формат по расширению файла (ValueError — неизвестное расширение)"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in FORMATS:
+        raise ValueError(f"Неизвестный формат файла: {ext or path}")
+    return FORMATS[ext]
+
+
+def _chunks(records, chunk_size, progress):
+    total = len(records)
+    for start in range(0, total, chunk_size):
+        chunk = np.asarray(records[start:start + chunk_size])
+        yield chunk
+        progress(min(start + chunk_size, total), total)
+
+
+def _write_csv(records, path, chunk_size, progress, meta):
+    names = records.dtype.names
+    # Время — с микросекундами, каналы — 9 значащих цифр (float32 без потерь)
+    row = ','.join('%.6f' if name == 't' else '%.9g' for name in names) + '\n'
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        f.write(','.join(names) + '\n')
+        for chunk in _chunks(records, chunk_size, progress):
+            f.write(''.join(map(row.__mod__, chunk.tolist())))
+
+
+def _write_npz(records, path, chunk_size, progress, meta):
+    """Один массив records (структурированный) и meta (JSON-строка) в .npz без сжатия"""
+    header = {'descr': np.lib.format.dtype_to_descr(records.dtype),
+              'fortran_order': False, 'shape': (len(records),)}
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_STORED, allowZip64=True) as archive:
+        with archive.open('records.npy', 'w', force_zip64=True) as f:
+            np.lib.format.write_array_header_2_0(f, header)
+            for chunk in _chunks(records, chunk_size, progress):
+                f.write(chunk.tobytes())
+        with archive.open('meta.npy', 'w') as f:
+            np.lib.format.write_array(f, np.array(json.dumps(meta, ensure_ascii=False)))
+
+
+def _write_hdf5(records, path, chunk_size, progress, meta):
+    try:
+        import h5py
+    except ImportError:
+        raise ImportError("Для экспорта в HDF5 нужен пакет h5py") from None
+    with h5py.File(path, 'w') as f:
+        dataset = f.create_dataset('records', shape=(len(records),), dtype=records.dtype,
+                                   chunks=(min(chunk_size, max(len(records), 1)),))
+        for key, value in meta.items():
+            dataset.attrs[key] = json.dumps(value, ensure_ascii=False)
+        start = 0
+        for chunk in _chunks(records, chunk_size, progress):
+            dataset[start:start + len(chunk)] = chunk
+            start += len(chunk)
+
+
+def _write_parquet(records, path, chunk_size, progress, meta):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Для экспорта в Parquet нужен пакет pyarrow") from None
+    names = records.dtype.names
+    schema = pa.schema([(name, pa.from_numpy_dtype(records.dtype[name])) for name in names],
+                       metadata={'imu': json.dumps(meta, ensure_ascii=False)})
+    with pq.ParquetWriter(path, schema) as writer:
+        for chunk in _chunks(records, chunk_size, progress):
+            # Каждый кусок — группа строк; колонки копируются из записи
+            writer.write_table(pa.table([np.ascontiguousarray(chunk[name]) for name in names],
+                                        schema=schema))
+
+
+WRITERS = {'csv': _write_csv, 'npz': _write_npz, 'hdf5': _write_hdf5, 'parquet': _write_parquet}
+
+
+def export_records(records, path, fmt=None, chunk_size=CHUNK_SIZE, progress=None, meta=None):
+    """Записать records в path кусками; fmt — по расширению, если не задан.
+
+    progress(готово, всего) вызывается после каждого куска и может
+    прервать экспорт исключением (см. Exporter.cancel). ImportError —
+    нет пакета для формата; при ошибке недописанный файл удаляется.
+    """
+    fmt = fmt or format_for(path)
+    if fmt not in WRITERS:
+        raise ValueError(f"Неизвестный формат: {fmt}")
+    try:
+        WRITERS[fmt](records, path, int(chunk_size), progress or (lambda done, total: None),
+                     dict(meta or {}))
+    except BaseException:
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+
+
+class Exporter:
+    """Экспорт в фоновом потоке.
+
+    done / total — прогресс в записях (читаются из любого потока),
+    finished — событие окончания, error — исключение или None,
+    cancelled — экспорт прерван. on_finished() вызывается в потоке
+    экспорта.
+    """
+
+    def __init__(self, records, path, fmt=None, chunk_size=CHUNK_SIZE, meta=None,
+                 on_finished=None):
+        self.records = records
+        self.path = path
+        self.fmt = fmt or format_for(path)
+        self.chunk_size = chunk_size
+        self.meta = meta
+        self.on_finished = on_finished
+        self.done = 0
+        self.total = len(records)
+        self.error = None
+        self.cancelled = False
+        self.elapsed = 0.0
+        self.finished = threading.Event()
+        self._cancel = False
+        self._thread = None
+
+    @property
+    def bytes(self):
+        """Объём экспортируемых записей в байтах (для MB/s)"""
+        return self.total * self.records.dtype.itemsize
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        self._cancel = True
+
+    def wait(self, timeout=None):
+        return self.finished.wait(timeout)
+
+    def _progress(self, done, total):
+        self.done = done
+        if self._cancel:
+            raise ExportCancelled()
+
+    def _run(self):
+        t0 = time.perf_counter()
+        try:
+            export_records(self.records, self.path, self.fmt, self.chunk_size,
+                           self._progress, self.meta)
+        except ExportCancelled:
+            self.cancelled = True
+        except Exception as e:
+            self.error = e
+        self.elapsed = time.perf_counter() - t0
+        self.finished.set()
+        if self.on_finished is not None:
+            self.on_finished()
+
+
+def main(argv=None):
+    from imu.recording import Recording
+
+    parser = argparse.ArgumentParser(description="Экспорт записи .imurec")
+    parser.add_argument('recording', help="файл записи .imurec")
+    parser.add_argument('out', help="файл .csv, .npz, .h5 или .parquet")
+    parser.add_argument('--format', choices=sorted(WRITERS), default=None,
+                        help="формат (по умолчанию — по расширению out)")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help="записей в куске")
+    args = parser.parse_args(argv)
+
+    try:
+        recording = Recording(args.recording)
+        exporter = Exporter(recording.records, args.out, args.format, args.chunk_size,
+                            meta=recording.meta)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    exporter.start()
+    while not exporter.wait(0.5):
+        print(f"\r{exporter.done}/{exporter.total} записей", end='', flush=True)
+    if exporter.error is not None:
+        print(f"\nОшибка экспорта: {exporter.error}")
+        return 1
+    mb = exporter.bytes / 1e6
+    print(f"\r{exporter.total} записей ({mb:.1f} МБ) за {exporter.elapsed:.2f} с "
+          f"— {mb / max(exporter.elapsed, 1e-9):.1f} МБ/с")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
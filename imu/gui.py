@@ -0,0 +1,1822 @@
+"""Графический интерфейс IMU Monitor (PyQt5 + QtChart)"""
+import math
+import os
+import threading
+import time
+
+import serial
+import serial.tools.list_ports
+from PyQt5.QtWidgets import (
+    QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
+    QPushButton, QLabel, QComboBox, QMessageBox, QFileDialog,
+    QGridLayout, QGroupBox, QSplitter, QTextEdit, QTabWidget,
+    QListWidget, QListWidgetItem, QTableWidget, QTableWidgetItem, QHeaderView,
+    QCheckBox, QMenu, QProgressDialog, QInputDialog, QSpinBox
+)
+from PyQt5.QtCore import QTimer, Qt, pyqtSignal, QObject, QRectF, QPointF
+from PyQt5.QtChart import QChart, QChartView, QLineSeries, QValueAxis, QLogValueAxis
+from PyQt5.QtGui import (
+    QColor, QPen, QFont, QPolygonF, QPainter, QBrush, QPainterPath, QFontMetrics,
+    QPixmap, QImage, QOpenGLContext, QOffscreenSurface
+)
+import numpy as np
+
+from imu.attitude import ESTIMATORS
+from imu.autoscale import AxisAutoscaler
+from imu.blockqueue import BlockQueue
+from imu.calibration import Calibration, ChannelStats, PoseCalibrator
+from imu.decoder import CHANNELS
+from imu.decimate import minmax_decimate
+from imu.devices import DeviceStore
+from imu.protocols import AUTO, DEFAULT, PROTOCOLS, resolve
+from imu.reader import DataReader
+from imu.sources import NetworkSource, SerialSource, SyntheticSource, parse_address
+from imu.spectrum import WelchSpectrum
+from imu.stats import Histogram
+
+
+def make_polygon(x, y):
+    """Сборка QPolygonF из массивов x, y одной записью в его память"""
+    polygon = QPolygonF(len(x))
+    if len(x):
+        ptr = polygon.data()
+        ptr.setsize(len(x) * 2 * np.dtype(np.float64).itemsize)
+        points = np.frombuffer(ptr, dtype=np.float64).reshape(-1, 2)
+        points[:, 0] = x
+        points[:, 1] = y
+    return polygon
+
+
+# Виртуальные «порты» в списке: генератор кадров, воспроизведение файла
+# и подписка на другой IMU Monitor (--serve)
+SIMULATOR_PORT = "Симулятор"
+REPLAY_PORT = "Файл…"
+NETWORK_PORT = "Сеть…"
+
+# Отрисовка графиков «Данные»: QPainter (software) или OpenGL
+PLOT_BACKENDS = ('auto', 'opengl', 'software')
+# Программные реализации OpenGL: быстрее QPainter они не рисуют,
+# поэтому в режиме auto считаются отсутствием OpenGL
+SOFTWARE_GL = ('llvmpipe', 'softpipe', 'software rasterizer', 'swiftshader')
+GL_RENDERER = 0x1F01
+
+
+def probe_opengl():
+    """(создаётся ли контекст OpenGL, строка GL_RENDERER или причина отказа)"""
+    context = QOpenGLContext()
+    if not context.create():
+        return False, "контекст OpenGL не создаётся"
+    surface = QOffscreenSurface()
+    surface.setFormat(context.format())
+    surface.create()
+    if not context.makeCurrent(surface):
+        return False, "контекст OpenGL не активируется"
+    try:
+        functions = context.versionFunctions()
+        renderer = functions.glGetString(GL_RENDERER) if functions is not None else None
+    except (AttributeError, TypeError, RuntimeError):
+        renderer = None
+    context.doneCurrent()
+    return True, renderer or "OpenGL"
+
+
+def choose_plot_backend(requested='auto'):
+    """('opengl' или 'software', пояснение) для запрошенного режима.
+
+    auto — OpenGL, только если он аппаратный; opengl — любой, что
+    создаётся (в том числе llvmpipe); без OpenGL — всегда software.
+    """
+    if requested == 'software':
+        return 'software', "выбрано"
+    ok, renderer = probe_opengl()
+    if not ok:
+        return 'software', renderer
+    if requested == 'auto' and any(name in renderer.lower() for name in SOFTWARE_GL):
+        return 'software', f"программный OpenGL ({renderer})"
+    return 'opengl', renderer
+
+
+# Цвета каналов X/Y/Z и стили линий, различающие устройства на графике
+CHANNEL_COLORS = ("red", "green", "blue")
+DEVICE_STYLES = (Qt.SolidLine, Qt.DashLine, Qt.DotLine, Qt.DashDotLine, Qt.DashDotDotLine)
+
+
+class SerialDataReader(QObject, DataReader):
+    """Поток чтения данных (см. DataReader) с уведомлениями через сигналы Qt.
+
+    Сами данные сигналами не передаются — очередь событий Qt ничем не
+    ограничена и растёт, пока GUI-поток занят. Потребитель берёт пачки
+    из своей ограниченной очереди (subscribe()), а сигнал
+    blocks_ready(queue) лишь сообщает, что в ней появились данные:
+    не больше одного необработанного уведомления на очередь.
+    """
+    blocks_ready = pyqtSignal(object)  # BlockQueue, в которой есть пачки
+    finished = pyqtSignal()  # источник закончился (конец файла)
+    
+    def __init__(self, batch_interval=0.02):
+        super().__init__(batch_interval=batch_interval)
+
+    def subscribe(self, capacity=100_000, policy='drop_oldest', name=None):
+        """Новая очередь потребителя; забирать пачки — queue.get_all()"""
+        queue = BlockQueue(capacity, policy)
+        queue.on_ready = lambda: self.blocks_ready.emit(queue)
+        return self.add_consumer(queue, name)
+
+    def deliver_finished(self):
+        self.finished.emit()
+
+
+class DataDisplayWidget(QWidget):
+    """Виджет для отображения текущих значений датчиков"""
+    def __init__(self):
+        super().__init__()
+        self.init_ui()
+    
+    def init_ui(self):
+        layout = QVBoxLayout(self)
+        
+        # Группа для гироскопа
+        gyro_group = QGroupBox("Гироскоп (°/с)")
+        gyro_layout = QGridLayout(gyro_group)
+        
+        self.gx_label = QLabel("0.00")
+        self.gy_label = QLabel("0.00")
+        self.gz_label = QLabel("0.00")
+        
+        gyro_layout.addWidget(QLabel("X:"), 0, 0)
+        gyro_layout.addWidget(self.gx_label, 0, 1)
+        gyro_layout.addWidget(QLabel("Y:"), 1, 0)
+        gyro_layout.addWidget(self.gy_label, 1, 1)
+        gyro_layout.addWidget(QLabel("Z:"), 2, 0)
+        gyro_layout.addWidget(self.gz_label, 2, 1)
+        
+        layout.addWidget(gyro_group)
+        
+        # Группа для акселерометра
+        acc_group = QGroupBox("Акселерометр (м/с²)")
+        acc_layout = QGridLayout(acc_group)
+        
+        self.ax_label = QLabel("0.00")
+        self.ay_label = QLabel("0.00")
+        self.az_label = QLabel("0.00")
+        
+        acc_layout.addWidget(QLabel("X:"), 0, 0)
+        acc_layout.addWidget(self.ax_label, 0, 1)
+        acc_layout.addWidget(QLabel("Y:"), 1, 0)
+        acc_layout.addWidget(self.ay_label, 1, 1)
+        acc_layout.addWidget(QLabel("Z:"), 2, 0)
+        acc_layout.addWidget(self.az_label, 2, 1)
+        
+        layout.addWidget(acc_group)
+
+        # Группа для ориентации (считается фильтром в потоке чтения)
+        att_group = QGroupBox("Ориентация (°)")
+        att_layout = QGridLayout(att_group)
+
+        self.roll_label = QLabel("0.0")
+        self.pitch_label = QLabel("0.0")
+        self.yaw_label = QLabel("0.0")
+
+        att_layout.addWidget(QLabel("Крен:"), 0, 0)
+        att_layout.addWidget(self.roll_label, 0, 1)
+        att_layout.addWidget(QLabel("Тангаж:"), 1, 0)
+        att_layout.addWidget(self.pitch_label, 1, 1)
+        att_layout.addWidget(QLabel("Рыскание:"), 2, 0)
+        att_layout.addWidget(self.yaw_label, 2, 1)
+
+        layout.addWidget(att_group)
+        
+        # Настройка шрифтов
+        font = QFont()
+        font.setPointSize(12)
+        font.setBold(True)
+        
+        for label in [self.gx_label, self.gy_label, self.gz_label, 
+                     self.ax_label, self.ay_label, self.az_label,
+                     self.roll_label, self.pitch_label, self.yaw_label]:
+            label.setFont(font)
+            label.setStyleSheet("color: #2E8B57; background-color: #F0F8FF; padding: 5px; border: 1px solid #ccc;")
+    
+    def update_data(self, data):
+        """Обновление отображаемых данных"""
+        self.gx_label.setText(f"{data['gx']:.2f}")
+        self.gy_label.setText(f"{data['gy']:.2f}")
+        self.gz_label.setText(f"{data['gz']:.2f}")
+        self.ax_label.setText(f"{data['ax']:.2f}")
+        self.ay_label.setText(f"{data['ay']:.2f}")
+        self.az_label.setText(f"{data['az']:.2f}")
+
+    def update_attitude(self, roll, pitch, yaw):
+        """Обновление углов ориентации"""
+        self.roll_label.setText(f"{roll:.1f}")
+        self.pitch_label.setText(f"{pitch:.1f}")
+        self.yaw_label.setText(f"{yaw:.1f}")
+
+
+class StatsWidget(QWidget):
+    """Таблица счётчиков потоков чтения и время кадра GUI"""
+
+    COLUMNS = (
+        ("Устройство", None),
+        ("Пакетов/с", lambda r: r['packets_per_s']),
+        ("КБ/с", lambda r: None if r['bytes_per_s'] is None else r['bytes_per_s'] / 1024),
+        ("Пакетов", lambda r: r['packets']),
+        ("Протокол", lambda r: "не определён" if r.get('protocol_undetected') else r.get('protocol')),
+        ("Ошибки КС", lambda r: r['checksum_errors']),
+        ("Ресинхр., байт", lambda r: r['resync_bytes']),
+        ("Макс. буфер, байт", lambda r: r['buffer_high_water']),
+        ("Очередь (макс.)", lambda r: f"{r['queue_depth']} ({r['queue_high_water']})"),
+        ("Ошибки чтения", lambda r: r['read_errors']),
+        ("Частота, Гц", lambda r: r.get('rate_hz')),
+        ("Джиттер, мс", lambda r: r.get('jitter_ms')),
+        ("Уход, ppm", lambda r: r.get('drift_ppm')),
+        ("Потеряно кадров", lambda r: None if r.get('lost_packets') is None
+            else f"{r['lost_packets']} ({r['sequence_gaps']})"),
+        ("Потери очередей", lambda r: sum(q['dropped_samples'] for q in r['queues'].values())),
+        ("Потери кольца", lambda r: r.get('ring_lost')),
+        ("Ожидание записи, с", lambda r: r['queues'].get('recorder', {}).get('blocked_s')),
+        ("Декод. p50/p99, мкс", lambda r: f"{r['decode_us']['p50']} / {r['decode_us']['p99']}"),
+    )
+
+    def __init__(self):
+        super().__init__()
+        layout = QVBoxLayout(self)
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels([title for title, _ in self.COLUMNS])
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        layout.addWidget(self.table)
+        self.render_label = QLabel("Кадр GUI: —")
+        layout.addWidget(self.render_label)
+
+    def update_stats(self, reports, render):
+        """reports — [(имя устройства, PipelineStats.report())], render — Histogram.summary"""
+        self.table.setRowCount(len(reports))
+        for row, (name, report) in enumerate(reports):
+            for column, (_, value) in enumerate(self.COLUMNS):
+                value = name if value is None else value(report)
+                if isinstance(value, float):
+                    value = f"{value:,.1f}"
+                self.table.setItem(row, column, QTableWidgetItem("—" if value is None else str(value)))
+        if render['count']:
+            self.render_label.setText(
+                f"Кадр GUI: p50 {render['p50']} мс, p99 {render['p99']} мс, "
+                f"макс. {render['max']} мс ({render['count']} кадров)")
+
+
+class SpectrumWidget(QWidget):
+    """Спектр по Уэлчу всех шести каналов и водопад одного канала.
+
+    Отсчёты выбранного устройства забираются из его истории начиная с
+    последнего обработанного (Device.since), поэтому за кадр считаются
+    только новые сегменты; график и картинка водопада перерисовываются,
+    лишь когда сегменты появились. Линии спектра прореживаются до ширины
+    графика, водопад — заранее выделенный буфер строк, выводимый как
+    QImage с палитрой.
+    """
+    LENGTHS = (256, 512, 1024, 2048, 4096, 8192)
+    OVERLAPS = (0, 25, 50, 75)
+    DYNAMIC_RANGE_DB = 80.0
+
+    def __init__(self):
+        super().__init__()
+        layout = QVBoxLayout(self)
+        controls = QHBoxLayout()
+        controls.addWidget(QLabel("Длина сегмента:"))
+        self.length_combo = QComboBox()
+        for length in self.LENGTHS:
+            self.length_combo.addItem(str(length), length)
+        self.length_combo.setCurrentText("1024")
+        controls.addWidget(self.length_combo)
+        controls.addWidget(QLabel("Перекрытие:"))
+        self.overlap_combo = QComboBox()
+        for overlap in self.OVERLAPS:
+            self.overlap_combo.addItem(f"{overlap} %", overlap / 100.0)
+        self.overlap_combo.setCurrentText("50 %")
+        controls.addWidget(self.overlap_combo)
+        controls.addWidget(QLabel("Водопад:"))
+        self.channel_combo = QComboBox()
+        self.channel_combo.addItems(CHANNELS)
+        controls.addWidget(self.channel_combo)
+        controls.addStretch()
+        layout.addLayout(controls)
+        for combo in (self.length_combo, self.overlap_combo, self.channel_combo):
+            combo.currentIndexChanged.connect(self.reset)
+
+        self.chart = QChart()
+        self.chart.setTitle("Спектральная плотность мощности")
+        self.chart.legend().setAlignment(Qt.AlignRight)
+        axis_x = QValueAxis()
+        axis_x.setTitleText("Частота, Гц")
+        axis_y = QLogValueAxis()
+        axis_y.setLabelFormat("%.0e")
+        self.chart.addAxis(axis_x, Qt.AlignBottom)
+        self.chart.addAxis(axis_y, Qt.AlignLeft)
+        self.series = []
+        for k, name in enumerate(CHANNELS):
+            series = QLineSeries()
+            series.setName(name)
+            pen = QPen(QColor(CHANNEL_COLORS[k % 3]))
+            pen.setStyle(Qt.SolidLine if k < 3 else Qt.DashLine)
+            series.setPen(pen)
+            self.chart.addSeries(series)
+            series.attachAxis(axis_x)
+            series.attachAxis(axis_y)
+            self.series.append(series)
+        self.chart_view = QChartView(self.chart)
+        layout.addWidget(self.chart_view, 3)
+
+        self.waterfall_label = QLabel()
+        self.waterfall_label.setMinimumHeight(120)
+        self.waterfall_label.setAlignment(Qt.AlignCenter)
+        layout.addWidget(self.waterfall_label, 2)
+        # Палитра водопада: тёмно-синий → голубой → жёлтый → белый
+        stops = (0.0, 0.35, 0.7, 1.0)
+        colors = np.array([(0, 0, 80), (0, 160, 230), (255, 230, 0), (255, 255, 255)])
+        levels = np.linspace(0.0, 1.0, 256)
+        rgb = [np.interp(levels, stops, colors[:, c]) for c in range(3)]
+        self._palette = [QColor(int(r), int(g), int(b)).rgb() for r, g, b in zip(*rgb)]
+        self._image_data = None  # буфер под QImage должен жить, пока живёт картинка
+
+        self.analyzer = None
+        self._device = None
+        self._cursor = 0
+        self.reset()
+
+    def reset(self):
+        """Новый анализатор с текущими настройками; данные набираются заново"""
+        self.analyzer = WelchSpectrum(nperseg=self.length_combo.currentData(),
+                                      overlap=self.overlap_combo.currentData(),
+                                      waterfall_channel=self.channel_combo.currentIndex())
+        self._device = None
+
+    def update_device(self, device):
+        """Обработать новые отсчёты устройства; перерисовка, если есть новые сегменты"""
+        analyzer = self.analyzer
+        if device is not self._device:
+            self._device = device
+            self._cursor = device.total
+            analyzer.reset()
+        # После паузы (вкладка была закрыта) хватает хвоста истории
+        limit = analyzer.nperseg + analyzer.step * analyzer.max_segments
+        start, t, data = device.since(self._cursor, limit)
+        if start != self._cursor:
+            analyzer.reset()
+        self._cursor = start + len(t)
+        if analyzer.feed(data, t):
+            self.render()
+
+    def render(self):
+        freqs, psd = self.analyzer.psd()
+        psd = np.maximum(psd, 1e-12)
+        buckets = max(int(self.chart.plotArea().width()), 1)
+        for series, row in zip(self.series, psd):
+            series.replace(make_polygon(*minmax_decimate(row, buckets, freqs)))
+        axis_x, axis_y = self.chart.axes(Qt.Horizontal)[0], self.chart.axes(Qt.Vertical)[0]
+        axis_x.setRange(0.0, float(freqs[-1]))
+        low, high = np.log10(psd[:, 1:].min()), np.log10(psd.max())
+        axis_y.setRange(10.0 ** math.floor(low), 10.0 ** math.ceil(high))
+
+        # Водопад: новые строки сверху, дБ → индексы палитры
+        rows = self.analyzer.waterfall()[::-1]
+        top = float(rows.max())
+        scaled = (rows - (top - self.DYNAMIC_RANGE_DB)) * (255.0 / self.DYNAMIC_RANGE_DB)
+        self._image_data = np.ascontiguousarray(np.clip(scaled, 0, 255).astype(np.uint8))
+        height, width = self._image_data.shape
+        image = QImage(self._image_data.data, width, height, width, QImage.Format_Indexed8)
+        image.setColorTable(self._palette)
+        size = self.waterfall_label.size()
+        self.waterfall_label.setPixmap(QPixmap.fromImage(image).scaled(
+            size.width(), size.height(), Qt.IgnoreAspectRatio, Qt.FastTransformation))
+
+
+class CalibrationWidget(QWidget):
+    """Потоковая статистика каналов выбранного устройства и калибровка.
+
+    Среднее, СКО, минимум и максимум с начала сбора и девиация Аллана
+    по октавным τ (ChannelStats). «Добавить положение» копит отсчёты
+    POSE_SECONDS секунд в отдельную статистику и передаёт её
+    PoseCalibrator; «Рассчитать» подбирает поправку и сообщает её
+    сигналом calibration_changed(устройство, Calibration или None).
+    Отсчёты уже исправлены текущей поправкой, поэтому новая поправка
+    накладывается поверх неё (Calibration.then).
+    """
+    POSE_SECONDS = 2.0
+    calibration_changed = pyqtSignal(object, object)
+
+    def __init__(self):
+        super().__init__()
+        layout = QVBoxLayout(self)
+        buttons = QHBoxLayout()
+        self.reset_btn = QPushButton("Сбросить статистику")
+        self.reset_btn.clicked.connect(self.reset_stats)
+        buttons.addWidget(self.reset_btn)
+        self.pose_btn = QPushButton("Добавить положение")
+        self.pose_btn.clicked.connect(self.start_pose)
+        buttons.addWidget(self.pose_btn)
+        self.solve_btn = QPushButton("Рассчитать")
+        self.solve_btn.clicked.connect(self.solve)
+        buttons.addWidget(self.solve_btn)
+        self.clear_btn = QPushButton("Сбросить калибровку")
+        self.clear_btn.clicked.connect(self.clear_calibration)
+        buttons.addWidget(self.clear_btn)
+        self.save_btn = QPushButton("Сохранить…")
+        self.save_btn.clicked.connect(self.save_calibration)
+        buttons.addWidget(self.save_btn)
+        self.load_btn = QPushButton("Загрузить…")
+        self.load_btn.clicked.connect(self.load_calibration)
+        buttons.addWidget(self.load_btn)
+        buttons.addStretch()
+        layout.addLayout(buttons)
+        self.status_label = QLabel()
+        layout.addWidget(self.status_label)
+
+        self.table = QTableWidget(len(CHANNELS), 5)
+        self.table.setHorizontalHeaderLabels(["Среднее", "СКО", "Мин.", "Макс.", "Аллан мин."])
+        self.table.setVerticalHeaderLabels(CHANNELS)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        layout.addWidget(self.table, 1)
+
+        self.chart = QChart()
+        self.chart.setTitle("Девиация Аллана")
+        self.chart.legend().setAlignment(Qt.AlignRight)
+        axis_x = QLogValueAxis()
+        axis_x.setTitleText("τ, с")
+        axis_x.setLabelFormat("%g")
+        axis_y = QLogValueAxis()
+        axis_y.setLabelFormat("%.0e")
+        self.chart.addAxis(axis_x, Qt.AlignBottom)
+        self.chart.addAxis(axis_y, Qt.AlignLeft)
+        self.series = []
+        for k, name in enumerate(CHANNELS):
+            series = QLineSeries()
+            series.setName(name)
+            pen = QPen(QColor(CHANNEL_COLORS[k % 3]))
+            pen.setStyle(Qt.SolidLine if k < 3 else Qt.DashLine)
+            series.setPen(pen)
+            self.chart.addSeries(series)
+            series.attachAxis(axis_x)
+            series.attachAxis(axis_y)
+            self.series.append(series)
+        layout.addWidget(QChartView(self.chart), 2)
+
+        self.stats = ChannelStats()
+        self.calibrator = PoseCalibrator()
+        self.calibration = None  # поправка выбранного устройства
+        self.rate = None  # частота отсчётов по меткам времени, Гц
+        self._pose = None  # статистика текущего положения
+        self._device = None
+        self._cursor = 0
+        self.update_status()
+
+    def set_device(self, device, calibration):
+        """Сменить устройство: статистика и положения собираются заново"""
+        self._device = device
+        self._cursor = device.total if device is not None else 0
+        self.calibration = calibration
+        self.stats.reset()
+        self.calibrator.clear()
+        self._pose = None
+        self.update_status()
+
+    def update_device(self, device):
+        """Добавить в статистику новые отсчёты выбранного устройства"""
+        if device is not self._device:
+            return
+        start, t, data = device.since(self._cursor)
+        if start != self._cursor:
+            # Отсчёты пропущены (очистка, переполнение истории) — Аллан по
+            # разрывам неверен, начинаем заново
+            self.stats.reset()
+        self._cursor = start + len(t)
+        if len(t) < 2:
+            return
+        if t[-1] > t[0]:
+            self.rate = (len(t) - 1) / (t[-1] - t[0])
+        self.stats.update(data)
+        if self._pose is not None:
+            self._pose.update(data)
+
+    def render(self):
+        stats = self.stats
+        std = stats.std
+        tau, adev = stats.allan(self.rate) if self.rate else (np.empty(0), np.empty((0, len(CHANNELS))))
+        for row in range(len(CHANNELS)):
+            values = (stats.mean[row], std[row], stats.min[row], stats.max[row],
+                      adev[:, row].min() if len(adev) else float('nan'))
+            for column, value in enumerate(values):
+                text = "—" if not stats.count or not np.isfinite(value) else f"{value:.5g}"
+                self.table.setItem(row, column, QTableWidgetItem(text))
+        if len(tau) < 2:
+            return
+        positive = adev[adev > 0]
+        if not len(positive):
+            return
+        for series, column in zip(self.series, adev.T):
+            series.replace(make_polygon(tau, np.maximum(column, positive.min())))
+        axis_x, axis_y = self.chart.axes(Qt.Horizontal)[0], self.chart.axes(Qt.Vertical)[0]
+        axis_x.setRange(tau[0], tau[-1])
+        axis_y.setRange(10.0 ** math.floor(np.log10(positive.min())),
+                        10.0 ** math.ceil(np.log10(positive.max())))
+
+    def update_status(self, message=None):
+        text = f"Положений: {len(self.calibrator.poses)}; поправка: "
+        text += "задана" if self.calibration is not None else "нет"
+        if message:
+            text += f" — {message}"
+        self.status_label.setText(text)
+
+    def reset_stats(self):
+        self.stats.reset()
+
+    def start_pose(self):
+        """Положите устройство неподвижно и нажмите — сбор POSE_SECONDS секунд"""
+        if self._device is None:
+            return
+        self._pose = ChannelStats(levels=1)
+        self.pose_btn.setEnabled(False)
+        self.update_status("сбор положения, не двигайте устройство…")
+        QTimer.singleShot(int(self.POSE_SECONDS * 1000), self.finish_pose)
+
+    def finish_pose(self):
+        pose, self._pose = self._pose, None
+        self.pose_btn.setEnabled(True)
+        if pose is None:
+            return
+        try:
+            self.calibrator.add_pose(pose)
+            self.update_status("положение добавлено")
+        except ValueError as e:
+            self.update_status(str(e))
+
+    def solve(self):
+        try:
+            correction = self.calibrator.solve()
+        except ValueError as e:
+            self.update_status(str(e))
+            return
+        if self.calibration is not None:
+            correction = self.calibration.then(correction)
+        self.set_calibration(correction, "поправка рассчитана")
+
+    def set_calibration(self, calibration, message=None):
+        self.calibration = calibration
+        self.calibrator.clear()
+        self.stats.reset()
+        self.update_status(message)
+        self.calibration_changed.emit(self._device, calibration)
+
+    def clear_calibration(self):
+        self.set_calibration(None, "поправка снята")
+
+    def save_calibration(self):
+        if self.calibration is None:
+            return
+        filename, _ = QFileDialog.getSaveFileName(
+            self, "Сохранить калибровку", "", "JSON (*.json);;All Files (*)")
+        if not filename:
+            return
+        try:
+            self.calibration.save(filename)
+        except OSError as e:
+            QMessageBox.critical(self, "Ошибка", f"Не удалось сохранить:\n{e}")
+
+    def load_calibration(self):
+        if self._device is None:
+            return
+        filename, _ = QFileDialog.getOpenFileName(
+            self, "Загрузить калибровку", "", "JSON (*.json);;All Files (*)")
+        if not filename:
+            return
+        try:
+            calibration = Calibration.load(filename)
+        except (OSError, ValueError) as e:
+            QMessageBox.critical(self, "Ошибка", f"Не удалось загрузить:\n{e}")
+            return
+        self.set_calibration(calibration, "поправка загружена")
+
+
+class TimelineChartView(QChartView):
+    """График обзора: колесо — масштаб вокруг курсора, перетаскивание — сдвиг.
+
+    Сам график не перерисовывается: view_changed(доля сдвига, множитель
+    масштаба, доля положения курсора) обрабатывает TimelineWidget.
+    """
+    view_changed = pyqtSignal(float, float, float)
+
+    def __init__(self, chart):
+        super().__init__(chart)
+        self._drag_x = None
+
+    def _fraction(self, x):
+        area = self.chart().plotArea()
+        return min(max((x - area.left()) / max(area.width(), 1.0), 0.0), 1.0)
+
+    def wheelEvent(self, event):
+        zoom = 0.8 ** (event.angleDelta().y() / 120.0)
+        self.view_changed.emit(0.0, zoom, self._fraction(event.pos().x()))
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.LeftButton:
+            self._drag_x = event.pos().x()
+
+    def mouseMoveEvent(self, event):
+        if self._drag_x is None:
+            return
+        shift = (self._drag_x - event.pos().x()) / max(self.chart().plotArea().width(), 1.0)
+        self._drag_x = event.pos().x()
+        self.view_changed.emit(shift, 1.0, 0.0)
+
+    def mouseReleaseEvent(self, event):
+        self._drag_x = None
+
+
+class TimelineWidget(QWidget):
+    """Обзор записанной сессии любой длины по min/max-пирамиде.
+
+    Видимый диапазон [t0, t1] (с от начала записи) при каждом изменении
+    запрашивается у Pyramid.view() примерно в ширину графика точек,
+    так что перерисовка одинаково быстрая и для минуты, и для часов.
+    Пирамида строится (или берётся готовой рядом с файлом) в фоновом
+    потоке.
+    """
+
+    def __init__(self):
+        super().__init__()
+        layout = QVBoxLayout(self)
+        controls = QHBoxLayout()
+        self.open_btn = QPushButton("Открыть запись…")
+        self.open_btn.clicked.connect(self.open_recording)
+        controls.addWidget(self.open_btn)
+        self.all_btn = QPushButton("Весь файл")
+        self.all_btn.clicked.connect(self.show_all)
+        controls.addWidget(self.all_btn)
+        self.info_label = QLabel("Запись не открыта")
+        controls.addWidget(self.info_label, 1)
+        layout.addLayout(controls)
+
+        self.views = []
+        self.series = []
+        for title, names in (("Гироскоп (°/с)", CHANNELS[0:3]), ("Акселерометр (м/с²)", CHANNELS[3:6])):
+            chart = QChart()
+            chart.setTitle(title)
+            chart.legend().setAlignment(Qt.AlignRight)
+            axis_x = QValueAxis()
+            axis_x.setTitleText("Время, с")
+            chart.addAxis(axis_x, Qt.AlignBottom)
+            chart.addAxis(QValueAxis(), Qt.AlignLeft)
+            for name, color in zip(names, CHANNEL_COLORS):
+                series = QLineSeries()
+                series.setName(name)
+                series.setPen(QPen(QColor(color), 1))
+                chart.addSeries(series)
+                series.attachAxis(axis_x)
+                series.attachAxis(chart.axes(Qt.Vertical)[0])
+                self.series.append(series)
+            view = TimelineChartView(chart)
+            view.view_changed.connect(self.change_view)
+            layout.addWidget(view)
+            self.views.append(view)
+
+        self.pyramid = None
+        self.name = ""
+        self.start = 0.0      # время первой записи (эпоха)
+        self.duration = 0.0   # длительность записи, с
+        self.t0 = self.t1 = 0.0
+        self._loading = None  # (поток, результат) построения пирамиды
+        self._load_timer = QTimer(self)
+        self._load_timer.timeout.connect(self.check_loaded)
+
+    def open_recording(self, filename=None):
+        if not filename:
+            filename, _ = QFileDialog.getOpenFileName(
+                self, "Обзор записи", "", "IMU Recording (*.imurec);;All Files (*)")
+            if not filename:
+                return
+        from imu.recording import Recording
+        try:
+            recording = Recording(filename)
+        except (OSError, ValueError) as e:
+            QMessageBox.critical(self, "Ошибка", f"Не удалось открыть файл:\n{e}")
+            return
+        result = {'done': 0, 'total': len(recording)}
+
+        def load():
+            from imu.pyramid import open_pyramid
+            try:
+                result['pyramid'] = open_pyramid(
+                    recording, progress=lambda done, total: result.__setitem__('done', done))
+            except Exception as e:
+                result['error'] = e
+
+        thread = threading.Thread(target=load, daemon=True)
+        self._loading = (thread, result, filename)
+        self.open_btn.setEnabled(False)
+        thread.start()
+        self._load_timer.start(100)
+
+    def check_loaded(self):
+        thread, result, filename = self._loading
+        if thread.is_alive():
+            total = max(result['total'], 1)
+            self.info_label.setText(f"Построение пирамиды: {100 * result['done'] // total} %")
+            return
+        self._load_timer.stop()
+        self._loading = None
+        self.open_btn.setEnabled(True)
+        if 'error' in result:
+            self.info_label.setText("Запись не открыта")
+            QMessageBox.critical(self, "Ошибка", f"Не удалось построить обзор:\n{result['error']}")
+            return
+        self.pyramid = result['pyramid']
+        self.start, end = self.pyramid.time_range
+        self.duration = max(end - self.start, 1e-3)
+        self.name = os.path.basename(filename)
+        self.show_all()
+
+    def show_all(self):
+        self.set_range(0.0, self.duration)
+
+    def change_view(self, shift, zoom, anchor):
+        """Сдвиг на долю окна и/или масштаб вокруг точки anchor (доля окна)"""
+        span = self.t1 - self.t0
+        if not span:
+            return
+        t0 = self.t0 + shift * span
+        center = t0 + anchor * span
+        new_span = span * zoom
+        self.set_range(center - anchor * new_span, center + (1.0 - anchor) * new_span)
+
+    def set_range(self, t0, t1):
+        if self.pyramid is None:
+            return
+        span = min(max(t1 - t0, 1e-3), self.duration)
+        t0 = min(max(t0, 0.0), self.duration - span)
+        self.t0, self.t1 = t0, t0 + span
+        self.redraw()
+
+    def redraw(self):
+        from imu.pyramid import envelope  # уже загружен вместе с пирамидой
+        width = max(int(self.views[0].chart().plotArea().width()), 100)
+        t, low, high = self.pyramid.view(self.start + self.t0, self.start + self.t1, width)
+        x, y = envelope(t - self.start, low, high)
+        for series, row in zip(self.series, y):
+            series.replace(make_polygon(x, row))
+        for k, view in enumerate(self.views):
+            chart = view.chart()
+            chart.axes(Qt.Horizontal)[0].setRange(self.t0, self.t1)
+            rows = y[3 * k:3 * k + 3]
+            if rows.size:
+                lo, hi = float(rows.min()), float(rows.max())
+                margin = max(hi - lo, 1e-3) * 0.05
+                chart.axes(Qt.Vertical)[0].setRange(lo - margin, hi + margin)
+        raw = len(t) and low is high
+        self.info_label.setText(
+            f"{self.name}: {self.t0:.3f}–{self.t1:.3f} с из {self.duration:.1f} с; "
+            + ("сырые отсчёты" if raw else f"корзины min/max: {len(t)}"))
+
+
+class HorizonWidget(QWidget):
+    """Простой искусственный горизонт в круглой рамке.
+    Использует roll (крен) и pitch (тангаж) в градусах.
+
+    Статические слои (рамка, шкала крена, самолётик) и «картинка мира»
+    с небом, землёй и шкалой тангажа рисуются в QPixmap один раз при
+    изменении размера. Кадр — это три drawPixmap, причём картинка мира
+    только сдвигается по тангажу и поворачивается по крену. Перерисовка
+    не чаще частоты обновления экрана.
+    """
+    PITCH_LIMIT = 45.0
+
+    def __init__(self):
+        super().__init__()
+        self.roll_deg = 0.0
+        self.pitch_deg = 0.0
+        self.setMinimumSize(300, 300)
+        self._layers = None  # (размер, фон, мир, накладка, геометрия)
+
+        # Перерисовка не чаще раза за кадр экрана
+        self._frame_timer = QTimer(self)
+        self._frame_timer.setSingleShot(True)
+        self._frame_timer.setInterval(self._frame_interval_ms())
+        self._frame_timer.timeout.connect(self.update)
+
+    def _frame_interval_ms(self):
+        screen = QApplication.primaryScreen()
+        rate = screen.refreshRate() if screen is not None else 60.0
+        return max(int(1000.0 / (rate or 60.0)), 1)
+
+    def set_attitude(self, roll_deg, pitch_deg):
+        pitch_deg = max(min(pitch_deg, self.PITCH_LIMIT), -self.PITCH_LIMIT)  # ограничим тангаж
+        if roll_deg == self.roll_deg and pitch_deg == self.pitch_deg:
+            return
+        self.roll_deg = roll_deg
+        self.pitch_deg = pitch_deg
+        if not self._frame_timer.isActive():
+            self._frame_timer.start()
+
+    def resizeEvent(self, event):
+        self._layers = None
+        super().resizeEvent(event)
+
+    def paintEvent(self, event):
+        if self._layers is None or self._layers[0] != self.size():
+            self._layers = self._build_layers()
+        _, background, world, overlay, (center, inner_rect, pitch_px_per_deg) = self._layers
+
+        painter = QPainter(self)
+        painter.drawPixmap(0, 0, background)
+
+        # Картинка мира: сдвиг по тангажу и поворот по крену
+        clip_path = QPainterPath()
+        clip_path.addRoundedRect(inner_rect, 28, 28)
+        painter.save()
+        painter.setRenderHint(QPainter.SmoothPixmapTransform)
+        painter.setClipPath(clip_path)
+        painter.translate(center)
+        painter.rotate(self.roll_deg)
+        painter.translate(0, -self.pitch_deg * pitch_px_per_deg)
+        dpr = world.devicePixelRatio()
+        painter.drawPixmap(QPointF(-world.width() / dpr / 2, -world.height() / dpr / 2), world)
+        painter.restore()
+
+        painter.drawPixmap(0, 0, overlay)
+        painter.end()
+
+    def _new_layer(self, width, height):
+        dpr = self.devicePixelRatioF()
+        pixmap = QPixmap(int(math.ceil(width * dpr)), int(math.ceil(height * dpr)))
+        pixmap.setDevicePixelRatio(dpr)
+        pixmap.fill(Qt.transparent)
+        return pixmap
+
+    def _build_layers(self):
+        size = min(self.width(), self.height())
+        cx = self.width() // 2
+        cy = self.height() // 2
+        radius = size // 2 - 6
+
+        # Внутренняя "окошко" с закруглениями
+        inner_margin = radius * 0.18
+        inner_rect = QRectF(cx - radius + inner_margin,
+                            cy - radius + inner_margin,
+                            (radius - inner_margin) * 2,
+                            (radius - inner_margin) * 2)
+        pitch_px_per_deg = inner_rect.height() / 2.0 / 35.0
+
+        background = self._new_layer(self.width(), self.height())
+        painter = QPainter(background)
+        painter.setRenderHint(QPainter.Antialiasing)
+        # Фон
+        painter.fillRect(self.rect(), QColor('#000'))
+        # Внешняя круглая рамка
+        painter.setPen(QPen(QColor('#E0E0E0'), 3))
+        painter.setBrush(QBrush(QColor('#111')))
+        painter.drawEllipse(QRectF(cx - radius, cy - radius, radius * 2, radius * 2))
+        painter.end()
+
+        world = self._build_world(inner_rect, pitch_px_per_deg)
+        overlay = self._build_overlay(cx, cy, radius)
+        geometry = (inner_rect.center(), inner_rect, pitch_px_per_deg)
+        return self.size(), background, world, overlay, geometry
+
+    def _build_world(self, inner_rect, pitch_px_per_deg):
+        """Небо, земля и шкала тангажа при нулевых углах.
+
+        Размер покрывает окошко при любом крене и тангаже до PITCH_LIMIT.
+        """
+        half_diag = inner_rect.width() / 2.0 * math.sqrt(2.0) + 2
+        half_w = max(half_diag, 150)
+        half_h = half_diag + self.PITCH_LIMIT * pitch_px_per_deg
+        world = self._new_layer(2 * half_w, 2 * half_h)
+        painter = QPainter(world)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.translate(half_w, half_h)
+
+        # Небо
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(QBrush(QColor('#2F9DED')))
+        painter.drawRect(QRectF(-half_w, -half_h, 2 * half_w, half_h))
+
+        # Земля
+        painter.setBrush(QBrush(QColor('#88552C')))
+        painter.drawRect(QRectF(-half_w, 0, 2 * half_w, half_h))
+
+        # Линия горизонта
+        painter.setPen(QPen(QColor('white'), 3))
+        painter.drawLine(QPointF(-half_w, 0), QPointF(half_w, 0))
+
+        # Разметка тангажа (каждые 10°)
+        fm = QFontMetrics(painter.font())
+        for deg in range(-30, 31, 10):
+            y = -(deg * pitch_px_per_deg)
+            # короткие штрихи по краям
+            painter.setPen(QPen(QColor('white'), 2))
+            painter.drawLine(QPointF(-130, y), QPointF(-40, y))
+            painter.drawLine(QPointF(40, y), QPointF(130, y))
+            if deg != 0:
+                # подписи
+                painter.setPen(QPen(QColor('white')))
+                text = f"{abs(deg)}"
+                w = fm.width(text)
+                for x in (-140, 115):
+                    painter.drawText(int(x - w / 2), int(y - 2), text)
+        painter.end()
+        return world
+
+    def _build_overlay(self, cx, cy, radius):
+        """Самолётик, шкала крена и указатель — не зависят от углов"""
+        overlay = self._new_layer(self.width(), self.height())
+        painter = QPainter(overlay)
+        painter.setRenderHint(QPainter.Antialiasing)
+
+        # Фиксированный самолётик в центре
+        painter.setPen(QPen(QColor('white'), 3))
+        painter.setBrush(QBrush(QColor('#111')))
+        painter.drawLine(cx - 60, cy, cx - 15, cy)
+        painter.drawLine(cx + 15, cy, cx + 60, cy)
+        painter.drawLine(cx - 15, cy, cx - 5, cy + 6)
+        painter.drawLine(cx + 5, cy + 6, cx + 15, cy)
+        painter.setPen(QPen(QColor('white'), 2))
+        painter.drawEllipse(QRectF(cx - 6, cy - 6, 12, 12))
+
+        # Верхняя шкала крена (дуга)
+        painter.setPen(QPen(QColor('white'), 2))
+        arc_radius = radius - 8
+        for mark, length in [(0, 16), (10, 10), (20, 10), (30, 14), (45, 10), (60, 10)]:
+            for sign in (-1, 1):
+                a = math.radians(-90 + sign * mark)
+                sx = cx + arc_radius * math.cos(a)
+                sy = cy + arc_radius * math.sin(a)
+                ex = cx + (arc_radius - length) * math.cos(a)
+                ey = cy + (arc_radius - length) * math.sin(a)
+                painter.drawLine(int(sx), int(sy), int(ex), int(ey))
+
+        # Треугольный указатель крена сверху
+        painter.setBrush(QBrush(QColor('white')))
+        pointer_y = cy - arc_radius - 4
+        path = QPainterPath()
+        path.moveTo(cx, pointer_y)
+        path.lineTo(cx - 10, pointer_y + 16)
+        path.lineTo(cx + 10, pointer_y + 16)
+        path.closeSubpath()
+        painter.drawPath(path)
+
+        painter.end()
+        return overlay
+
+class RIM1AMonitorApp(QMainWindow):
+    def __init__(self, server=None, plot_backend='auto', protocol=DEFAULT, resample=None,
+                 nominal_rate=None, estimator='complementary', calibration=None):
+        super().__init__()
+        self.setWindowTitle("IMU Monitor — Real-time Data Display")
+        self.resize(1200, 800)
+
+        # Переменные
+        self.max_points = 500
+        self.history_size = 100_000
+
+        # Данные — общее хранилище устройств (на графике последние max_points).
+        # Каждый поток чтения пишет в своё устройство сам, GUI только читает.
+        self.store = DeviceStore(self.history_size, self.max_points)
+        self.device_specs = []  # (порт, скорость, файл) по номерам устройств
+        self.readers = []  # SerialDataReader по номерам устройств во время чтения
+        self.recorders = {}  # Device → Recorder во время записи
+        self.record_paths = {}  # Device → файл записи в режиме отдельного процесса
+        self.calibrations = {}  # Device → Calibration, применяемая в потоке чтения
+        self.default_calibration = calibration  # поправка новых устройств (--calibration)
+        self.device_series = {}  # Device → (серии гироскопа, серии акселерометра)
+        self.extra_series = {}  # Device → серия выбранного дополнительного поля
+        self.protocol = protocol  # схема кадра по умолчанию (имя или 'auto')
+        self.resample = resample  # частота равномерной сетки, Гц (None — без неё)
+        self.nominal_rate = nominal_rate  # номинальная частота датчиков, Гц
+        self.filter_name = estimator  # фильтр ориентации по умолчанию (imu.attitude.ESTIMATORS)
+        self._running = 0  # сколько источников ещё не закончились
+        self.server = server  # imu.server.StreamServer: раздача отсчётов клиентам
+        self.profiler = None  # imu.profiling.SessionProfiler (--profile)
+        # Серии графиков рисуются через OpenGL, если он есть (см. choose_plot_backend)
+        self.plot_backend, self.plot_backend_reason = choose_plot_backend(plot_backend)
+        self.opengl_available = self.plot_backend == 'opengl'
+
+        # Последние показанные значения (обновляются раз за кадр)
+        self._latest_attitude = (0.0, 0.0)  # (roll, pitch) для горизонта
+        self._latest_yaw = 0.0
+        self._shown = None  # (устройство, число отсчётов) на экране
+        self.render_time = Histogram()  # время update_plots, с
+        self.exports = []  # (Exporter, QProgressDialog) идущих экспортов
+        self.export_timer = QTimer()
+        self.export_timer.timeout.connect(self.refresh_exports)
+
+        # UI
+        self.init_ui()
+
+    def init_ui(self):
+        central_widget = QWidget()
+        self.setCentralWidget(central_widget)
+        main_layout = QVBoxLayout(central_widget)
+
+        # Панель управления
+        control_layout = QHBoxLayout()
+        control_layout.addWidget(QLabel("Порт:"))
+        self.port_combo = QComboBox()
+        self.update_ports()
+        control_layout.addWidget(self.port_combo)
+
+        control_layout.addWidget(QLabel("Скорость (baud):"))
+        self.baud_combo = QComboBox()
+        self.baud_combo.addItems(["9600", "19200", "38400", "57600", "115200", "230400", "460800", "921600"])
+        self.baud_combo.setCurrentText("115200")
+        control_layout.addWidget(self.baud_combo)
+
+        self.add_btn = QPushButton("Добавить")
+        self.add_btn.clicked.connect(self.add_device)
+        control_layout.addWidget(self.add_btn)
+
+        control_layout.addWidget(QLabel("Протокол:"))
+        self.protocol_combo = QComboBox()
+        self.protocol_combo.addItem("Авто", AUTO)
+        for name, schema in PROTOCOLS.items():
+            self.protocol_combo.addItem(name, name)
+            self.protocol_combo.setItemData(self.protocol_combo.count() - 1,
+                                            schema.description, Qt.ToolTipRole)
+        self.protocol_combo.setCurrentIndex(max(self.protocol_combo.findData(self.protocol), 0))
+        control_layout.addWidget(self.protocol_combo)
+
+        control_layout.addWidget(QLabel("Фильтр:"))
+        self.filter_combo = QComboBox()
+        self.filter_combo.addItem("Комплементарный", 'complementary')
+        self.filter_combo.addItem("Маджвик", 'madgwick')
+        self.filter_combo.setCurrentIndex(max(self.filter_combo.findData(self.filter_name), 0))
+        self.filter_combo.currentIndexChanged.connect(self.on_filter_changed)
+        control_layout.addWidget(self.filter_combo)
+
+        # Равномерная сетка по времени хоста для графиков, спектра и записи
+        control_layout.addWidget(QLabel("Сетка, Гц:"))
+        self.resample_spin = QSpinBox()
+        self.resample_spin.setRange(0, 100_000)
+        self.resample_spin.setSpecialValueText("нет")
+        self.resample_spin.setValue(int(self.resample or 0))
+        self.resample_spin.setToolTip("Передискретизация отсчётов на равномерную сетку (0 — нет)")
+        control_layout.addWidget(self.resample_spin)
+
+        # Декодирование и фильтр в дочернем процессе — не делят GIL с отрисовкой
+        self.process_check = QCheckBox("Отдельный процесс")
+        control_layout.addWidget(self.process_check)
+        self.gl_check = QCheckBox("OpenGL")
+        self.gl_check.setChecked(self.plot_backend == 'opengl')
+        self.gl_check.setEnabled(self.opengl_available)
+        self.gl_check.setToolTip(f"Графики через OpenGL: {self.plot_backend_reason}")
+        self.gl_check.toggled.connect(
+            lambda checked: self.set_plot_backend('opengl' if checked else 'software'))
+        control_layout.addWidget(self.gl_check)
+
+        self.start_btn = QPushButton("Старт")
+        self.start_btn.clicked.connect(self.start_reading)
+        control_layout.addWidget(self.start_btn)
+
+        self.stop_btn = QPushButton("Стоп")
+        self.stop_btn.clicked.connect(self.stop_reading)
+        self.stop_btn.setEnabled(False)
+        control_layout.addWidget(self.stop_btn)
+
+        self.clear_btn = QPushButton("Очистить")
+        self.clear_btn.clicked.connect(self.clear_data)
+        control_layout.addWidget(self.clear_btn)
+
+        self.record_btn = QPushButton("Запись")
+        self.record_btn.setCheckable(True)
+        self.record_btn.clicked.connect(self.toggle_recording)
+        control_layout.addWidget(self.record_btn)
+
+        self.save_btn = QPushButton("Сохранить")
+        self.save_btn.clicked.connect(self.save_plot)
+        control_layout.addWidget(self.save_btn)
+
+        # Экспорт сырых данных: история выбранного устройства или файл записи
+        self.export_btn = QPushButton("Экспорт")
+        export_menu = QMenu(self.export_btn)
+        export_menu.addAction("История устройства…", self.export_history)
+        export_menu.addAction("Файл записи…", self.export_recording)
+        self.export_btn.setMenu(export_menu)
+        control_layout.addWidget(self.export_btn)
+
+        main_layout.addLayout(control_layout)
+
+        # Вкладки
+        self.tabs = tabs = QTabWidget()
+
+        # Вкладка 1 — Данные и графики
+        tab1 = QWidget()
+        t1_layout = QVBoxLayout(tab1)
+        splitter = QSplitter(Qt.Horizontal)
+        # Левая панель — устройства и значения выбранного
+        left_panel = QWidget()
+        left_layout = QVBoxLayout(left_panel)
+        left_layout.setContentsMargins(0, 0, 0, 0)
+        devices_group = QGroupBox("Устройства (галочка — на графике)")
+        devices_layout = QVBoxLayout(devices_group)
+        self.device_list = QListWidget()
+        self.device_list.itemChanged.connect(self.on_device_toggled)
+        self.device_list.currentRowChanged.connect(self.on_device_selected)
+        devices_layout.addWidget(self.device_list)
+        self.remove_btn = QPushButton("Удалить")
+        self.remove_btn.clicked.connect(self.remove_device)
+        devices_layout.addWidget(self.remove_btn)
+        left_layout.addWidget(devices_group)
+        self.data_display = DataDisplayWidget()
+        left_layout.addWidget(self.data_display)
+        splitter.addWidget(left_panel)
+        # Правая панель — графики
+        charts_widget = QWidget()
+        charts_layout = QVBoxLayout(charts_widget)
+        self.chart_gyro = self.create_chart("Гироскоп (°/с)")
+        self.chart_acc = self.create_chart("Акселерометр (м/с²)")
+        self.chart_view_gyro = QChartView(self.chart_gyro)
+        self.chart_view_acc = QChartView(self.chart_acc)
+        charts_layout.addWidget(self.chart_view_gyro)
+        charts_layout.addWidget(self.chart_view_acc)
+        # Дополнительные поля протокола (температура, счётчик…) — по одному
+        # на выбор; панель видна, только если такие поля есть
+        self.extra_panel = QWidget()
+        extra_layout = QVBoxLayout(self.extra_panel)
+        extra_layout.setContentsMargins(0, 0, 0, 0)
+        extra_controls = QHBoxLayout()
+        extra_controls.addWidget(QLabel("Поле протокола:"))
+        self.extra_combo = QComboBox()
+        self.extra_combo.currentIndexChanged.connect(lambda _: self.extra_scale.reset())
+        extra_controls.addWidget(self.extra_combo)
+        extra_controls.addStretch(1)
+        extra_layout.addLayout(extra_controls)
+        self.chart_extra = self.create_chart("Поле протокола")
+        self.chart_extra.legend().setVisible(False)
+        self.chart_view_extra = QChartView(self.chart_extra)
+        extra_layout.addWidget(self.chart_view_extra)
+        self.extra_panel.setVisible(False)
+        charts_layout.addWidget(self.extra_panel)
+        splitter.addWidget(charts_widget)
+        splitter.setSizes([300, 900])
+        t1_layout.addWidget(splitter)
+        tabs.addTab(tab1, "Данные")
+
+        # Вкладка 2 — Искусственный горизонт
+        # (виджет создаётся при первом открытии вкладки)
+        self.horizon_tab = QWidget()
+        QVBoxLayout(self.horizon_tab)
+        self.horizon = None
+        tabs.addTab(self.horizon_tab, "Горизонт")
+        tabs.currentChanged.connect(self.on_tab_changed)
+
+        # Вкладка 3 — Спектр (виджет создаётся при первом открытии вкладки)
+        self.spectrum_tab = QWidget()
+        QVBoxLayout(self.spectrum_tab)
+        self.spectrum = None
+        tabs.addTab(self.spectrum_tab, "Спектр")
+
+        # Вкладка 4 — Обзор записанной сессии
+        self.timeline = TimelineWidget()
+        tabs.addTab(self.timeline, "Обзор записи")
+
+        # Вкладка 5 — Статистика каналов и калибровка
+        self.calibration_widget = CalibrationWidget()
+        self.calibration_widget.calibration_changed.connect(self.on_calibration_changed)
+        tabs.addTab(self.calibration_widget, "Калибровка")
+
+        # Вкладка 6 — Статистика потоков чтения
+        self.stats_widget = StatsWidget()
+        tabs.addTab(self.stats_widget, "Статистика")
+
+        main_layout.addWidget(tabs)
+
+        # Таймер для обновления
+        self.timer = QTimer()
+        self.timer.timeout.connect(self.update_plots)
+
+        # Таймер статистики (скорости считаются за период таймера)
+        self.stats_timer = QTimer()
+        self.stats_timer.timeout.connect(self.refresh_stats)
+
+        # Автомасштаб осей Y (гистерезис — доля, на которую ось может
+        # быть шире данных, прежде чем сузится)
+        self.autoscale_hysteresis = 0.3
+        self.gyro_scale = AxisAutoscaler(hysteresis=self.autoscale_hysteresis)
+        self.acc_scale = AxisAutoscaler(hysteresis=self.autoscale_hysteresis)
+        self.extra_scale = AxisAutoscaler(hysteresis=self.autoscale_hysteresis)
+
+    def create_chart(self, title):
+        chart = QChart()
+        chart.setTitle(title)
+        chart.legend().setVisible(True)
+        chart.legend().setAlignment(Qt.AlignRight)
+
+        # Оси
+        axis_x = QValueAxis()
+        axis_x.setRange(0, self.max_points)
+        axis_x.setTickCount(6)
+        chart.addAxis(axis_x, Qt.AlignBottom)
+
+        axis_y = QValueAxis()
+        axis_y.setRange(-10, 10)  # Можно менять динамически
+        axis_y.setTickCount(5)
+        chart.addAxis(axis_y, Qt.AlignLeft)
+        return chart
+
+    def series_for(self, device):
+        """Серии устройства на обоих графиках (создаются при первом показе)"""
+        if device not in self.device_series:
+            pen_style = DEVICE_STYLES[len(self.device_series) % len(DEVICE_STYLES)]
+            pair = []
+            for chart, names in ((self.chart_gyro, ("Gx", "Gy", "Gz")),
+                                 (self.chart_acc, ("Ax", "Ay", "Az"))):
+                series_list = []
+                for name, color in zip(names, CHANNEL_COLORS):
+                    series = QLineSeries()
+                    series.setName(f"{name} [{device.name}]" if len(self.store) > 1 else name)
+                    pen = QPen(QColor(color), 2)
+                    pen.setStyle(pen_style)
+                    series.setPen(pen)
+                    series.setUseOpenGL(self.plot_backend == 'opengl')
+                    chart.addSeries(series)
+                    for axis in chart.axes():
+                        series.attachAxis(axis)
+                    series_list.append(series)
+                pair.append(series_list)
+            self.device_series[device] = tuple(pair)
+            self.on_device_toggled(self.device_list.item(self.store.devices.index(device)))
+        return self.device_series[device]
+
+    def set_plot_backend(self, backend):
+        """Переключить серии «Данных» между OpenGL и QPainter.
+
+        С OpenGL QtCharts рисует серию поверх графика из буфера вершин
+        (перо — сплошное, без сглаживания); прореживание до ширины
+        графика то же, что и без него.
+        """
+        if backend == 'opengl' and not self.opengl_available:
+            backend = 'software'
+        self.plot_backend = backend
+        for pair in self.device_series.values():
+            for series in pair[0] + pair[1]:
+                series.setUseOpenGL(backend == 'opengl')
+        for series in self.extra_series.values():
+            series.setUseOpenGL(backend == 'opengl')
+
+    def extra_series_for(self, device):
+        """Серия дополнительного поля устройства (создаётся при первом показе)"""
+        if device not in self.extra_series:
+            series = QLineSeries()
+            pen = QPen(QColor("purple"), 2)
+            pen.setStyle(DEVICE_STYLES[self.store.devices.index(device) % len(DEVICE_STYLES)])
+            series.setPen(pen)
+            series.setUseOpenGL(self.plot_backend == 'opengl')
+            self.chart_extra.addSeries(series)
+            for axis in self.chart_extra.axes():
+                series.attachAxis(axis)
+            self.extra_series[device] = series
+        return self.extra_series[device]
+
+    def drop_series(self, device):
+        """Убрать серии устройства с графиков"""
+        series = self.extra_series.pop(device, None)
+        if series is not None:
+            self.chart_extra.removeSeries(series)
+        for chart, series_list in zip((self.chart_gyro, self.chart_acc),
+                                      self.device_series.pop(device, ())):
+            for series in series_list:
+                chart.removeSeries(series)
+
+    def update_ports(self):
+        ports = [p.device for p in serial.tools.list_ports.comports()]
+        if not ports:
+            ports = ["Нет портов"]
+        self.port_combo.clear()
+        self.port_combo.addItems(ports + [SIMULATOR_PORT, REPLAY_PORT, NETWORK_PORT])
+        if ports:
+            self.port_combo.setCurrentText(ports[0])
+
+    def add_device(self):
+        """Добавить выбранный порт (генератор, файл) в список устройств"""
+        port = self.port_combo.currentText()
+        baud = int(self.baud_combo.currentText())
+
+        if port == "Нет портов":
+            QMessageBox.warning(self, "Ошибка", "Нет доступных COM-портов!")
+            return False
+
+        path = None
+        if port == SIMULATOR_PORT:
+            name = f"{SIMULATOR_PORT} {len(self.store) + 1}"
+        elif port == REPLAY_PORT:
+            path, _ = QFileDialog.getOpenFileName(
+                self, "Воспроизвести запись", "",
+                "IMU Recording (*.imurec);;All Files (*)"
+            )
+            if not path:
+                return False
+            name = os.path.basename(path)
+        elif port == NETWORK_PORT:
+            path, ok = QInputDialog.getText(self, "Подключиться", "Адрес сервера (HOST:PORT):")
+            if not ok or not path:
+                return False
+            try:
+                parse_address(path)
+            except ValueError:
+                QMessageBox.warning(self, "Ошибка", f"Неверный адрес: {path}")
+                return False
+            name = path
+        else:
+            if any(spec[0] == port for spec in self.device_specs):
+                QMessageBox.warning(self, "Ошибка", f"Порт {port} уже добавлен")
+                return False
+            name = port
+        self.register_device(name, (port, baud, path))
+        return True
+
+    def register_device(self, name, spec=None):
+        """Новое устройство в хранилище и списке; возвращает его номер"""
+        index = self.store.add(name)
+        self.device_specs.append(spec)
+        if self.default_calibration is not None:
+            self.calibrations[self.store[index]] = self.default_calibration
+        item = QListWidgetItem(name)
+        item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+        item.setCheckState(Qt.Checked)
+        self.device_list.addItem(item)
+        if self.device_list.currentRow() < 0:
+            self.device_list.setCurrentRow(index)
+        return index
+
+    def remove_device(self):
+        index = self.device_list.currentRow()
+        if index < 0 or self.readers:
+            return
+        device = self.store[index]
+        self.drop_series(device)
+        self.calibrations.pop(device, None)
+        recorder = self.recorders.pop(device, None)
+        if recorder is not None:
+            recorder.close()
+        self.store.remove(index)
+        del self.device_specs[index]
+        self.device_list.takeItem(index)
+        self.on_device_selected(self.device_list.currentRow())
+
+    def plotted_devices(self):
+        """Номера устройств, отмеченных для показа на графиках"""
+        return [i for i in range(self.device_list.count())
+                if self.device_list.item(i).checkState() == Qt.Checked]
+
+    def on_device_toggled(self, item):
+        index = self.device_list.row(item)
+        if 0 <= index < len(self.store):
+            visible = item.checkState() == Qt.Checked
+            for series_list in self.device_series.get(self.store[index], ()):
+                for series in series_list:
+                    series.setVisible(visible)
+            if self.store[index] in self.extra_series:
+                self.extra_series[self.store[index]].setVisible(visible)
+
+    def on_device_selected(self, index):
+        self._shown = None
+        device = self.store[index] if 0 <= index < len(self.store) else None
+        self.calibration_widget.set_device(device, self.calibrations.get(device))
+
+    def on_calibration_changed(self, device, calibration):
+        """Новая поправка устройства — сразу в его поток чтения"""
+        if device is None:
+            return
+        if calibration is None:
+            self.calibrations.pop(device, None)
+        else:
+            self.calibrations[device] = calibration
+        for reader in self.readers:
+            if reader.device is device:
+                reader.calibration = calibration
+
+    def on_filter_changed(self, index):
+        """Смена фильтра ориентации; новые фильтры начинают с нуля"""
+        for reader in self.readers:
+            reader.set_estimator(self.filter_combo.currentData())
+
+    def make_estimator(self):
+        return ESTIMATORS[self.filter_combo.currentData()]()
+
+    def refresh_display(self):
+        """Значения и горизонт выбранного устройства — один раз за кадр UI"""
+        index = self.device_list.currentRow()
+        if not 0 <= index < len(self.store):
+            return
+        device = self.store[index]
+        latest = device.latest
+        if latest is None or self._shown == (device, device.total):
+            return
+        self._shown = (device, device.total)
+        self.data_display.update_data({name: float(latest[name]) for name in CHANNELS})
+        attitude = device.attitude
+        if attitude is not None:
+            self._latest_attitude = (float(attitude['roll']), float(attitude['pitch']))
+            self._latest_yaw = float(attitude['yaw'])
+        self.data_display.update_attitude(*self._latest_attitude, self._latest_yaw)
+        if self.horizon is not None:
+            self.horizon.set_attitude(*self._latest_attitude)
+
+    def on_tab_changed(self, index):
+        """Ленивое создание вкладок горизонта и спектра"""
+        if self.horizon is None and self.tabs.widget(index) is self.horizon_tab:
+            self.horizon = HorizonWidget()
+            self.horizon.set_attitude(*self._latest_attitude)
+            self.horizon_tab.layout().addWidget(self.horizon)
+        if self.spectrum is None and self.tabs.widget(index) is self.spectrum_tab:
+            self.spectrum = SpectrumWidget()
+            self.spectrum_tab.layout().addWidget(self.spectrum)
+
+    def refresh_spectrum(self):
+        """Спектр выбранного устройства — только пока вкладка открыта"""
+        index = self.device_list.currentRow()
+        if (self.spectrum is None or self.tabs.currentWidget() is not self.spectrum_tab
+                or not 0 <= index < len(self.store)):
+            return
+        self.spectrum.update_device(self.store[index])
+
+    def refresh_calibration(self):
+        """Статистика каналов копится всегда, таблица и график — когда вкладка открыта"""
+        index = self.device_list.currentRow()
+        if not 0 <= index < len(self.store):
+            return
+        self.calibration_widget.update_device(self.store[index])
+        if self.tabs.currentWidget() is self.calibration_widget:
+            self.calibration_widget.render()
+
+    def update_plots(self):
+        if self.profiler is not None:
+            self.profiler.sync()
+        t0 = time.perf_counter()
+        errors = []
+        for reader in self.readers:
+            if not isinstance(reader, DataReader):  # ProcessReader
+                reader.poll()
+                errors += reader.errors
+                reader.errors.clear()
+        if errors:
+            self.on_process_errors(errors)
+        self.refresh_display()
+        self.refresh_spectrum()
+        self.refresh_calibration()
+        indices = self.plotted_devices()
+        self.autoscale_charts(indices)
+
+        # Окна устройств в общей шкале по времени хоста: прореживаем
+        # до ширины графика и заменяем каждую серию целиком
+        windows = self.store.aligned(indices, self.max_points)
+        for index, (x, window) in zip(indices, windows):
+            if not window.shape[1]:
+                continue
+            gyro_series, acc_series = self.series_for(self.store[index])
+            for chart, series_list, rows in ((self.chart_gyro, gyro_series, window[0:3]),
+                                             (self.chart_acc, acc_series, window[3:6])):
+                buckets = int(chart.plotArea().width())
+                for series, row in zip(series_list, rows):
+                    series.replace(make_polygon(*minmax_decimate(row, buckets, x)))
+        self.refresh_extra(indices)
+        self.render_time.record(time.perf_counter() - t0)
+
+    def refresh_extra(self, indices):
+        """График выбранного дополнительного поля протокола"""
+        fields = self.store.extra_fields(indices)
+        self.extra_panel.setVisible(bool(fields))
+        if not fields:
+            return
+        if fields != [self.extra_combo.itemText(i) for i in range(self.extra_combo.count())]:
+            current = self.extra_combo.currentText()
+            self.extra_combo.blockSignals(True)
+            self.extra_combo.clear()
+            self.extra_combo.addItems(fields)
+            self.extra_combo.setCurrentIndex(max(self.extra_combo.findText(current), 0))
+            self.extra_combo.blockSignals(False)
+        field = self.extra_combo.currentText()
+        self.chart_extra.setTitle(field)
+        buckets = int(self.chart_extra.plotArea().width())
+        low, high = math.inf, -math.inf
+        for index, (x, values) in zip(indices, self.store.extra_aligned(indices, self.max_points, field)):
+            series = self.extra_series_for(self.store[index])
+            x, y = minmax_decimate(values, buckets, x)
+            series.replace(make_polygon(x, y))
+            if len(y):
+                low, high = min(low, float(y.min())), max(high, float(y.max()))
+        if low <= high and self.extra_scale.update(low, high):
+            self.chart_extra.axisY().setRange(self.extra_scale.low, self.extra_scale.high)
+
+    def refresh_stats(self):
+        reports = [(reader.device.name, reader.stats.report()) for reader in self.readers]
+        # У процесса чтения отчёта ещё может не быть
+        reports = [(name, report) for name, report in reports if report is not None]
+        self.stats_widget.update_stats(reports, self.render_time.summary(scale=1e3))
+        if self.server is not None:
+            counters = self.server.counters()
+            self.statusBar().showMessage(
+                f"Клиентов: {counters['clients']} (отключено медленных: "
+                f"{counters['dropped_clients']}), отправлено {counters['bytes_sent'] / 1e6:.1f} МБ")
+
+    def autoscale_charts(self, indices):
+        # Диапазоны по окну ведутся инкрементально в экстремумах устройств
+        for chart, scale, names in ((self.chart_gyro, self.gyro_scale, CHANNELS[0:3]),
+                                    (self.chart_acc, self.acc_scale, CHANNELS[3:6])):
+            data_range = self.store.range(indices, names)
+            if data_range and scale.update(*data_range):
+                chart.axisY().setRange(scale.low, scale.high)
+
+    def start_reading(self):
+        if not len(self.store) and not self.add_device():
+            return
+
+        sources = []
+        for index, (port, baud, path) in enumerate(self.device_specs):
+            if port == SIMULATOR_PORT:
+                sources.append(SyntheticSource(seed=index))
+            elif port == REPLAY_PORT:
+                from imu.sources import FileReplaySource
+                try:
+                    sources.append(FileReplaySource(path, baud_rate=baud))
+                except (OSError, ValueError) as e:
+                    QMessageBox.critical(self, "Ошибка", f"Не удалось открыть файл:\n{e}")
+                    return
+            elif port == NETWORK_PORT:
+                sources.append(NetworkSource(*parse_address(path)))
+            else:
+                sources.append(SerialSource(port, baud, timeout=1))
+        self.start_sources(sources)
+
+    def start_sources(self, sources):
+        """Запуск потока чтения на каждое устройство (sources — по номерам)"""
+        for index, (device, source) in enumerate(zip(self.store, sources)):
+            if self.process_check.isChecked():
+                from imu.process import ProcessReader
+                reader = ProcessReader(estimator=self.filter_combo.currentData(),
+                                       on_finished=self.on_reader_finished,
+                                       protocol=self.protocol_combo.currentData(),
+                                       resample=self.resample_spin.value() or None,
+                                       nominal_rate=self.nominal_rate)
+                if device in self.record_paths:
+                    reader.start_recording(self.record_paths[device], {'device': device.name})
+            else:
+                reader = SerialDataReader()
+                reader.set_protocol(self.protocol_combo.currentData())
+                reader.set_resample(self.resample_spin.value())
+                reader.nominal_rate = self.nominal_rate
+                reader.profiler = self.profiler
+                reader.estimator = self.make_estimator()
+                reader.recorder = self.recorders.get(device)
+                reader.finished.connect(self.on_reader_finished)
+            reader.device = device
+            reader.calibration = self.calibrations.get(device)
+            result = reader.start_source(source)
+            if result is not True:
+                self.stop_reading()
+                QMessageBox.critical(self, "Ошибка",
+                                     f"Не удалось открыть {device.name}:\n{result[1]}")
+                return False
+            self.readers.append(reader)
+            if self.server is not None:
+                self.server.attach(reader, index, device.name)
+        self._running = len(self.readers)
+
+        self.start_btn.setEnabled(False)
+        self.stop_btn.setEnabled(True)
+        self.clear_btn.setEnabled(False)
+        self.add_btn.setEnabled(False)
+        self.remove_btn.setEnabled(False)
+        self.process_check.setEnabled(False)
+        self.protocol_combo.setEnabled(False)
+        self.resample_spin.setEnabled(False)
+
+        self.timer.start(50)  # Обновление каждые 50 мс (~20 FPS)
+        self.render_time.reset()
+        self.stats_timer.start(1000)
+        return True
+
+    def on_reader_finished(self):
+        """Источник закончился; чтение останавливается, когда кончатся все"""
+        self._running -= 1
+        if self._running <= 0:
+            self.stop_reading()
+
+    def stop_reading(self):
+        for reader in self.readers:
+            reader.stop_reading()
+        if self.server is not None:
+            self.server.detach_all()
+        if self.readers:
+            self.update_plots()
+            self.refresh_stats()
+        self.stats_timer.stop()
+        self.readers = []
+        self._running = 0
+        self.start_btn.setEnabled(True)
+        self.stop_btn.setEnabled(False)
+        self.clear_btn.setEnabled(True)
+        self.add_btn.setEnabled(True)
+        self.remove_btn.setEnabled(True)
+        self.process_check.setEnabled(not self.record_btn.isChecked())
+        self.protocol_combo.setEnabled(True)
+        self.resample_spin.setEnabled(True)
+        self.timer.stop()
+
+    def clear_data(self):
+        self.store.clear()
+        self.gyro_scale.reset()
+        self.acc_scale.reset()
+
+        for series_pair in self.device_series.values():
+            for series in series_pair[0] + series_pair[1]:
+                series.clear()
+        for series in self.extra_series.values():
+            series.clear()
+        self.extra_scale.reset()
+
+        self.chart_gyro.axisY().setRange(-10, 10)
+        self.chart_acc.axisY().setRange(-10, 10)
+        
+        # Сбрасываем отображение текущих значений
+        self._shown = None
+        self.data_display.update_data({'gx': 0, 'gy': 0, 'gz': 0, 'ax': 0, 'ay': 0, 'az': 0})
+        self.data_display.update_attitude(0.0, 0.0, 0.0)
+
+    def save_plot(self):
+        filename, _ = QFileDialog.getSaveFileName(
+            self, "Сохранить график", "", "PNG Files (*.png);;All Files (*)"
+        )
+        if filename:
+            if not filename.endswith(".png"):
+                filename += ".png"
+            pixmap = self.chart_view_gyro.grab()
+            pixmap.save(filename)
+            QMessageBox.information(self, "Успех", f"График сохранён как {filename}")
+
+    def export_history(self):
+        """Экспорт истории выбранного устройства (снимок на момент выбора файла)"""
+        index = self.device_list.currentRow()
+        if not 0 <= index < len(self.store):
+            return
+        device = self.store[index]
+        self.start_export(device.records(), {'device': device.name})
+
+    def export_recording(self):
+        filename, _ = QFileDialog.getOpenFileName(
+            self, "Файл записи", "", "IMU Recording (*.imurec);;All Files (*)")
+        if not filename:
+            return
+        from imu.recording import Recording
+        try:
+            recording = Recording(filename)
+        except (OSError, ValueError) as e:
+            QMessageBox.critical(self, "Ошибка", f"Не удалось открыть файл:\n{e}")
+            return
+        self.start_export(recording.records, recording.meta)
+
+    def start_export(self, records, meta):
+        """Выбор файла и экспорт в фоновом потоке с окном прогресса"""
+        from imu.export import Exporter
+        filename, selected = QFileDialog.getSaveFileName(
+            self, "Экспорт", "", "CSV (*.csv);;NumPy (*.npz);;HDF5 (*.h5);;Parquet (*.parquet)")
+        if not filename:
+            return
+        extension = selected[selected.index("*") + 1:-1]
+        if not filename.lower().endswith(extension):
+            filename += extension
+        exporter = Exporter(records, filename, meta=meta).start()
+        dialog = QProgressDialog(f"Экспорт {os.path.basename(filename)}…", "Отмена",
+                                 0, max(exporter.total, 1), self)
+        dialog.setWindowModality(Qt.NonModal)
+        dialog.canceled.connect(exporter.cancel)
+        dialog.show()
+        self.exports.append((exporter, dialog))
+        self.export_timer.start(100)
+
+    def refresh_exports(self):
+        """Прогресс фоновых экспортов; по окончании — итог или ошибка"""
+        for exporter, dialog in list(self.exports):
+            if not exporter.finished.is_set():
+                dialog.setValue(exporter.done)
+                continue
+            self.exports.remove((exporter, dialog))
+            dialog.reset()
+            dialog.deleteLater()
+            if exporter.error is not None:
+                QMessageBox.critical(self, "Ошибка", f"Экспорт не удался:\n{exporter.error}")
+            elif not exporter.cancelled:
+                mb = exporter.bytes / 1e6
+                self.statusBar().showMessage(
+                    f"Экспорт {exporter.path}: {exporter.total} записей, {mb:.1f} МБ "
+                    f"за {exporter.elapsed:.1f} с", 10000)
+        if not self.exports:
+            self.export_timer.stop()
+
+    def toggle_recording(self, checked):
+        """Начать/остановить запись сессии в бинарный файл"""
+        if not checked:
+            self.stop_recording()
+            return
+        filename, _ = QFileDialog.getSaveFileName(
+            self, "Записать сессию", "", "IMU Recording (*.imurec);;All Files (*)"
+        )
+        if not filename:
+            self.record_btn.setChecked(False)
+            return
+        if not filename.endswith(".imurec"):
+            filename += ".imurec"
+        if not len(self.store) and not self.add_device():
+            self.record_btn.setChecked(False)
+            return
+        from imu.recording import Recorder
+        # Несколько устройств — по файлу на каждое: имя_1.imurec, имя_2.imurec…
+        stem = filename[:-len(".imurec")]
+        paths = {device: filename if len(self.store) == 1 else f"{stem}_{k + 1}.imurec"
+                 for k, device in enumerate(self.store)}
+        self.process_check.setEnabled(False)
+        self.record_btn.setText("Стоп записи")
+        if self.process_check.isChecked():
+            # Файлы пишет дочерний процесс; ошибки забирает update_plots
+            self.record_paths = paths
+            for reader in self.readers:
+                reader.start_recording(paths[reader.device], {'device': reader.device.name})
+            return
+        try:
+            for device, path in paths.items():
+                self.recorders[device] = Recorder(path, meta={'device': device.name})
+        except OSError as e:
+            self.stop_recording()
+            QMessageBox.critical(self, "Ошибка", f"Не удалось создать файл:\n{e}")
+            return
+        for reader in self.readers:
+            reader.recorder = self.recorders.get(reader.device)
+
+    def on_process_errors(self, errors):
+        """Ошибки дочерних процессов чтения; если запись не открылась — стоп записи"""
+        if self.record_paths and not all(reader.recording for reader in self.readers
+                                         if not isinstance(reader, DataReader)):
+            self.stop_recording()
+        QMessageBox.critical(self, "Ошибка", "\n\n".join(errors))
+
+    def stop_recording(self):
+        for reader in self.readers:
+            if not isinstance(reader, DataReader):  # ProcessReader
+                reader.stop_recording()
+            else:
+                reader.recorder = None
+        self.record_paths = {}
+        recorders, self.recorders = self.recorders, {}
+        for recorder in recorders.values():
+            recorder.close()
+        self.record_btn.setChecked(False)
+        self.record_btn.setText("Запись")
+        self.process_check.setEnabled(not self.readers)
+
+    def closeEvent(self, event):
+        self.stop_reading()
+        self.stop_recording()
+        # Недописанные файлы экспорта удаляются в потоке экспорта
+        for exporter, _ in self.exports:
+            exporter.cancel()
+            exporter.wait(2.0)
+        if self.server is not None:
+            self.server.stop()
+        event.accept()
+
+
+def run_gui(argv, args=None):
+    """Окно приложения; args — разобранные аргументы main.py (--serve и т.п.)"""
+    app = QApplication(argv)
+    server = None
+    protocol = DEFAULT
+    calibration = None
+    if args is not None:
+        try:
+            _, protocol = resolve(args.protocol)
+        except (OSError, ValueError, KeyError) as e:
+            QMessageBox.critical(None, "Ошибка", f"Не удалось загрузить протокол:\n{e}")
+        if args.calibration:
+            try:
+                calibration = Calibration.load(args.calibration)
+            except (OSError, ValueError) as e:
+                QMessageBox.critical(None, "Ошибка", f"Не удалось загрузить поправку:\n{e}")
+        if args.serve or args.serve_udp or args.serve_ws:
+            from imu.server import server_from_args  # asyncio — только для раздачи
+            try:
+                server = server_from_args(args)
+                server.start()
+            except (OSError, ValueError) as e:
+                QMessageBox.critical(None, "Ошибка", f"Не удалось запустить сервер:\n{e}")
+                server = None
+    if args is None:
+        window = RIM1AMonitorApp(server)
+    else:
+        window = RIM1AMonitorApp(server, args.plot_backend, protocol, args.resample, args.device_rate,
+                                 args.filter, calibration)
+        if args.profile:
+            from imu.profiling import session_profiler
+            window.profiler = session_profiler(args.profile)
+    window.show()
+    result = app.exec_()
+    if window.profiler is not None and window.profiler.stop():
+        print(f"Профиль: {args.profile}")
+    return result
@@ -0,0 +1,196 @@
+"""Безоконный конвейер: чтение → декодирование → фильтр ориентации → запись.
+
+Модуль не импортирует Qt — его можно запускать на узлах без дисплея.
+"""
+import json
+import sys
+import threading
+import time
+
+from imu.attitude import ESTIMATORS
+from imu.calibration import Calibration
+from imu.protocols import DEFAULT, resolve
+from imu.reader import DataReader
+from imu.recording import Recorder
+from imu.sources import FileReplaySource, NetworkSource, SerialSource, SyntheticSource, parse_address
+
+
+class Pipeline:
+    """Источник → DataReader → фильтр ориентации (+ Recorder, если задан out).
+
+    Блоки и ориентация обрабатываются прямо в потоке чтения;
+    estimator — имя фильтра из imu.attitude.ESTIMATORS, calibration —
+    imu.calibration.Calibration или None, protocol — схема кадра
+    (см. imu.protocols; 'auto' — по потоку), resample — частота
+    равномерной сетки (Гц) или None, nominal_rate — номинальная частота
+    датчика для оценки ухода его часов.
+    """
+
+    def __init__(self, source, out=None, batch_interval=0.05, estimator='complementary',
+                 calibration=None, protocol=DEFAULT, resample=None, nominal_rate=None):
+        self.source = source
+        self.out = out
+        self.reader = DataReader(batch_interval, on_block=self._on_block,
+                                 on_finished=self._on_finished, protocol=protocol)
+        self.attitude = ESTIMATORS[estimator]()
+        self.reader.estimator = self.attitude
+        self.reader.calibration = calibration
+        self.reader.set_resample(resample)
+        self.reader.nominal_rate = nominal_rate
+        self.recorder = None
+        self.server = None  # imu.server.StreamServer, если отсчёты раздаются
+        self.samples = 0
+        self.latest = None
+        self.done = threading.Event()
+
+    def start(self):
+        """Запуск; возвращает True или (False, текст ошибки), как DataReader"""
+        if self.out:
+            self.recorder = Recorder(self.out, meta={'source': self.source.name})
+            self.reader.recorder = self.recorder
+        result = self.reader.start_source(self.source)
+        if result is not True:
+            self._close_recorder()
+        return result
+
+    def stop(self):
+        self.reader.stop_reading()
+        self._close_recorder()
+        self.done.set()
+
+    def _close_recorder(self):
+        self.reader.recorder = None
+        if self.recorder is not None:
+            self.recorder.close()
+
+    def _on_block(self, block):
+        self.samples += len(block)
+        self.latest = block[-1]
+
+    def _on_finished(self):
+        self.done.set()
+
+
+def make_source(args):
+    """Источник по аргументам командной строки (см. main.parse_args)"""
+    if args.simulate:
+        return SyntheticSource(rate=args.rate, speed=args.speed)
+    if args.replay:
+        return FileReplaySource(args.replay, speed=args.speed, baud_rate=args.baud)
+    if args.connect:
+        return NetworkSource(*parse_address(args.connect))
+    return SerialSource(args.port, args.baud, timeout=1, chunk_size=args.chunk_size,
+                        inter_byte_timeout=args.inter_byte_timeout)
+
+
+def run_headless(args):
+    """Запуск конвейера без GUI до конца источника, --duration или Ctrl+C"""
+    calibration = None
+    if args.calibration:
+        try:
+            calibration = Calibration.load(args.calibration)
+        except (OSError, ValueError) as e:
+            print(f"Не удалось загрузить калибровку: {e}")
+            return 1
+    try:
+        schema, protocol = resolve(args.protocol)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Не удалось загрузить протокол: {e}")
+        return 1
+    server = None
+    if args.serve or args.serve_udp or args.serve_ws:
+        from imu.server import server_from_args  # asyncio — только для раздачи
+        try:
+            server = server_from_args(args)
+            server.start()
+        except (OSError, ValueError) as e:
+            print(f"Не удалось запустить сервер: {e}")
+            return 1
+    pipeline = Pipeline(make_source(args), out=args.out, estimator=args.filter,
+                        calibration=calibration, protocol=schema or protocol,
+                        resample=args.resample, nominal_rate=args.device_rate)
+    profiler = None
+    if args.profile:
+        from imu.profiling import session_profiler
+        profiler = pipeline.reader.profiler = session_profiler(args.profile)
+    if server is not None:
+        server.attach(pipeline.reader, 0, pipeline.source.name)
+        pipeline.server = server
+        print("Раздача: " + ", ".join(f"{kind} {host}:{port}"
+                                      for kind, (host, port) in server.addresses.items()))
+    result = pipeline.start()
+    if result is not True:
+        print(f"Не удалось открыть источник: {result[1]}")
+        if server is not None:
+            server.stop()
+        return 1
+
+    # Счётчики — JSON-строкой за период в файл (--stats-out, "-" — stdout)
+    stats_out = None
+    if args.stats_out == '-':
+        stats_out = sys.stdout
+    elif args.stats_out:
+        stats_out = open(args.stats_out, 'a', encoding='utf-8')
+
+    start = time.monotonic()
+    last_samples = 0
+    try:
+        while not pipeline.done.wait(args.status_interval):
+            elapsed = time.monotonic() - start
+            rate = (pipeline.samples - last_samples) / args.status_interval
+            last_samples = pipeline.samples
+            if stats_out is not sys.stdout:
+                print(f"[{elapsed:7.1f} с] отсчётов: {pipeline.samples}, {rate:.0f}/с, "
+                      f"roll {pipeline.attitude.roll_deg:6.1f}°, "
+                      f"pitch {pipeline.attitude.pitch_deg:6.1f}°, "
+                      f"yaw {pipeline.attitude.yaw_deg:6.1f}°" + timing_status(pipeline.reader),
+                      flush=True)
+            if stats_out is not None:
+                write_stats(stats_out, pipeline, elapsed)
+            if args.duration and elapsed >= args.duration:
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        pipeline.stop()
+        if server is not None:
+            server.stop()
+        if profiler is not None and profiler.stop():
+            print(f"Профиль: {args.profile}")
+        if stats_out is not None:
+            write_stats(stats_out, pipeline, time.monotonic() - start)
+            if stats_out is not sys.stdout:
+                stats_out.close()
+    print(f"Готово: {pipeline.samples} отсчётов"
+          + (f", запись: {args.out}" if args.out else ""))
+    return 0
+
+
+def timing_status(reader):
+    """Частота, джиттер, уход часов и потери кадров для строки состояния"""
+    if reader.decoder.undetected:
+        return f", схема кадра не определена (пропущено {reader.decoder.resync_bytes} байт)"
+    timing = reader.rate_estimator
+    if timing.rate is None:
+        return ""
+    text = f", {timing.rate:.2f} Гц ± {timing.jitter * 1e3:.2f} мс"
+    if timing.drift_ppm is not None:
+        text += f", уход {timing.drift_ppm:+.0f} ppm"
+    if reader.sequence is not None:
+        text += f", потеряно {reader.sequence.lost}"
+    return text
+
+
+def write_stats(out, pipeline, elapsed):
+    """Одна JSON-строка со счётчиками потока чтения и текущей ориентацией"""
+    report = pipeline.reader.stats.report()
+    if pipeline.server is not None:
+        report['server'] = pipeline.server.counters()
+    report['elapsed'] = round(elapsed, 3)
+    report['attitude'] = {
+        'roll': round(pipeline.attitude.roll_deg, 2),
+        'pitch': round(pipeline.attitude.pitch_deg, 2),
+        'yaw': round(pipeline.attitude.yaw_deg, 2),
+    }
+    out.write(json.dumps(report) + "\n")
+    out.flush()
@@ -0,0 +1,129 @@
+"""Проба задержки и загрузки CPU чтения с последовательного порта.
+
+Дочерний процесс пишет кадры с заданной частотой в псевдотерминал (pty),
+DataReader читает их через SerialSource, как с настоящего порта. В кадр
+записываются номер (gx) и момент отправки (gy, по time.monotonic от
+начала пробы), поэтому задержка «записан в порт → отдан потоком чтения»
+считается для каждого кадра. CPU и переключения контекста — по
+getrusage процесса чтения (писатель в отдельном процессе не входит).
+
+Только POSIX. Запуск: python -m imu.probe [--rate 1000] [--duration 5] [--poll]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import threading
+import time
+
+import numpy as np
+
+from imu.decoder import SAMPLE_DTYPE, encode_packets
+from imu.reader import DataReader
+from imu.sources import SerialSource
+
+
+def _write_packets(fd, rate, duration, t0):
+    """Писатель: кадры по расписанию t0 + k / rate (отстав — догоняет пачкой)"""
+    count = int(rate * duration)
+    sample = np.zeros(1, dtype=SAMPLE_DTYPE)
+    sample['az'] = 9.81
+    k = 0
+    while k < count:
+        due = int((time.monotonic() - t0) * rate) + 1
+        n = min(due, count) - k
+        if n <= 0:
+            time.sleep(max(t0 + k / rate - time.monotonic(), 0.0))
+            continue
+        samples = np.repeat(sample, n)
+        samples['gx'] = np.arange(k, k + n)
+        samples['gy'] = time.monotonic() - t0
+        os.write(fd, encode_packets(samples))
+        k += n
+
+
+def _usage():
+    import resource
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime, usage.ru_nvcsw + usage.ru_nivcsw
+
+
+def run_probe(rate=1000.0, duration=5.0, baud_rate=921600, chunk_size=None,
+              inter_byte_timeout=None, poll=False, batch_interval=None):
+    """Прогон пробы; возвращает словарь с задержками (мс), CPU и переключениями"""
+    import pty
+    import tty
+
+    master, slave = pty.openpty()
+    tty.setraw(master)
+    port = os.ttyname(slave)
+    kwargs = {} if chunk_size is None else {'chunk_size': chunk_size}
+    source = SerialSource(port, baud_rate, timeout=1, inter_byte_timeout=inter_byte_timeout,
+                          poll=poll, **kwargs)
+
+    received = []
+    done = threading.Event()
+    count = int(rate * duration)
+
+    def on_block(block):
+        now = time.monotonic()
+        received.append((block['gx'].astype(np.int64), block['gy'].astype(np.float64), now))
+        if block['gx'][-1] >= count - 1:
+            done.set()
+
+    reader = DataReader(batch_interval, on_block=on_block)
+    result = reader.start_source(source)
+    if result is not True:
+        os.close(master)
+        os.close(slave)
+        raise OSError(result[1])
+
+    t0 = time.monotonic()
+    writer = multiprocessing.get_context('fork').Process(
+        target=_write_packets, args=(master, rate, duration, t0), daemon=True)
+    cpu0, switches0 = _usage()
+    writer.start()
+    done.wait(duration + 5.0)
+    elapsed = time.monotonic() - t0
+    cpu1, switches1 = _usage()
+    reader.stop_reading()
+    writer.join(timeout=1)
+    os.close(master)
+    os.close(slave)
+
+    latency = np.concatenate([now - t0 - sent for _, sent, now in received]) if received else np.empty(0)
+    packets = int(sum(len(seq) for seq, _, _ in received))
+    ms = np.percentile(latency, [50, 95, 99]) * 1e3 if len(latency) else [float('nan')] * 3
+    return {
+        'mode': 'poll' if poll else 'blocking',
+        'rate_hz': rate,
+        'packets_sent': count,
+        'packets_received': packets,
+        'latency_p50_ms': round(float(ms[0]), 3),
+        'latency_p95_ms': round(float(ms[1]), 3),
+        'latency_p99_ms': round(float(ms[2]), 3),
+        'latency_max_ms': round(float(latency.max() * 1e3), 3) if len(latency) else None,
+        'cpu_percent': round((cpu1 - cpu0) / elapsed * 100, 1),
+        'context_switches_per_s': round((switches1 - switches0) / elapsed),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Проба задержки чтения с порта (pty)")
+    parser.add_argument('--rate', type=float, default=1000.0, help="кадров в секунду")
+    parser.add_argument('--duration', type=float, default=5.0)
+    parser.add_argument('--chunk-size', type=int, default=None,
+                        help="байт на блокирующее чтение (по умолчанию — кадр)")
+    parser.add_argument('--inter-byte-timeout', type=float, default=None)
+    parser.add_argument('--poll', action='store_true',
+                        help="прежний опрос in_waiting + sleep(1 мс)")
+    parser.add_argument('--batch-interval', type=float, default=None,
+                        help="пакетирование DataReader, с (по умолчанию — без него)")
+    args = parser.parse_args(argv)
+    print(json.dumps(run_probe(args.rate, args.duration, chunk_size=args.chunk_size,
+                               inter_byte_timeout=args.inter_byte_timeout,
+                               poll=args.poll, batch_interval=args.batch_interval)))
+
+
+if __name__ == '__main__':
+    main()
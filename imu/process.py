@@ -0,0 +1,278 @@
+"""Чтение, декодирование и фильтр ориентации в отдельном процессе (без Qt).
+
+Дочерний процесс работает с обычным DataReader; вместо хранилища
+устройства он пишет отсчёты и углы в два SharedRing. Родитель (GUI)
+забирает новые записи в своё Device вызовом poll() — по таймеру кадра,
+поэтому декодирование не делит GIL с отрисовкой графиков. Команды
+(фильтр, запись, остановка) и редкие сообщения (статистика, конец
+источника, ошибки) идут через очереди multiprocessing.
+"""
+import multiprocessing
+import queue
+import time
+
+from imu.attitude import ATTITUDE_DTYPE
+from imu.decoder import TIMED_DTYPE, to_timed
+from imu.protocols import AUTO, DEFAULT, PROTOCOLS, get_protocol
+from imu.shared import SharedRing
+
+# Время ожидания запуска дочернего процесса и открытия источника
+START_TIMEOUT = 15.0
+
+
+class _RingDevice:
+    """Вместо Device в дочернем процессе: пачки уходят в разделяемую память.
+
+    Кольцо — TIMED_DTYPE: дополнительные поля протокола до GUI не доходят
+    (в запись, которую ведёт дочерний процесс, они попадают).
+    """
+
+    def __init__(self, samples, attitude):
+        self.samples = samples
+        self.attitude = attitude
+
+    def extend(self, block):
+        self.samples.write(to_timed(block))
+
+    def set_attitude(self, attitude):
+        self.attitude.write(attitude)
+
+
+def _worker_main(source, sample_ring, attitude_ring, capacity, estimator, calibration,
+                 record, batch_interval, stats_interval, control, status, protocol=DEFAULT,
+                 resample=None, nominal_rate=None):
+    from imu.reader import DataReader
+
+    samples = SharedRing(capacity, TIMED_DTYPE, name=sample_ring)
+    attitude = SharedRing(capacity, ATTITUDE_DTYPE, name=attitude_ring)
+    reader = DataReader(batch_interval, on_finished=lambda: status.put(('finished', None)),
+                        protocol=protocol)
+    reader.set_estimator(estimator)
+    reader.calibration = calibration
+    reader.set_resample(resample)
+    reader.nominal_rate = nominal_rate
+    reader.device = _RingDevice(samples, attitude)
+    if record is not None:
+        try:
+            reader.start_recording(*record)
+        except OSError as e:
+            status.put(('record_error', f"Не удалось создать файл:\n{e}"))
+    result = reader.start_source(source)
+    if result is not True:
+        status.put(('error', result[1]))
+        reader.stop_recording()
+        samples.close()
+        attitude.close()
+        return
+    status.put(('started', None))
+
+    last_stats = time.monotonic()
+    while True:
+        try:
+            command, arg = control.get(timeout=min(stats_interval, 0.2))
+        except queue.Empty:
+            command, arg = None, None
+        now = time.monotonic()
+        if now - last_stats >= stats_interval:
+            status.put(('stats', reader.stats.report()))
+            last_stats = now
+        if command == 'stop':
+            break
+        if command == 'estimator':
+            reader.set_estimator(arg)
+        elif command == 'calibration':
+            reader.calibration = arg
+        elif command == 'record':
+            try:
+                reader.start_recording(*arg)
+            except OSError as e:
+                status.put(('record_error', f"Не удалось создать файл:\n{e}"))
+        elif command == 'stop_record':
+            reader.stop_recording()
+
+    reader.stop_reading()
+    reader.stop_recording()
+    status.put(('stats', reader.stats.report()))
+    samples.close()
+    attitude.close()
+
+
+class _StatsProxy:
+    """Последний отчёт PipelineStats, присланный дочерним процессом"""
+
+    def __init__(self):
+        self.last = None
+
+    def report(self):
+        return self.last
+
+
+class ProcessReader:
+    """Аналог DataReader, работающий в дочернем процессе.
+
+    capacity — ёмкость колец разделяемой памяти в отсчётах: столько
+    может накопиться между двумя poll(), прежде чем отсчёты потеряются
+    для GUI (запись в файл идёт в дочернем процессе и от этого не зависит).
+    on_finished вызывается из poll(), когда источник закончился.
+    Очереди потребителей (add_consumer) получают пачки тоже из poll().
+    resample и nominal_rate — как DataReader.set_resample / nominal_rate.
+
+    Ошибки дочернего процесса копятся в errors (их забирает GUI); если
+    не удалось открыть файл записи, recording становится False.
+    """
+
+    def __init__(self, batch_interval=0.02, capacity=1 << 18, estimator='complementary',
+                 stats_interval=1.0, on_finished=None, protocol=DEFAULT, resample=None,
+                 nominal_rate=None):
+        self.batch_interval = batch_interval
+        self.protocol = protocol
+        self.resample = resample
+        self.nominal_rate = nominal_rate
+        self.output_rate = None  # частота отсчётов для сервера (HELLO)
+        self.capacity = capacity
+        self.estimator_name = estimator
+        self.stats_interval = stats_interval
+        self.on_finished = on_finished
+        self.device = None
+        self.consumers = []
+        self.stats = _StatsProxy()
+        self.errors = []  # сообщения об ошибках дочернего процесса
+        self.running = False
+        self.process = None
+        self._samples = None
+        self._attitude = None
+        self._record = None  # (путь, метаданные), если запись включена
+        self._calibration = None
+
+    def add_consumer(self, queue, name=None):
+        """Подключить очередь потребителя (imu.blockqueue.BlockQueue)"""
+        self.consumers.append(queue)
+        return queue
+
+    def remove_consumer(self, queue):
+        self.consumers.remove(queue)
+
+    def set_estimator(self, name):
+        self.estimator_name = name
+        self._send('estimator', name)
+
+    @property
+    def calibration(self):
+        return self._calibration
+
+    @calibration.setter
+    def calibration(self, calibration):
+        self._calibration = calibration
+        self._send('calibration', calibration)
+
+    def start_recording(self, path, meta=None):
+        self._record = (path, meta)
+        self._send('record', self._record)
+
+    def stop_recording(self):
+        self._record = None
+        self._send('stop_record')
+
+    @property
+    def recording(self):
+        return self._record is not None
+
+    def _send(self, command, arg=None):
+        if self.running:
+            self._control.put((command, arg))
+
+    def start_source(self, source):
+        """Запуск дочернего процесса; True или (False, текст ошибки).
+
+        source передаётся в дочерний процесс через pickle до open().
+        """
+        context = multiprocessing.get_context('spawn')
+        self.output_rate = self.resample or getattr(source, 'rate', None)
+        self._samples = SharedRing(self.capacity, TIMED_DTYPE)
+        self._attitude = SharedRing(self.capacity, ATTITUDE_DTYPE)
+        self._control = context.Queue()
+        self._status = context.Queue()
+        self.stats.last = None
+        # Схемы передаются объектами: загруженных из JSON в реестре потомка нет
+        if self.protocol == AUTO:
+            protocol = list(PROTOCOLS.values())
+        elif isinstance(self.protocol, str):
+            protocol = get_protocol(self.protocol)
+        else:
+            protocol = self.protocol
+        self.process = context.Process(
+            target=_worker_main,
+            args=(source, self._samples.name, self._attitude.name, self.capacity,
+                  self.estimator_name, self._calibration, self._record, self.batch_interval, self.stats_interval,
+                  self._control, self._status, protocol, self.resample, self.nominal_rate),
+            daemon=True)
+        try:
+            self.process.start()
+            kind, message = self._status.get(timeout=START_TIMEOUT)
+            while kind == 'record_error':
+                # Запись не открылась, но чтение запускается
+                self._record_failed(message)
+                kind, message = self._status.get(timeout=START_TIMEOUT)
+        except Exception as e:
+            kind, message = 'error', str(e) or "дочерний процесс не запустился"
+        if kind != 'started':
+            self._shutdown()
+            return False, message
+        self.running = True
+        return True
+
+    def poll(self):
+        """Перенести новые отсчёты в device и разобрать сообщения; число отсчётов"""
+        if self._samples is None:
+            return 0
+        block = self._samples.read()
+        attitude = self._attitude.read()
+        if self.device is not None:
+            self.device.extend(block)
+            self.device.set_attitude(attitude)
+        if len(block):
+            for consumer in self.consumers:
+                consumer.put((block, attitude if len(attitude) else None), len(block))
+        finished = False
+        while True:
+            try:
+                kind, message = self._status.get_nowait()
+            except (queue.Empty, OSError, ValueError):
+                break
+            if kind == 'stats':
+                message['ring_lost'] = self._samples.lost
+                self.stats.last = message
+            elif kind == 'finished':
+                finished = True
+            elif kind == 'record_error':
+                self._record_failed(message)
+            elif kind == 'error':
+                self.errors.append(message)
+                print(f"Ошибка процесса чтения: {message}")
+        if finished and self.running and self.on_finished is not None:
+            self.on_finished()
+        return len(block)
+
+    def _record_failed(self, message):
+        self._record = None
+        self.errors.append(message)
+        print(f"Ошибка процесса чтения: {message}")
+
+    def stop_reading(self):
+        """Остановить дочерний процесс (запись в файл при этом закрывается)"""
+        if self.running:
+            self._send('stop')
+            self.running = False
+            self.process.join(timeout=2)
+            self.poll()
+        self._shutdown()
+
+    def _shutdown(self):
+        if self.process is not None and self.process.is_alive():
+            self.process.terminate()
+            self.process.join(timeout=1)
+        for ring in (self._samples, self._attitude):
+            if ring is not None:
+                ring.close()
+        self._samples = None
+        self._attitude = None
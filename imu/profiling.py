@@ -0,0 +1,165 @@
+"""Профилирование живой сессии через cProfile (без Qt).
+
+До Python 3.12 cProfile видит только поток, в котором включён, поэтому
+каждый рабочий поток (чтение, таймер GUI) сам вызывает
+SessionProfiler.sync() раз за итерацию: профилировщик потока включается
+или выключается по общему флагу active. С 3.12 cProfile работает через
+sys.monitoring — профиль один на процесс и сразу видит все потоки (второй
+enable() даёт ValueError), поэтому sync() включает и выключает общий
+профиль. Переключать флаг можно сигналом SIGUSR1 (POSIX), при выключении
+профили сливаются в один файл pstats:
+
+  python main.py --headless --port /dev/ttyUSB0 --profile session.prof
+  kill -USR1 <pid>                       # выкл/вкл, файл пишется при выкл
+  python -m pstats session.prof
+
+Сэмплирующий py-spy подключается к тому же процессу без этого модуля:
+py-spy record --pid <pid> (дочерние процессы чтения — с --subprocesses).
+"""
+import cProfile
+import os
+import pstats
+import signal
+import sys
+import threading
+import time
+
+# cProfile на sys.monitoring: один профиль на процесс для всех потоков
+SHARED = sys.version_info >= (3, 12)
+
+
+class SessionProfiler:
+    """Общий переключатель cProfile для нескольких потоков.
+
+    path — файл pstats, куда пишутся профили при stop() (и при каждом
+    выключении сигналом), накопленные с начала сессии. Снимок объединяет
+    все потоки, вызывавшие sync(). shared=False — свой профиль у каждого
+    потока; он читается только после того, как поток сам его выключил
+    (следующий sync() или release()), — dump() ждёт этого до wait секунд.
+    shared=True — один профиль процесса (по умолчанию с Python 3.12).
+
+    Если профиль не включается (например, занят другим профилировщиком),
+    sync() печатает причину один раз, сохраняет её в error и дальше
+    ничего не делает — чтение от этого не останавливается.
+    """
+
+    def __init__(self, path, active=True, wait=2.0, shared=SHARED):
+        self.path = path
+        self.active = active
+        self.wait = wait
+        self.shared = shared
+        self.dumps = 0
+        self.error = None
+        self._threads = []  # [cProfile.Profile, включён] потоков, вызывавших sync()
+        self._local = threading.local()
+        # RLock: обработчик сигнала может прервать главный поток внутри sync()
+        self._lock = threading.RLock()
+        if shared:
+            self._threads.append([cProfile.Profile(), False])
+
+    def sync(self):
+        """Включить/выключить профиль (потока или общий) по флагу active"""
+        if self.error is not None:
+            return
+        if self.shared:
+            entry = self._threads[0]
+            if entry[1] != self.active:
+                with self._lock:
+                    self._switch(entry, self.active)
+            return
+        entry = getattr(self._local, 'entry', None)
+        if self.active:
+            if entry is None:
+                entry = self._local.entry = [cProfile.Profile(), False]
+                with self._lock:
+                    self._threads.append(entry)
+            if not entry[1]:
+                self._switch(entry, True)
+        elif entry is not None and entry[1]:
+            self._switch(entry, False)
+
+    def _switch(self, entry, enable):
+        if entry[1] == enable:
+            return
+        try:
+            if enable:
+                entry[0].enable()
+            else:
+                entry[0].disable()
+        except Exception as e:
+            self.error = e
+            print(f"Профилирование недоступно: {e}", flush=True)
+            return
+        entry[1] = enable
+
+    def release(self):
+        """Выключить профиль текущего потока (перед его завершением).
+
+        Общий профиль (shared) не трогается — его выключает dump().
+        """
+        entry = getattr(self._local, 'entry', None)
+        if entry is not None and entry[1]:
+            self._switch(entry, False)
+
+    def toggle(self):
+        """Переключить профилирование; при выключении — записать файл"""
+        self.active = not self.active
+        if not self.active:
+            self.dump()
+        return self.active
+
+    def stop(self):
+        self.active = False
+        return self.dump()
+
+    def dump(self):
+        """Слить выключенные профили потоков в path; False — нечего писать"""
+        if self.shared:
+            with self._lock:
+                self._switch(self._threads[0], False)
+        self.release()
+        deadline = time.monotonic() + self.wait
+        while not self.active and time.monotonic() < deadline:
+            with self._lock:
+                if not any(enabled for _, enabled in self._threads):
+                    break
+            time.sleep(0.01)
+        with self._lock:
+            profiles = [profile for profile, enabled in self._threads if not enabled]
+        stats = None
+        for profile in profiles:
+            profile.create_stats()
+            if not profile.stats:
+                continue
+            if stats is None:
+                stats = pstats.Stats(profile)
+            else:
+                stats.add(profile)
+        if stats is None:
+            return False
+        stats.dump_stats(self.path)
+        self.dumps += 1
+        return True
+
+    def install_signal(self):
+        """SIGUSR1 переключает профилирование; False — сигнала нет (Windows)"""
+        if not hasattr(signal, 'SIGUSR1'):
+            return False
+        signal.signal(signal.SIGUSR1, lambda signum, frame: self.sync_toggle())
+        return True
+
+    def sync_toggle(self):
+        # Обработчик сигнала выполняется в главном потоке
+        active = self.toggle()
+        self.sync()
+        state = "включено" if active else f"выключено, записано в {self.path}"
+        print(f"Профилирование {state} (PID {os.getpid()})", flush=True)
+
+
+def session_profiler(path):
+    """SessionProfiler для --profile: включён с начала, SIGUSR1 переключает"""
+    profiler = SessionProfiler(path)
+    hint = ", SIGUSR1 — выкл/вкл" if profiler.install_signal() else ""
+    print(f"Профилирование в {path} (PID {os.getpid()}{hint}; "
+          f"py-spy record --pid {os.getpid()})", flush=True)
+    return profiler
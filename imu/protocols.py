@@ -0,0 +1,88 @@
+"""Реестр схем кадров разных версий прошивки (без Qt).
+
+Схема (imu.decoder.FrameSchema) задаётся декларативно: заголовок,
+длина, поля с dtype и смещениями, контрольная сумма. Встроенные схемы
+регистрируются здесь; свои можно описать в JSON (формат
+FrameSchema.to_dict) и загрузить load_protocols() или --protocol FILE.
+
+По умолчанию (DEFAULT) кадры разбираются по rim1a. protocol='auto' —
+схема выбирается декодером по первым байтам потока среди всех
+зарегистрированных; до выбора (PacketDecoder.DETECT_BYTES байт) отсчётов
+нет, а поток, не похожий ни на одну схему, отмечается как
+PacketDecoder.undetected.
+"""
+import json
+import os
+
+from imu.decoder import CHANNELS, HEADER, RIM1A, FrameSchema, PacketDecoder
+
+AUTO = 'auto'
+DEFAULT = RIM1A.name
+
+PROTOCOLS = {}
+
+
+def register(schema):
+    """Добавить схему в реестр (схема с тем же именем заменяется)"""
+    PROTOCOLS[schema.name] = schema
+    return schema
+
+
+register(RIM1A)
+# Ревизия с температурой (°C) и счётчиком кадров прошивки: 40 байт,
+# последний байт заголовка 0x0B
+register(FrameSchema(
+    'rim1a-tc', HEADER[:2] + b'\x0B', 40,
+    [(name, '<f4', 3 + 4 * k) for k, name in enumerate(CHANNELS)]
+    + [('temp', '<f4', 27), ('counter', '<u4', 31)],
+    description="40 байт: 6 × float32, температура, счётчик кадров, 4 служебных байта, XOR",
+    counter='counter'))
+
+
+def load_protocols(path):
+    """Зарегистрировать схемы из JSON-файла (объект или список объектов).
+
+    Возвращает список схем; OSError, ValueError, KeyError — файл не читается
+    или описание неверно.
+    """
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    return [register(FrameSchema.from_dict(item))
+            for item in (data if isinstance(data, list) else [data])]
+
+
+def get_protocol(name):
+    """Схема по имени из реестра (ValueError — нет такой)"""
+    if name not in PROTOCOLS:
+        raise ValueError(f"Неизвестный протокол: {name}")
+    return PROTOCOLS[name]
+
+
+def resolve(protocol):
+    """Имя, путь к JSON или 'auto' → (схема или None для auto, имя)"""
+    if protocol in (None, AUTO):
+        return None, AUTO
+    if protocol in PROTOCOLS:
+        return PROTOCOLS[protocol], protocol
+    if not os.path.exists(protocol):
+        raise ValueError(f"Неизвестный протокол: {protocol} (есть: {', '.join(PROTOCOLS)})")
+    schemas = load_protocols(protocol)
+    return schemas[0], schemas[0].name
+
+
+def make_decoder(protocol=DEFAULT):
+    """PacketDecoder по схеме: имя, FrameSchema, 'auto' (выбор по потоку
+    среди зарегистрированных) или список схем (выбор среди них)"""
+    if protocol in (None, AUTO):
+        return PacketDecoder(None, PROTOCOLS.values())
+    if isinstance(protocol, (list, tuple)):
+        return PacketDecoder(None, protocol)
+    return PacketDecoder(protocol if isinstance(protocol, FrameSchema) else get_protocol(protocol))
+
+
+def protocol_for_dtype(dtype):
+    """Схема, чьи записи имеют dtype (для воспроизведения записи), или RIM1A"""
+    for schema in PROTOCOLS.values():
+        if schema.timed_dtype == dtype:
+            return schema
+    return RIM1A
@@ -0,0 +1,195 @@
+"""Многоуровневая min/max-пирамида записи для быстрого обзора (без Qt).
+
+Уровень 0 — минимум и максимум каждого канала по корзинам из base
+отсчётов, каждый следующий уровень укрупняет предыдущий в factor раз.
+Пирамида хранится рядом с записью (session.imurec.pyr) в том же
+формате, что и запись: сигнатура, JSON-заголовок (в нём описание
+уровней и размер исходной записи), затем уровни подряд. Уровни
+открываются через np.memmap, поэтому любой видимый диапазон рисуется
+примерно по ширине экрана точек, не трогая сырые отсчёты.
+
+Запуск из командной строки (построить заранее):
+  python -m imu.pyramid session.imurec
+"""
+import argparse
+import os
+
+import numpy as np
+
+from imu.decoder import CHANNELS
+from imu.recording import Recording, _encode_header, dtype_from_descr, read_header
+
+PYRAMID_SUFFIX = '.pyr'
+
+# Корзина: время первого отсчёта, минимумы и максимумы каналов
+BUCKET_DTYPE = np.dtype([('t', '<f8')]
+                        + [(f'min_{name}', '<f4') for name in CHANNELS]
+                        + [(f'max_{name}', '<f4') for name in CHANNELS])
+
+
+def pyramid_path(recording_path):
+    return recording_path + PYRAMID_SUFFIX
+
+
+def _level_sizes(count, base, factor):
+    """Число корзин на уровнях, пока уровень не сожмётся до одной корзины"""
+    sizes = []
+    n = -(-count // base)
+    while n > 0:
+        sizes.append(n)
+        if n == 1:
+            break
+        n = -(-n // factor)
+    return sizes
+
+
+def _reduce(records, size, raw=True):
+    """Корзины по size записей: t первой, min/max каналов (хвост — неполная корзина).
+
+    raw — записи отсчётов (поля каналов), иначе корзины нижнего уровня.
+    """
+    n = len(records)
+    buckets = np.empty(-(-n // size), dtype=BUCKET_DTYPE)
+    starts = np.arange(0, n, size)
+    buckets['t'] = records['t'][starts]
+    for name in CHANNELS:
+        low = records[name if raw else f'min_{name}']
+        high = records[name if raw else f'max_{name}']
+        buckets[f'min_{name}'] = np.minimum.reduceat(low, starts)
+        buckets[f'max_{name}'] = np.maximum.reduceat(high, starts)
+    return buckets
+
+
+def build_pyramid(recording, path=None, base=16, factor=4, chunk=1 << 20, progress=None):
+    """Построить пирамиду для Recording и записать её в path.
+
+    Записи читаются кусками по chunk (кратно base), уровни выше нулевого
+    считаются из уже записанного предыдущего уровня, поэтому память
+    ограничена куском. progress(готово, всего) — по записям уровня 0.
+    """
+    path = path or pyramid_path(recording.path)
+    records = recording.records
+    count = len(records)
+    sizes = _level_sizes(count, base, factor)
+    chunk = max(chunk // base, 1) * base
+    source_size = os.path.getsize(recording.path)
+    meta = {'base': base, 'factor': factor, 'levels': sizes, 'records': count,
+            'source_size': source_size}
+    header = _encode_header(BUCKET_DTYPE, meta)
+    with open(path, 'wb') as f:
+        f.write(header)
+        f.truncate(len(header) + sum(sizes) * BUCKET_DTYPE.itemsize)
+    offsets = len(header) + np.concatenate(([0], np.cumsum(sizes)[:-1])) * BUCKET_DTYPE.itemsize
+    levels = [np.memmap(path, dtype=BUCKET_DTYPE, mode='r+', offset=int(offset), shape=(size,))
+              for offset, size in zip(offsets, sizes)]
+    try:
+        for start in range(0, count, chunk):
+            block = np.asarray(records[start:start + chunk])
+            levels[0][start // base:start // base + -(-len(block) // base)] = _reduce(block, base)
+            if progress is not None:
+                progress(min(start + chunk, count), count)
+        step = max(chunk // factor, 1) * factor
+        for lower, upper in zip(levels, levels[1:]):
+            for start in range(0, len(lower), step):
+                block = np.asarray(lower[start:start + step])
+                upper[start // factor:start // factor + -(-len(block) // factor)] = \
+                    _reduce(block, factor, raw=False)
+        for level in levels:
+            level.flush()
+    except BaseException:
+        del levels
+        os.remove(path)
+        raise
+    return Pyramid(path, recording)
+
+
+class Pyramid:
+    """Пирамида, открытая через np.memmap, и запрос видимого диапазона"""
+
+    def __init__(self, path, recording):
+        self.path = path
+        self.recording = recording
+        with open(path, 'rb') as f:
+            self.meta, header_size = read_header(f)
+        dtype = dtype_from_descr(self.meta['dtype'])
+        self.base = self.meta['base']
+        self.factor = self.meta['factor']
+        self.levels = []
+        offset = header_size
+        for size in self.meta['levels']:
+            self.levels.append(np.memmap(path, dtype=dtype, mode='r', offset=offset, shape=(size,)))
+            offset += size * dtype.itemsize
+
+    def is_current(self):
+        """Пирамида построена по этой же (не дописанной с тех пор) записи"""
+        return (self.meta.get('records') == len(self.recording)
+                and self.meta.get('source_size') == os.path.getsize(self.recording.path))
+
+    @property
+    def time_range(self):
+        t = self.recording.timestamps
+        return (float(t[0]), float(t[-1])) if len(t) else (0.0, 0.0)
+
+    def view(self, t0, t1, width):
+        """Данные для показа [t0, t1] примерно в width точек по горизонтали.
+
+        Возвращает (t (n,), low (channels, n), high (channels, n)): для
+        сырых отсчётов low и high совпадают. Корзина рисуется двумя
+        точками (min и max), поэтому уровень выбирается самый подробный,
+        где в диапазоне не больше width / 2 корзин.
+        """
+        records = self.recording.records
+        t = self.recording.timestamps
+        lo = max(int(np.searchsorted(t, t0, side='left')) - 1, 0)
+        hi = min(int(np.searchsorted(t, t1, side='right')) + 1, len(records))
+        width = max(int(width), 1)
+        if hi - lo <= width:
+            block = np.asarray(records[lo:hi])
+            data = np.stack([block[name] for name in CHANNELS])
+            return block['t'].astype(np.float64), data, data
+        size = self.base
+        for level in self.levels:
+            first, last = lo // size, -(-hi // size)
+            if 2 * (last - first) <= width or level is self.levels[-1]:
+                buckets = np.asarray(level[first:last])
+                low = np.stack([buckets[f'min_{name}'] for name in CHANNELS])
+                high = np.stack([buckets[f'max_{name}'] for name in CHANNELS])
+                return buckets['t'], low, high
+            size *= self.factor
+
+
+def open_pyramid(recording, build=True, progress=None):
+    """Пирамида рядом с записью; строится заново, если её нет или она устарела"""
+    path = pyramid_path(recording.path)
+    if os.path.exists(path):
+        try:
+            pyramid = Pyramid(path, recording)
+            if pyramid.is_current():
+                return pyramid
+        except (OSError, ValueError, KeyError):
+            pass
+    if not build:
+        return None
+    return build_pyramid(recording, path, progress=progress)
+
+
+def envelope(t, low, high):
+    """Ломаная для графика: в каждой точке t — переход от min к max"""
+    x = np.repeat(t, 2)
+    y = np.empty((low.shape[0], 2 * low.shape[1]), dtype=np.float64)
+    y[:, 0::2] = low
+    y[:, 1::2] = high
+    return x, y
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Построить min/max-пирамиду записи")
+    parser.add_argument('recording')
+    args = parser.parse_args(argv)
+    recording = Recording(args.recording)
+    pyramid = build_pyramid(recording)
+    print(f"{pyramid.path}: уровней {len(pyramid.levels)}, корзин {sum(map(len, pyramid.levels))}")
+
+
+if __name__ == '__main__':
+    main()
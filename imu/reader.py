@@ -0,0 +1,358 @@
+"""Поток чтения: источник → декодер → блоки отсчётов (без Qt)"""
+import threading
+import time
+
+import numpy as np
+
+from imu.protocols import DEFAULT, make_decoder
+from imu.sources import SerialSource
+from imu.stats import PipelineStats
+from imu.timing import RateEstimator, Resampler, SequenceTracker
+
+
+class DataReader:
+    """Чтение данных из источника (COM-порт, файл, генератор)
+    в отдельном потоке.
+
+    Кадры разбираются по схеме protocol (имя из imu.protocols, FrameSchema
+    или 'auto' — схема выбирается по первым байтам потока). Источник,
+    знающий схему своих кадров (source.schema — воспроизведение записи),
+    разбирается по ней. Источник с готовыми отсчётами (source.timed —
+    подписка на сервер) декодер минует: метки времени остаются его.
+    Отсчёты выдаются блоками TIMED_DTYPE (и дополнительными полями схемы,
+    если они есть — schema.timed_dtype): каждому присваивается время
+    хоста, равномерно распределённое между приходом предыдущего и
+    текущего куска байт. Если у источника известна номинальная частота
+    (source.rate), метки идут с этим шагом от начала чтения — так время
+    верно и при ускоренном воспроизведении. Если в схеме есть счётчик
+    кадров (schema.counter), метки учитывают потерянные кадры, а их
+    число считает sequence (imu.timing.SequenceTracker).
+
+    rate_estimator (imu.timing.RateEstimator) по приходу кусков ведёт
+    фактическую частоту, джиттер и уход часов датчика относительно
+    nominal_rate (или source.rate × speed воспроизведения). Если задан
+    resampler (set_resample), отсчёты после калибровки переводятся на
+    равномерную сетку — фильтр, запись, хранилище и потребители видят
+    уже её.
+
+    batch_interval — период (с) выдачи накопленных отсчётов через
+    deliver_block(). При batch_interval=None каждый декодированный кусок
+    сразу уходит в deliver_samples(). По умолчанию оба метода вызывают
+    on_block, а конец источника — on_finished (в том же потоке).
+
+    Если задана calibration (imu.calibration.Calibration), поправка
+    применяется к каждому блоку сразу после декодирования — фильтр,
+    запись, хранилище и потребители видят уже исправленные отсчёты.
+
+    Если задан estimator (см. imu.attitude), ориентация считается здесь
+    же, в потоке чтения, и выдаётся через deliver_attitude() / on_attitude.
+    Если задан device (imu.devices.Device), отсчёты и ориентация пишутся
+    в него из потока чтения (теми же пачками), минуя GUI-поток.
+
+    Потребители в своих потоках получают пачки через add_consumer():
+    ограниченную очередь BlockQueue с элементами (блок, ориентация или
+    None) и своей политикой переполнения. Recorder — потребитель без
+    потерь: его очередь при переполнении задерживает поток чтения.
+    Поток чтения пишет в него под блокировкой, и присваивание recorder
+    (в том числе None) ждёт конца текущей записи — после него Recorder
+    можно закрывать, не теряя последний блок.
+
+    stats (imu.stats.PipelineStats) — счётчики байт, кадров, ошибок,
+    время декодирования и счётчики очередей потребителей. Если задан
+    profiler (imu.profiling.SessionProfiler), поток чтения включает
+    и выключает свой профиль по его флагу.
+    """
+
+    def __init__(self, batch_interval=0.02, on_block=None, on_finished=None,
+                 on_attitude=None, protocol=DEFAULT, **kwargs):
+        super().__init__(**kwargs)
+        self.source = None
+        self.running = False
+        self.protocol = protocol
+        self.decoder = make_decoder(protocol)
+        self.stats = PipelineStats(self.decoder)
+        self.batch_interval = batch_interval
+        self.consumers = []  # BlockQueue потребителей
+        self._recorder = None
+        self._recorder_lock = threading.Lock()
+        self.estimator = None  # фильтр ориентации (AttitudeEstimator)
+        self.calibration = None  # поправка датчиков (Calibration)
+        self.resampler = None  # передискретизация (Resampler)
+        self.nominal_rate = None  # номинальная частота датчика, Гц
+        self.sequence = None  # пропуски по счётчику кадров (SequenceTracker)
+        self.rate_estimator = RateEstimator()
+        self.stats.timing = self.rate_estimator
+        self.device = None  # Device общего хранилища отсчётов
+        self.profiler = None  # SessionProfiler живой сессии
+        self.on_block = on_block
+        self.on_finished = on_finished
+        self.on_attitude = on_attitude
+        self.thread = None
+        self._last_arrival = None
+        self._position = -1  # номер последнего отсчёта с меткой времени
+        self._t0 = 0.0
+
+    @property
+    def recorder(self):
+        """Recorder, получающий все отсчёты с метками времени"""
+        return self._recorder
+
+    @recorder.setter
+    def recorder(self, recorder):
+        with self._recorder_lock:
+            self._recorder = recorder
+        if recorder is not None:
+            self.stats.queues['recorder'] = recorder.queue
+        else:
+            self.stats.queues.pop('recorder', None)
+
+    def set_protocol(self, protocol):
+        """Схема кадра до start_source(): имя, FrameSchema или 'auto'"""
+        self.protocol = protocol
+        self.decoder = make_decoder(protocol)
+        self.stats.decoder = self.decoder
+
+    def set_resample(self, rate):
+        """Передискретизация на равномерную сетку rate Гц (None или 0 — без неё)"""
+        self.resampler = Resampler(rate) if rate else None
+
+    @property
+    def output_rate(self):
+        """Частота выдаваемых отсчётов: сетки или номинальная источника"""
+        if self.resampler is not None:
+            return self.resampler.rate
+        return getattr(self.source, 'rate', None)
+
+    def set_estimator(self, name):
+        """Фильтр ориентации по имени из imu.attitude.ESTIMATORS (None — без него)"""
+        from imu.attitude import ESTIMATORS
+        self.estimator = ESTIMATORS[name]() if name else None
+
+    def start_recording(self, path, meta=None):
+        """Начать запись всех отсчётов в файл .imurec (OSError — не удалось открыть)"""
+        from imu.recording import Recorder
+        self.stop_recording()
+        self.recorder = Recorder(path, meta=meta)
+
+    def stop_recording(self):
+        recorder = self.recorder
+        self.recorder = None
+        if recorder is not None:
+            recorder.close()
+
+    def add_consumer(self, queue, name=None):
+        """Подключить очередь потребителя (imu.blockqueue.BlockQueue)"""
+        self.consumers.append(queue)
+        self.stats.queues[name or f"consumer{len(self.consumers)}"] = queue
+        return queue
+
+    def remove_consumer(self, queue):
+        self.consumers.remove(queue)
+        for name, q in list(self.stats.queues.items()):
+            if q is queue:
+                del self.stats.queues[name]
+
+    def start_reading(self, port, baud_rate):
+        """Запуск чтения данных с COM-порта"""
+        return self.start_source(SerialSource(port, baud_rate, timeout=1))
+
+    def start_source(self, source):
+        """Запуск чтения данных из произвольного источника"""
+        try:
+            source.open()
+            self.source = source
+            # Свежий декодер: схема записи важнее выбранной (см. выше);
+            # у готовых отсчётов схема нужна только для счётчика кадров
+            schema = getattr(source, 'schema', None)
+            if schema is None and source.timed:
+                schema = DEFAULT
+            self.decoder = self.stats.decoder = make_decoder(schema or self.protocol)
+            self.stats.reset()
+            self._last_arrival = None
+            self._position = -1
+            self.sequence = self.stats.sequence = None
+            self.rate_estimator.nominal = self.nominal_rate or _paced_rate(source)
+            self.rate_estimator.reset()
+            if self.resampler is not None:
+                self.resampler.reset()
+            if self.estimator is not None:
+                self.estimator.reset()
+            self.running = True
+            self.thread = threading.Thread(target=self._read_loop, daemon=True)
+            self.thread.start()
+            return True
+        except Exception as e:
+            return False, str(e)
+
+    def stop_reading(self):
+        """Остановка чтения данных"""
+        self.running = False
+        if self.source and self.source.is_open:
+            self.source.close()
+        if self.thread and self.thread is not threading.current_thread():
+            self.thread.join(timeout=1)
+
+    def deliver_block(self, block):
+        if self.on_block is not None:
+            self.on_block(block)
+
+    def deliver_samples(self, samples):
+        if self.on_block is not None and len(samples):
+            self.on_block(samples)
+
+    def deliver_attitude(self, attitude):
+        if self.on_attitude is not None:
+            self.on_attitude(attitude)
+
+    def deliver_finished(self):
+        if self.on_finished is not None:
+            self.on_finished()
+
+    def _positions(self, samples):
+        """Номера отсчётов от начала чтения: по счётчику кадров схемы
+        (с пропусками) или подряд"""
+        schema = self.decoder.schema
+        if schema.counter is None or schema.counter not in samples.dtype.names:
+            return self._position + 1 + np.arange(len(samples))
+        sequence = self.sequence
+        if sequence is None or sequence.bits != schema.counter_bits:
+            sequence = self.sequence = self.stats.sequence = SequenceTracker(schema.counter_bits)
+        return sequence.update(samples[schema.counter])
+
+    def _stamp(self, samples, arrival):
+        """Блок с полем t: время отсчётов между прошлым и текущим куском"""
+        positions = self._positions(samples)
+        self.rate_estimator.update(arrival, positions[-1])
+        if self.source.timed:
+            # Отсчёты уже с метками времени источника
+            self._last_arrival = arrival
+            self._position = int(positions[-1])
+            return samples
+        block = np.empty(len(samples), dtype=self.decoder.schema.timed_dtype)
+        prev = self._last_arrival
+        rate = self.source.rate
+        if rate:
+            if prev is None:
+                self._t0 = arrival - positions[-1] / rate
+            block['t'] = self._t0 + positions / rate
+        elif prev is None or arrival <= prev:
+            block['t'] = arrival
+        else:
+            # Пропущенные кадры занимают свою долю интервала
+            steps = positions - self._position
+            block['t'] = prev + (arrival - prev) * steps / steps[-1]
+        self._last_arrival = arrival
+        self._position = int(positions[-1])
+        for name in samples.dtype.names:
+            block[name] = samples[name]
+        return block
+
+    def _prepare(self, samples, arrival):
+        """Метки времени, поправка датчиков и передискретизация"""
+        block = self._stamp(samples, arrival)
+        calibration = self.calibration
+        if calibration is not None:
+            calibration.apply(block)
+        resampler = self.resampler
+        if resampler is not None:
+            block = resampler.feed(block)
+        return block
+
+    def _read_loop(self):
+        """Основной цикл чтения данных"""
+        pending = []
+        pending_attitude = []
+        stats = self.stats
+        last_emit = time.monotonic()
+        while self.running:
+            try:
+                profiler = self.profiler
+                if profiler is not None:
+                    profiler.sync()
+                chunk = self.source.read_chunk()
+                if chunk is None:
+                    break
+                if len(chunk):
+                    arrival = time.time()
+                    if self.source.timed:
+                        samples = chunk
+                        stats.bytes += chunk.nbytes
+                    else:
+                        t0 = time.perf_counter()
+                        samples = self.decoder.feed(chunk)
+                        stats.decode_time.record(time.perf_counter() - t0)
+                        stats.bytes += len(chunk)
+                    stats.chunks += 1
+                    stats.packets += len(samples)
+                    block = self._prepare(samples, arrival) if len(samples) else samples
+                    if len(block):
+                        with self._recorder_lock:
+                            recorder = self._recorder
+                            if recorder is not None:
+                                recorder.write(block)
+                        estimator = self.estimator
+                        attitude = estimator.update_block(block) if estimator else None
+                        if self.batch_interval is None:
+                            self._publish(block, attitude)
+                            self.deliver_samples(block)
+                            if attitude is not None:
+                                self.deliver_attitude(attitude)
+                        else:
+                            pending.append(block)
+                            if attitude is not None:
+                                pending_attitude.append(attitude)
+                            stats.queue_depth += len(block)
+                            if stats.queue_depth > stats.queue_high_water:
+                                stats.queue_high_water = stats.queue_depth
+
+                now = time.monotonic()
+                if pending and now - last_emit >= self.batch_interval:
+                    self._emit_block(pending, pending_attitude)
+                    pending = []
+                    pending_attitude = []
+                    stats.queue_depth = 0
+                    last_emit = now
+            except Exception as e:
+                if self.running:
+                    stats.read_errors += 1
+                    print(f"Ошибка чтения: {e}")
+                break
+            if not len(chunk) and not self.source.blocking:
+                time.sleep(0.001)
+        if pending:
+            self._emit_block(pending, pending_attitude)
+            stats.queue_depth = 0
+        if self.profiler is not None:
+            self.profiler.release()
+        if self.running:
+            self.deliver_finished()
+
+    def _emit_block(self, blocks, attitudes):
+        """Выдать накопленные отсчёты одним непрерывным массивом"""
+        block = _join(blocks)
+        attitude = _join(attitudes) if attitudes else None
+        self._publish(block, attitude)
+        self.deliver_block(block)
+        if attitude is not None:
+            self.deliver_attitude(attitude)
+
+    def _publish(self, block, attitude):
+        """Пачка — в хранилище устройства и очереди потребителей"""
+        device = self.device
+        if device is not None:
+            device.extend(block)
+            if attitude is not None:
+                device.set_attitude(attitude)
+        for consumer in self.consumers:
+            consumer.put((block, attitude), len(block))
+
+
+def _paced_rate(source):
+    """Ожидаемая частота прихода отсчётов источника с известной частотой"""
+    rate = getattr(source, 'rate', None)
+    speed = getattr(source, 'speed', 1.0)
+    return rate * speed if rate and speed else None
+
+
+def _join(blocks):
+    return blocks[0] if len(blocks) == 1 else np.concatenate(blocks)
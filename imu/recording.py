@@ -0,0 +1,195 @@
+"""Запись сессий в бинарный файл и чтение записей через np.memmap.
+
+Формат файла:
+  8 байт   — сигнатура MAGIC
+  4 байта  — длина заголовка целиком (uint32, little-endian)
+  JSON     — метаданные (версия, описание dtype записи, время создания),
+             дополненные пробелами до HEADER_ALIGN
+  далее    — записи фиксированного размера с dtype из метаданных
+"""
+import json
+import struct
+import threading
+import time
+
+import numpy as np
+
+from imu.blockqueue import BlockQueue
+from imu.decoder import TIMED_DTYPE
+
+MAGIC = b'IMUREC\x00\x01'
+FORMAT_VERSION = 1
+HEADER_ALIGN = 4096
+
+# Запись: время хоста (с, эпоха Unix) и значения каналов
+RECORD_DTYPE = TIMED_DTYPE
+
+
+def make_records(samples, timestamps, dtype=RECORD_DTYPE):
+    """Собрать массив записей из отсчётов и времени (скаляр или массив)"""
+    records = np.empty(len(samples), dtype=dtype)
+    records['t'] = timestamps
+    for name in dtype.names[1:]:
+        records[name] = samples[name]
+    return records
+
+
+def _encode_header(dtype, meta):
+    meta = dict(meta)
+    meta.update(version=FORMAT_VERSION, dtype=dtype.descr)
+    body = json.dumps(meta, ensure_ascii=False).encode('utf-8')
+    size = len(MAGIC) + 4 + len(body)
+    size = -(-size // HEADER_ALIGN) * HEADER_ALIGN
+    body += b' ' * (size - len(MAGIC) - 4 - len(body))
+    return MAGIC + struct.pack('<I', size) + body
+
+
+def dtype_from_descr(descr):
+    """np.dtype из описания, прошедшего через JSON (списки вместо кортежей)"""
+    fields = []
+    for field in descr:
+        name, fmt = field[0], field[1]
+        if len(field) > 2:
+            fields.append((name, fmt, tuple(field[2])))
+        else:
+            fields.append((name, fmt))
+    return np.dtype(fields)
+
+
+def read_header(f):
+    """Прочитать заголовок из открытого файла: (метаданные, длина заголовка)"""
+    magic = f.read(len(MAGIC))
+    if magic != MAGIC:
+        raise ValueError("Файл не является записью IMU")
+    (size,) = struct.unpack('<I', f.read(4))
+    meta = json.loads(f.read(size - len(MAGIC) - 4).decode('utf-8'))
+    return meta, size
+
+
+class Recorder:
+    """Потоковая запись отсчётов в файл из фонового потока.
+
+    write() только ставит блок в очередь и сразу возвращается, поэтому
+    задержки диска не тормозят цикл чтения порта. Поток записи пишет
+    крупными буферизованными кусками и периодически сбрасывает буфер.
+
+    Очередь ограничена queue_size записями и работает без потерь: если
+    диск не успевает, write() ждёт места (счётчики — в self.queue).
+
+    dtype=None — dtype записи берётся из первого блока (со всеми полями
+    протокола кадра, см. imu.protocols); заголовок тогда пишется при
+    первом write() или при close(), если блоков не было (под блокировкой:
+    write() и close() вызываются из разных потоков).
+
+    Блоки, пришедшие после close(), в файл не попадают — их число
+    считает dropped_records.
+    """
+
+    def __init__(self, path, dtype=None, buffer_size=1 << 20,
+                 flush_interval=1.0, meta=None, queue_size=1 << 18):
+        self.path = path
+        self.dtype = None
+        self.meta = dict(meta or {}, created=time.time())
+        self.flush_interval = flush_interval
+        self.records_written = 0
+        self.dropped_records = 0
+        self.error = None
+        self.queue = BlockQueue(queue_size, policy='block')
+        self._file = open(path, 'wb', buffering=buffer_size)
+        self._header_lock = threading.Lock()
+        if dtype is not None:
+            self._write_header(dtype)
+        self._thread = threading.Thread(target=self._write_loop, daemon=True)
+        self._thread.start()
+
+    def write(self, samples, timestamps=None):
+        """Поставить блок отсчётов в очередь на запись.
+
+        samples — блок с полем 't' (TIMED_DTYPE) или отсчёты SAMPLE_DTYPE
+        вместе с timestamps (скаляр или массив).
+        """
+        if not len(samples):
+            return
+        if self.dtype is None:
+            names = samples.dtype.names
+            self._ensure_header(samples.dtype if 't' in names else
+                                np.dtype([('t', '<f8')] + samples.dtype.descr))
+        if timestamps is None and samples.dtype == self.dtype:
+            records = samples
+        else:
+            records = make_records(samples, samples['t'] if timestamps is None else timestamps,
+                                   self.dtype)
+        if not self.queue.put(records):
+            self.dropped_records += len(records)
+
+    def _ensure_header(self, dtype):
+        """Записать заголовок, если его ещё нет (первый из write() и close())"""
+        with self._header_lock:
+            if self.dtype is None:
+                self._write_header(dtype)
+
+    def _write_header(self, dtype):
+        # До первого блока поток записи в файл не пишет — гонки с ним нет
+        self.dtype = np.dtype(dtype)
+        self._file.write(_encode_header(self.dtype, self.meta))
+
+    def close(self):
+        """Дописать очередь и закрыть файл"""
+        if self._thread is None:
+            return
+        self._ensure_header(RECORD_DTYPE)
+        self.queue.close()
+        self._thread.join()
+        self._thread = None
+        self._file.close()
+
+    def _write_loop(self):
+        last_flush = time.monotonic()
+        while True:
+            closed = self.queue.closed
+            blocks = self.queue.get_all(timeout=self.flush_interval)
+            try:
+                for records in blocks:
+                    self._file.write(records.tobytes())
+                    self.records_written += len(records)
+                if closed and not blocks:
+                    break
+                now = time.monotonic()
+                if now - last_flush >= self.flush_interval:
+                    self._file.flush()
+                    last_flush = now
+            except Exception as e:
+                self.error = e
+                print(f"Ошибка записи: {e}")
+                # Не держать поток чтения в ожидании места в очереди
+                self.queue.close()
+                break
+
+
+class Recording:
+    """Запись сессии, открытая через np.memmap (без загрузки в память)"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self.meta, self.header_size = read_header(f)
+            f.seek(0, 2)
+            file_size = f.tell()
+        self.dtype = dtype_from_descr(self.meta['dtype'])
+        # Незавершённая последняя запись (при обрыве) отбрасывается
+        count = (file_size - self.header_size) // self.dtype.itemsize
+        if count > 0:
+            self.records = np.memmap(path, dtype=self.dtype, mode='r',
+                                     offset=self.header_size, shape=(count,))
+        else:
+            self.records = np.empty(0, dtype=self.dtype)
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def timestamps(self):
+        return self.records['t']
+
+    def channel(self, name):
+        return self.records[name]
@@ -0,0 +1,84 @@
+"""Кольцевой буфер истории отсчётов для всех каналов"""
+import numpy as np
+
+from imu.decoder import CHANNELS
+
+
+class RingBuffer:
+    """Кольцевой буфер фиксированной ёмкости на NumPy.
+
+    Каждый отсчёт пишется дважды — в позицию i и i + capacity, поэтому
+    последние N отсчётов всегда лежат в памяти подряд и отдаются как
+    представление без копирования. Добавление — O(1), блок — O(len(block)).
+    """
+
+    def __init__(self, capacity, channels=CHANNELS, dtype=np.float32):
+        if capacity <= 0:
+            raise ValueError("capacity должен быть положительным")
+        self.capacity = int(capacity)
+        self.channels = tuple(channels)
+        self._index = {name: i for i, name in enumerate(self.channels)}
+        self._data = np.zeros((len(self.channels), 2 * self.capacity), dtype=dtype)
+        self._head = 0    # позиция следующей записи
+        self._count = 0   # количество отсчётов в буфере
+        self.total = 0    # сколько отсчётов добавлено за всё время
+
+    def __len__(self):
+        return self._count
+
+    def clear(self):
+        self._head = 0
+        self._count = 0
+        self.total = 0
+
+    def append(self, values):
+        """Добавить один отсчёт (значения в порядке channels)"""
+        head = self._head
+        self._data[:, head] = values
+        self._data[:, head + self.capacity] = values
+        self._head = (head + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+        self.total += 1
+
+    def extend(self, block):
+        """Добавить блок отсчётов.
+
+        block — структурированный массив с полями channels
+        или двумерный массив формы (n, len(channels)).
+        """
+        if block.dtype.names:
+            columns = np.stack([block[name] for name in self.channels])
+        else:
+            columns = np.asarray(block).T
+        n = columns.shape[1]
+        if n == 0:
+            return
+        self.total += n
+        if n >= self.capacity:
+            columns = columns[:, -self.capacity:]
+            self._data[:, :self.capacity] = columns
+            self._data[:, self.capacity:] = columns
+            self._head = 0
+            self._count = self.capacity
+            return
+
+        head = self._head
+        first = min(n, self.capacity - head)
+        # Основная копия (с переносом через конец)
+        self._data[:, head:head + first] = columns[:, :first]
+        self._data[:, :n - first] = columns[:, first:]
+        # Зеркальная копия
+        self._data[:, head + self.capacity:head + self.capacity + first] = columns[:, :first]
+        self._data[:, self.capacity:self.capacity + n - first] = columns[:, first:]
+        self._head = (head + n) % self.capacity
+        self._count = min(self._count + n, self.capacity)
+
+    def last(self, n=None):
+        """Последние n отсчётов всех каналов — массив (channels, n) без копирования"""
+        n = self._count if n is None else min(int(n), self._count)
+        end = self._head + self.capacity
+        return self._data[:, end - n:end]
+
+    def channel(self, name, n=None):
+        """Последние n отсчётов одного канала без копирования"""
+        return self.last(n)[self._index[name]]
@@ -0,0 +1,440 @@
+"""Раздача декодированных отсчётов по сети: TCP, UDP и WebSocket (без Qt).
+
+Формат кадра (little-endian): 8 байт заголовка FRAME — сигнатура b'IM',
+вид кадра, номер устройства, число записей (для HELLO — длина JSON),
+затем записи как есть (ATTITUDE_DTYPE или отсчёты схемы кадра устройства:
+TIMED_DTYPE и поля протокола, например счётчик и температура). Первым
+каждому клиенту уходит HELLO с описанием dtype, у каждого устройства —
+свой dtype отсчётов и протокол; если они меняются (протокол 'auto'
+определился), HELLO рассылается заново.
+
+StreamServer работает в своём потоке с циклом asyncio. Поток чтения
+кладёт пачки в очередь BlockQueue (политика drop_oldest — чтение не
+ждёт сеть), цикл кодирует каждую пачку один раз и раздаёт клиентам.
+У каждого клиента ограничен объём неотправленного: клиент, который не
+успевает читать, отключается, остальные этого не замечают.
+
+TCP — поток кадров подряд. WebSocket — те же кадры в бинарных
+сообщениях (минимальный сервер RFC 6455, без расширений). UDP —
+клиент шлёт на порт датаграмму b'SUB' (и повторяет её хотя бы раз
+в UDP_TIMEOUT с), пачки режутся на датаграммы по UDP_PAYLOAD байт записей;
+потери UDP не восполняются.
+"""
+import asyncio
+import base64
+import hashlib
+import json
+import socket
+import struct
+import threading
+import time
+
+import numpy as np
+
+from imu.attitude import ATTITUDE_DTYPE
+from imu.blockqueue import BlockQueue
+from imu.decoder import TIMED_DTYPE
+from imu.recording import dtype_from_descr
+from imu.sources import parse_address  # noqa: F401 — прежнее место
+
+MAGIC = b'IM'
+FRAME = struct.Struct('<2sBBI')
+KIND_HELLO = 0
+KIND_SAMPLES = 1
+KIND_ATTITUDE = 2
+DTYPES = {KIND_SAMPLES: TIMED_DTYPE, KIND_ATTITUDE: ATTITUDE_DTYPE}
+
+# Байт записей в датаграмме (40 × 32 байта TIMED_DTYPE) — без фрагментации IP при MTU 1500
+UDP_PAYLOAD = 1280
+UDP_TIMEOUT = 10.0
+# Больше этого в буфере отправки UDP — датаграммы клиенту отбрасываются
+UDP_BUFFER_LIMIT = 1 << 20
+
+_WS_GUID = b'258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+
+
+def encode_frame(kind, device, records):
+    """Кадр с записями (структурированный массив) одного устройства"""
+    return FRAME.pack(MAGIC, kind, device, len(records)) + records.tobytes()
+
+
+def encode_hello(devices):
+    body = json.dumps({'samples': TIMED_DTYPE.descr, 'attitude': ATTITUDE_DTYPE.descr,
+                       'devices': devices}, ensure_ascii=False).encode('utf-8')
+    return FRAME.pack(MAGIC, KIND_HELLO, 0, len(body)) + body
+
+
+def server_from_args(args):
+    """StreamServer по --serve / --serve-udp / --serve-ws или None, если их нет"""
+    addresses = [parse_address(value, None) if value else None
+                 for value in (args.serve, args.serve_udp, args.serve_ws)]
+    if not any(addresses):
+        return None
+    # Порт без адреса слушает тот же адрес, что и остальные (или все интерфейсы)
+    hosts = {address[0] for address in addresses if address and address[0]}
+    if len(hosts) > 1:
+        raise ValueError("--serve, --serve-udp и --serve-ws должны слушать один адрес")
+    tcp, udp, ws = (address[1] if address else None for address in addresses)
+    return StreamServer(hosts.pop() if hosts else '0.0.0.0', tcp, udp, ws)
+
+
+def sample_layout(reader):
+    """dtype пачек reader: схема его декодера (у ProcessReader — TIMED_DTYPE)"""
+    decoder = getattr(reader, 'decoder', None)
+    schema = decoder.schema if decoder is not None else None
+    return schema.timed_dtype if schema is not None else TIMED_DTYPE
+
+
+class FrameParser:
+    """Разбор потока кадров: feed(байты) → [(вид, устройство, записи или dict)]
+
+    Отсчёты каждого устройства разбираются по dtype из последнего HELLO.
+    """
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.dtypes = dict(DTYPES)
+        self.device_dtypes = {}  # номер устройства → dtype отсчётов
+
+    def feed(self, data):
+        self.buffer += data
+        frames = []
+        offset = 0
+        while len(self.buffer) - offset >= FRAME.size:
+            magic, kind, device, count = FRAME.unpack_from(self.buffer, offset)
+            if magic != MAGIC:
+                raise ValueError("Поток не содержит кадров IMU")
+            dtype = None if kind == KIND_HELLO else self._dtype(kind, device)
+            size = count if dtype is None else count * dtype.itemsize
+            end = offset + FRAME.size + size
+            if end > len(self.buffer):
+                break
+            body = bytes(self.buffer[offset + FRAME.size:end])
+            if kind == KIND_HELLO:
+                hello = json.loads(body.decode('utf-8'))
+                self.dtypes[KIND_SAMPLES] = dtype_from_descr(hello['samples'])
+                self.dtypes[KIND_ATTITUDE] = dtype_from_descr(hello['attitude'])
+                self.device_dtypes = {info['index']: dtype_from_descr(info['samples'])
+                                      for info in hello['devices'] if info.get('samples')}
+                frames.append((kind, device, hello))
+            else:
+                frames.append((kind, device, np.frombuffer(body, dtype=dtype)))
+            offset = end
+        del self.buffer[:offset]
+        return frames
+
+    def _dtype(self, kind, device):
+        if kind == KIND_SAMPLES:
+            return self.device_dtypes.get(device, self.dtypes[kind])
+        return self.dtypes[kind]
+
+
+class _Client:
+    """Подписчик: кадры пишутся в транспорт, его буфер — очередь клиента.
+
+    Если в буфере уже больше limit байт (клиент не успевает читать),
+    клиент отключается: память сервера и поток чтения от него не зависят.
+    """
+
+    def __init__(self, server, writer, limit):
+        self.server = server
+        self.writer = writer
+        self.transport = writer.transport
+        self.limit = limit
+
+    def send(self, frame):
+        """Кадр в очередь отправки; False — клиент отключён"""
+        if self.transport.is_closing():
+            return False
+        if self.transport.get_write_buffer_size() + len(frame) > self.limit:
+            self.close()
+            return False
+        self.transport.write(self.wrap(frame))
+        self.server.frames_sent += 1
+        self.server.bytes_sent += len(frame)
+        return True
+
+    def wrap(self, frame):
+        return frame
+
+    def finish(self):
+        """Клиент отключился сам: дослать ждущее и закрыть"""
+        self.server.clients.discard(self)
+        self.writer.close()
+
+    def close(self):
+        """Отключить не успевающего клиента (ждущие кадры теряются)"""
+        if self in self.server.clients:
+            self.server.clients.discard(self)
+            self.server.dropped_clients += 1
+        self.transport.abort()
+
+
+class _WebSocketClient(_Client):
+    def wrap(self, frame):
+        n = len(frame)
+        if n < 126:
+            header = struct.pack('!BB', 0x82, n)
+        elif n < 1 << 16:
+            header = struct.pack('!BBH', 0x82, 126, n)
+        else:
+            header = struct.pack('!BBQ', 0x82, 127, n)
+        return header + frame
+
+
+class _UdpProtocol(asyncio.DatagramProtocol):
+    def __init__(self, server):
+        self.server = server
+
+    def datagram_received(self, data, addr):
+        if data.startswith(b'SUB'):
+            if addr not in self.server.udp_clients:
+                self.server.clients_total += 1
+                self.server.send_udp(addr, self.server.hello())
+            self.server.udp_clients[addr] = time.monotonic()
+        elif data.startswith(b'UNSUB'):
+            self.server.udp_clients.pop(addr, None)
+
+
+class StreamServer:
+    """Сервер раздачи отсчётов подключённых DataReader.
+
+    port / udp_port / ws_port — порты TCP, UDP и WebSocket (None — не
+    открывать, 0 — любой свободный; фактические — в addresses после
+    start()). client_buffer — сколько байт может ждать отправки одному
+    клиенту, send_buffer — SO_SNDBUF его сокета, input_capacity —
+    ёмкость очереди от потока чтения (отсчётов).
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, udp_port=None, ws_port=None,
+                 client_buffer=1 << 20, send_buffer=1 << 18, input_capacity=200_000):
+        self.host = host
+        self.ports = {'tcp': port, 'udp': udp_port, 'ws': ws_port}
+        self.addresses = {}
+        self.client_buffer = client_buffer
+        self.send_buffer = send_buffer
+        self.input_capacity = input_capacity
+        self.clients = set()
+        self.udp_clients = {}  # адрес → время последнего SUB
+        self.clients_total = 0
+        self.dropped_clients = 0
+        self.frames_sent = 0
+        self.bytes_sent = 0
+        self.udp_dropped = 0
+        self._inputs = []  # (номер устройства, BlockQueue, reader)
+        self._devices = {}  # номер → (имя, reader, частота)
+        self._layouts = {}  # номер → dtype отсчётов, объявленный в HELLO
+        self._loop = None
+        self._thread = None
+        self._ready = threading.Event()
+        self._error = None
+        self._udp = None
+
+    def attach(self, reader, device=0, name=None, rate=None):
+        """Раздавать пачки reader (DataReader или ProcessReader) как устройство device.
+
+        rate — частота отсчётов для HELLO (по умолчанию — reader.output_rate).
+        """
+        queue = BlockQueue(self.input_capacity, 'drop_oldest', on_ready=self._wake)
+        reader.add_consumer(queue, 'network')
+        self._inputs.append((device, queue, reader))
+        self._devices[device] = (name or f"device {device}", reader, rate)
+        return queue
+
+    def detach_all(self):
+        """Отключить все источники (клиенты остаются подключёнными)"""
+        for _, queue, reader in self._inputs:
+            queue.close()
+            if queue in reader.consumers:
+                reader.remove_consumer(queue)
+        self._inputs = []
+        self._devices = {}
+        self._layouts = {}
+
+    def hello(self):
+        # Частота источника известна только после его открытия — берётся сейчас
+        devices = []
+        for index, (name, reader, rate) in sorted(self._devices.items()):
+            rate = rate or getattr(reader, 'output_rate', None)
+            layout = self._layouts.setdefault(index, sample_layout(reader))
+            decoder = getattr(reader, 'decoder', None)
+            protocol = decoder.schema.name if decoder is not None and decoder.schema else None
+            devices.append({'index': index, 'name': name, 'rate': rate,
+                            'samples': layout.descr, 'protocol': protocol})
+        return encode_hello(devices)
+
+    def _announce(self):
+        """Разослать новый HELLO всем клиентам (dtype устройства изменился)"""
+        hello = self.hello()
+        for client in list(self.clients):
+            client.send(hello)
+        for addr in list(self.udp_clients):
+            self.send_udp(addr, hello)
+
+    def start(self):
+        """Запустить цикл в фоновом потоке; OSError — порт не открылся"""
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._error is not None:
+            raise self._error
+        return self
+
+    def stop(self):
+        loop = self._loop
+        if loop is not None and loop.is_running():
+            loop.call_soon_threadsafe(loop.stop)
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+
+    def counters(self):
+        return {
+            'clients': len(self.clients) + len(self.udp_clients),
+            'clients_total': self.clients_total,
+            'dropped_clients': self.dropped_clients,
+            'frames_sent': self.frames_sent,
+            'bytes_sent': self.bytes_sent,
+            'udp_dropped': self.udp_dropped,
+            'input_dropped': sum(queue.dropped_samples for _, queue, _ in self._inputs),
+        }
+
+    def _run(self):
+        loop = self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        servers = []
+        try:
+            if self.ports['tcp'] is not None:
+                server = loop.run_until_complete(asyncio.start_server(
+                    self._serve_tcp, self.host, self.ports['tcp']))
+                servers.append(server)
+                self.addresses['tcp'] = server.sockets[0].getsockname()[:2]
+            if self.ports['ws'] is not None:
+                server = loop.run_until_complete(asyncio.start_server(
+                    self._serve_ws, self.host, self.ports['ws']))
+                servers.append(server)
+                self.addresses['ws'] = server.sockets[0].getsockname()[:2]
+            if self.ports['udp'] is not None:
+                self._udp, _ = loop.run_until_complete(loop.create_datagram_endpoint(
+                    lambda: _UdpProtocol(self), local_addr=(self.host, self.ports['udp'])))
+                self.addresses['udp'] = self._udp.get_extra_info('sockname')[:2]
+        except OSError as e:
+            self._error = e
+        self._ready.set()
+        if self._error is None:
+            loop.run_forever()
+        for server in servers:
+            server.close()
+        for client in list(self.clients):
+            client.transport.abort()
+        if self._udp is not None:
+            self._udp.close()
+        loop.run_until_complete(asyncio.sleep(0))
+        loop.close()
+        self._loop = None
+
+    def _wake(self):
+        # Из потока чтения; BlockQueue зовёт не чаще раза на выборку
+        loop = self._loop
+        if loop is not None:
+            try:
+                loop.call_soon_threadsafe(self._drain)
+            except RuntimeError:  # цикл уже закрыт
+                pass
+
+    def _drain(self):
+        """Новые пачки — в кадры и в очереди всех клиентов"""
+        now = time.monotonic()
+        for addr, seen in list(self.udp_clients.items()):
+            if now - seen > UDP_TIMEOUT:
+                del self.udp_clients[addr]
+        for device, queue, _ in list(self._inputs):
+            for block, attitude in queue.get_all():
+                if block.dtype != self._layouts.get(device):
+                    self._layouts[device] = block.dtype
+                    self._announce()
+                frames = [encode_frame(KIND_SAMPLES, device, block)]
+                if attitude is not None:
+                    frames.append(encode_frame(KIND_ATTITUDE, device, attitude))
+                for client in list(self.clients):
+                    for frame in frames:
+                        if not client.send(frame):
+                            break
+                if self.udp_clients:
+                    self._broadcast_udp(device, block, attitude)
+
+    def _broadcast_udp(self, device, block, attitude):
+        datagrams = []
+        for kind, records in ((KIND_SAMPLES, block), (KIND_ATTITUDE, attitude)):
+            if records is None:
+                continue
+            step = max(UDP_PAYLOAD // records.dtype.itemsize, 1)
+            datagrams += [encode_frame(kind, device, records[i:i + step])
+                          for i in range(0, len(records), step)]
+        for addr in list(self.udp_clients):
+            for datagram in datagrams:
+                self.send_udp(addr, datagram)
+
+    def send_udp(self, addr, datagram):
+        if self._udp.get_write_buffer_size() > UDP_BUFFER_LIMIT:
+            self.udp_dropped += 1
+            return
+        self._udp.sendto(datagram, addr)
+        self.frames_sent += 1
+        self.bytes_sent += len(datagram)
+
+    def _add_client(self, client):
+        sock = client.transport.get_extra_info('socket')
+        if sock is not None and self.send_buffer:
+            # Иначе ядро само копит мегабайты и медленный клиент замечается поздно
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, self.send_buffer)
+        self.clients.add(client)
+        self.clients_total += 1
+        client.send(self.hello())
+
+    async def _serve_tcp(self, reader, writer):
+        client = _Client(self, writer, self.client_buffer)
+        self._add_client(client)
+        # Клиент ничего не шлёт; чтение нужно, чтобы заметить отключение
+        try:
+            while await reader.read(4096):
+                pass
+        except (ConnectionError, OSError):
+            pass
+        client.finish()
+
+    async def _serve_ws(self, reader, writer):
+        try:
+            request = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), 5.0)
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError,
+                ConnectionError):
+            writer.close()
+            return
+        headers = {}
+        for line in request.decode('latin-1').split('\r\n')[1:]:
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+        key = headers.get('sec-websocket-key')
+        if not key or headers.get('upgrade', '').lower() != 'websocket':
+            writer.write(b'HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\n\r\n')
+            writer.close()
+            return
+        accept = base64.b64encode(hashlib.sha1(key.encode('ascii') + _WS_GUID).digest())
+        writer.write(b'HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\n'
+                     b'Connection: Upgrade\r\nSec-WebSocket-Accept: ' + accept + b'\r\n\r\n')
+        client = _WebSocketClient(self, writer, self.client_buffer)
+        self._add_client(client)
+        # Сообщения клиента (в основном close) только разбираются
+        try:
+            while True:
+                head = await reader.readexactly(2)
+                opcode, length = head[0] & 0x0F, head[1] & 0x7F
+                if length == 126:
+                    (length,) = struct.unpack('!H', await reader.readexactly(2))
+                elif length == 127:
+                    (length,) = struct.unpack('!Q', await reader.readexactly(8))
+                await reader.readexactly(length + (4 if head[1] & 0x80 else 0))
+                if opcode == 0x8:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, OSError):
+            pass
+        client.finish()
@@ -0,0 +1,99 @@
+"""Кольцевой буфер записей в разделяемой памяти (без Qt).
+
+Один процесс пишет блоки структурированных записей, другой забирает
+новые записи копией из представления NumPy — без pickle на отсчёт.
+"""
+import numpy as np
+from multiprocessing import shared_memory
+
+# Заголовок сегмента: счётчик записанных записей (int64), остальное — резерв
+HEADER_SIZE = 64
+
+
+def _attach(name):
+    """Подключиться к существующему сегменту.
+
+    Удаляет сегмент только создатель; дочерний процесс spawn пользуется
+    тем же resource_tracker, поэтому повторная регистрация безвредна.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13
+        return shared_memory.SharedMemory(name=name)
+
+
+class SharedRing:
+    """Кольцо capacity записей dtype в сегменте разделяемой памяти.
+
+    Один писатель (write) и один читатель (read). Писатель сначала
+    копирует записи, потом увеличивает счётчик total в заголовке; читатель
+    помнит свою позицию cursor. Если писатель обогнал читателя больше
+    чем на capacity, старые записи теряются и учитываются в lost.
+    Порядок записей в память на x86/ARM64 при обновлении счётчика одной
+    8-байтной записью достаточен для этой схемы.
+    """
+
+    def __init__(self, capacity, dtype, name=None):
+        self.capacity = int(capacity)
+        self.dtype = np.dtype(dtype)
+        size = HEADER_SIZE + self.capacity * self.dtype.itemsize
+        if name is None:
+            self._shm = shared_memory.SharedMemory(create=True, size=size)
+            self.owner = True
+        else:
+            self._shm = _attach(name)
+            self.owner = False
+        self.name = self._shm.name
+        self._total = np.ndarray((1,), dtype=np.int64, buffer=self._shm.buf)
+        self._records = np.ndarray((self.capacity,), dtype=self.dtype,
+                                   buffer=self._shm.buf, offset=HEADER_SIZE)
+        if self.owner:
+            self._total[0] = 0
+        self.cursor = 0  # позиция читателя
+        self.lost = 0    # записи, перезаписанные до чтения
+
+    @property
+    def total(self):
+        return int(self._total[0])
+
+    def write(self, block):
+        """Дописать блок записей (поля по именам dtype)"""
+        n = len(block)
+        if not n:
+            return
+        total = int(self._total[0])
+        data = block[-self.capacity:]
+        start = (total + n - len(data)) % self.capacity
+        first = min(len(data), self.capacity - start)
+        for name in self.dtype.names:
+            column = data[name]
+            self._records[name][start:start + first] = column[:first]
+            self._records[name][:len(data) - first] = column[first:]
+        self._total[0] = total + n
+
+    def read(self):
+        """Копия записей, появившихся с прошлого чтения"""
+        total = int(self._total[0])
+        cursor = max(self.cursor, total - self.capacity)
+        self.lost += cursor - self.cursor
+        n = total - cursor
+        if n <= 0:
+            return np.empty(0, dtype=self.dtype)
+        start = cursor % self.capacity
+        first = min(n, self.capacity - start)
+        out = np.empty(n, dtype=self.dtype)
+        out[:first] = self._records[start:start + first]
+        out[first:] = self._records[:n - first]
+        # Писатель мог обогнать во время копирования — начало уже затёрто
+        overwritten = int(self._total[0]) - self.capacity - cursor
+        if overwritten > 0:
+            self.lost += overwritten
+            out = out[overwritten:]
+        self.cursor = total
+        return out
+
+    def close(self):
+        del self._total, self._records
+        self._shm.close()
+        if self.owner:
+            self._shm.unlink()
@@ -0,0 +1,380 @@
+"""Источники байт для SerialDataReader.
+
+Источник отдаёт сырые байты кадров — декодер и всё, что после него,
+работают одинаково с COM-портом, файлом или генератором. Исключение —
+NetworkSource (timed=True): он отдаёт уже разобранные отсчёты с метками
+времени сервера.
+"""
+import math
+import socket
+import time
+
+import numpy as np
+
+from imu.decoder import PACKET_SIZE, SAMPLE_DTYPE, encode_packets
+
+
+def parse_address(text, host='127.0.0.1'):
+    """'HOST:PORT' или 'PORT' → (host, port); ValueError — не адрес"""
+    name, _, port = text.rpartition(':')
+    return name.strip('[]') or host, int(port)
+
+
+class DataSource:
+    """Базовый класс источника.
+
+    read_chunk() возвращает доступные байты (b'' — пока ничего нет)
+    или None, когда поток закончился. rate — номинальная частота кадров
+    (Гц), если она известна: тогда метки времени отсчётов считаются по
+    ней, а не по времени прихода байт. blocking=True — read_chunk сам
+    ждёт данных, и поток чтения не досыпает между пустыми вызовами.
+    timed=True — read_chunk отдаёт не байты, а готовые отсчёты (массив
+    с полем 't' и полями схемы schema), декодер и метки времени хоста
+    не нужны.
+    """
+
+    name = "источник"
+    rate = None
+    blocking = False
+    timed = False
+
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    @property
+    def is_open(self):
+        return True
+
+    def read_chunk(self):
+        raise NotImplementedError
+
+
+class SerialSource(DataSource):
+    """COM-порт через pyserial.
+
+    Чтение блокирующее: read_chunk ждёт chunk_size байт (по умолчанию —
+    один кадр), но не дольше timeout; если в буфере уже больше, забирает
+    всё одним вызовом. inter_byte_timeout (с) завершает чтение при паузе
+    между байтами. poll=True — прежний опрос in_waiting без ожидания
+    (для сравнения в imu.probe).
+    """
+
+    def __init__(self, port, baud_rate, timeout=1, chunk_size=PACKET_SIZE,
+                 inter_byte_timeout=None, poll=False):
+        self.port = port
+        self.baud_rate = baud_rate
+        self.timeout = timeout
+        self.chunk_size = max(int(chunk_size), 1)
+        self.inter_byte_timeout = inter_byte_timeout
+        self.poll = poll
+        self.blocking = not poll
+        self.name = port
+        self.ser = None
+
+    def open(self):
+        import serial
+        self.ser = serial.Serial(self.port, self.baud_rate, timeout=self.timeout,
+                                 inter_byte_timeout=self.inter_byte_timeout)
+
+    def close(self):
+        if self.ser and self.ser.is_open:
+            # Прервать ожидание в read() потока чтения до закрытия порта
+            if hasattr(self.ser, 'cancel_read'):
+                self.ser.cancel_read()
+            self.ser.close()
+
+    @property
+    def is_open(self):
+        return self.ser is not None and self.ser.is_open
+
+    def read_chunk(self):
+        if self.poll:
+            n = self.ser.in_waiting
+            return self.ser.read(n) if n > 0 else b''
+        return self.ser.read(max(self.chunk_size, self.ser.in_waiting))
+
+
+class PacedSource(DataSource):
+    """Источник, выдающий единицы данных по их времени в потоке.
+
+    speed=1 — реальное время, speed=N — в N раз быстрее,
+    speed=None — без задержек (так быстро, как читают).
+    Наследники задают _unit_time(i), _count() и _take(i, j).
+    """
+
+    # Максимальное ожидание внутри read_chunk, чтобы остановка была быстрой
+    MAX_WAIT = 0.02
+    blocking = True
+
+    def __init__(self, speed=1.0, chunk_units=256):
+        self.speed = speed
+        self.chunk_units = chunk_units
+        self._pos = 0
+        self._start = None
+        self._open = False
+
+    def open(self):
+        self._pos = 0
+        self._start = time.monotonic()
+        self._open = True
+
+    def close(self):
+        self._open = False
+
+    @property
+    def is_open(self):
+        return self._open
+
+    def read_chunk(self):
+        total = self._count()
+        if total is not None and self._pos >= total:
+            return None
+        if not self.speed:
+            end = self._pos + self.chunk_units
+        else:
+            stream_time = (time.monotonic() - self._start) * self.speed
+            end = self._due(stream_time)
+            if end <= self._pos:
+                wait = (self._unit_time(self._pos) - stream_time) / self.speed
+                time.sleep(min(max(wait, 0.0), self.MAX_WAIT))
+                return b''
+        if total is not None:
+            end = min(end, total)
+        data = self._take(self._pos, end)
+        self._pos = end
+        return data
+
+    def _due(self, stream_time):
+        """Номер первой единицы, время которой ещё не наступило"""
+        raise NotImplementedError
+
+    def _unit_time(self, i):
+        raise NotImplementedError
+
+    def _count(self):
+        return None
+
+    def _take(self, i, j):
+        raise NotImplementedError
+
+
+class FileReplaySource(PacedSource):
+    """Воспроизведение файла: записи сессии (.imurec) или сырого дампа байт.
+
+    Записи сессии выдаются кадрами по их меткам времени (в схеме, чьи
+    поля совпадают с полями записи — см. imu.protocols), сырой дамп —
+    побайтно со скоростью baud_rate (10 бит на байт).
+    """
+
+    def __init__(self, path, speed=1.0, baud_rate=921600, chunk_bytes=4096):
+        from imu.protocols import protocol_for_dtype
+        from imu.recording import MAGIC, Recording
+
+        super().__init__(speed)
+        self.path = path
+        self.name = path
+        self.baud_rate = baud_rate
+        self.chunk_bytes = chunk_bytes
+        with open(path, 'rb') as f:
+            is_recording = f.read(len(MAGIC)) == MAGIC
+        if is_recording:
+            self.recording = Recording(path)
+            times = self.recording.timestamps
+            self._times = np.asarray(times - times[0]) if len(times) else np.empty(0)
+            if len(times) > 1 and self._times[-1] > 0:
+                self.rate = (len(times) - 1) / float(self._times[-1])
+            self._raw = None
+            self.schema = protocol_for_dtype(self.recording.dtype)
+            self.chunk_units = max(chunk_bytes // self.schema.size, 1)
+        else:
+            self.recording = None
+            self._raw = np.memmap(path, dtype=np.uint8, mode='r')
+            self._byte_rate = baud_rate / 10.0
+            self.chunk_units = chunk_bytes
+
+    def __reduce__(self):
+        # Для передачи в дочерний процесс: файл открывается там заново
+        return FileReplaySource, (self.path, self.speed, self.baud_rate, self.chunk_bytes)
+
+    def _count(self):
+        return len(self.recording) if self.recording is not None else len(self._raw)
+
+    def _due(self, stream_time):
+        if self.recording is not None:
+            return int(np.searchsorted(self._times, stream_time, side='right'))
+        return int(stream_time * self._byte_rate) + 1
+
+    def _unit_time(self, i):
+        if self.recording is not None:
+            return float(self._times[i])
+        return i / self._byte_rate
+
+    def _take(self, i, j):
+        if self.recording is not None:
+            return self.schema.encode(self.recording.records[i:j])
+        return self._raw[i:j].tobytes()
+
+
+class SyntheticSource(PacedSource):
+    """Генератор корректных 34-байтных кадров (без оборудования).
+
+    Имитирует медленное покачивание по крену и тангажу: гироскоп — в °/с,
+    акселерометр — проекция g на оси датчика. duration=None — бесконечно.
+    """
+
+    name = "Симулятор"
+
+    def __init__(self, rate=1000.0, speed=1.0, duration=None, noise=0.02, seed=0,
+                 chunk_packets=256):
+        super().__init__(speed, chunk_packets)
+        self.rate = float(rate)
+        self.duration = duration
+        self.noise = noise
+        self._rng = np.random.default_rng(seed)
+
+    def _count(self):
+        return None if self.duration is None else int(self.duration * self.rate)
+
+    def _due(self, stream_time):
+        return int(stream_time * self.rate) + 1
+
+    def _unit_time(self, i):
+        return i / self.rate
+
+    def _take(self, i, j):
+        return encode_packets(synthetic_motion(np.arange(i, j) / self.rate,
+                                               self.noise, self._rng))
+
+
+def synthetic_attitude(t):
+    """Эталонные углы (roll, pitch, yaw) в радианах для synthetic_motion"""
+    t = np.asarray(t, dtype=np.float64)
+    roll = np.radians(20.0) * np.sin(2 * math.pi * 0.2 * t)
+    pitch = np.radians(10.0) * np.sin(2 * math.pi * 0.13 * t)
+    yaw = np.radians(30.0) * np.sin(2 * math.pi * 0.05 * t)
+    return roll, pitch, yaw
+
+
+def synthetic_motion(t, noise=0.0, rng=None, g=9.81):
+    """Отсчёты (SAMPLE_DTYPE) для покачивания из synthetic_attitude.
+
+    Гироскоп — угловые скорости в связанных осях (°/с) для углов Эйлера
+    в порядке ZYX, акселерометр — проекция g на оси датчика; согласован с
+    формулами roll = atan2(ay, az), pitch = atan2(-ax, sqrt(ay² + az²)).
+    """
+    t = np.asarray(t, dtype=np.float64)
+    roll, pitch, yaw = synthetic_attitude(t)
+    w_roll, w_pitch, w_yaw = 2 * math.pi * 0.2, 2 * math.pi * 0.13, 2 * math.pi * 0.05
+    d_roll = np.radians(20.0) * w_roll * np.cos(w_roll * t)
+    d_pitch = np.radians(10.0) * w_pitch * np.cos(w_pitch * t)
+    d_yaw = np.radians(30.0) * w_yaw * np.cos(w_yaw * t)
+
+    samples = np.empty(len(t), dtype=SAMPLE_DTYPE)
+    samples['gx'] = np.degrees(d_roll - d_yaw * np.sin(pitch))
+    samples['gy'] = np.degrees(d_pitch * np.cos(roll) + d_yaw * np.sin(roll) * np.cos(pitch))
+    samples['gz'] = np.degrees(-d_pitch * np.sin(roll) + d_yaw * np.cos(roll) * np.cos(pitch))
+    samples['ax'] = -g * np.sin(pitch)
+    samples['ay'] = g * np.cos(pitch) * np.sin(roll)
+    samples['az'] = g * np.cos(pitch) * np.cos(roll)
+    if noise and rng is not None:
+        for name in SAMPLE_DTYPE.names:
+            samples[name] += rng.normal(0.0, noise, len(t))
+    return samples
+
+
+class NetworkSource(DataSource):
+    """Подписка на StreamServer (imu.server) по TCP: отсчёты устройства device.
+
+    Записи отдаются потоку чтения как есть — со всеми полями протокола
+    (счётчик кадров, температура…) и метками времени сервера; --protocol
+    подписчика на них не влияет. schema — схема из HELLO (если такая
+    зарегистрирована и её поля совпадают): по её счётчику считаются
+    потерянные кадры. rate — частота устройства из HELLO.
+    """
+
+    blocking = True
+    timed = True
+
+    def __init__(self, host, port, device=0, timeout=1.0):
+        self.host = host
+        self.port = int(port)
+        self.device = device
+        self.timeout = timeout
+        self.name = f"{host}:{port}"
+        self.sock = None
+        self._parser = None
+        self._pending = []
+        self.schema = None
+
+    def __reduce__(self):
+        return NetworkSource, (self.host, self.port, self.device, self.timeout)
+
+    def open(self):
+        from imu.protocols import PROTOCOLS
+        from imu.server import KIND_HELLO, FrameParser
+
+        self.sock = socket.create_connection((self.host, self.port), timeout=5.0)
+        self._parser = FrameParser()
+        # HELLO приходит первым: из него берётся частота устройства
+        frames = []
+        while not frames:
+            data = self.sock.recv(65536)
+            if not data:
+                raise OSError("Сервер закрыл соединение")
+            frames = self._parser.feed(data)
+        kind, _, hello = frames[0]
+        if kind != KIND_HELLO:
+            raise OSError("Сервер не прислал HELLO")
+        for info in hello['devices']:
+            if info.get('index') != self.device:
+                continue
+            if info.get('rate'):
+                self.rate = float(info['rate'])
+            schema = PROTOCOLS.get(info.get('protocol'))
+            if schema is not None and schema.timed_dtype == self._parser.device_dtypes.get(self.device):
+                self.schema = schema
+        self._pending = frames[1:]
+        self.sock.settimeout(self.timeout)
+
+    def close(self):
+        if self.sock is not None:
+            try:
+                # Прервать ожидание в recv() потока чтения
+                self.sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self.sock.close()
+            self.sock = None
+
+    @property
+    def is_open(self):
+        return self.sock is not None
+
+    def read_chunk(self):
+        from imu.server import KIND_SAMPLES
+
+        frames, self._pending = self._pending, []
+        if not frames:
+            try:
+                data = self.sock.recv(1 << 20)
+            except socket.timeout:
+                return b''
+            except OSError:
+                return None
+            if not data:
+                return None
+            frames = self._parser.feed(data)
+        blocks = [records for kind, device, records in frames
+                  if kind == KIND_SAMPLES and device == self.device]
+        if not blocks:
+            return b''
+        # Новый HELLO посреди чтения может сменить dtype — такие пачки отдельно
+        same = 1
+        while same < len(blocks) and blocks[same].dtype == blocks[0].dtype:
+            same += 1
+        if same < len(blocks):
+            self._pending = [(KIND_SAMPLES, self.device, block) for block in blocks[same:]]
+        return np.concatenate(blocks[:same])  # копия: frombuffer только для чтения
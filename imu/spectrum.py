@@ -0,0 +1,137 @@
+"""Спектр по Уэлчу и водопад, считаемые по мере поступления отсчётов (без Qt).
+
+Отсчёты копятся в хвосте; как только набирается сегмент длины nperseg,
+он (без среднего, с окном Ханна) проходит через rfft, и его мощность
+попадает в кольцо из averages последних сегментов. Спектр — среднее по
+кольцу, которое ведётся как бегущая сумма, поэтому за кадр считаются
+только новые сегменты. Каждый сегмент добавляет строку в водопад —
+заранее выделенный буфер строк в дБ.
+"""
+import numpy as np
+
+from imu.decoder import CHANNELS
+
+# Нижняя граница мощности для логарифма (дБ)
+_FLOOR = 1e-20
+
+
+class WelchSpectrum:
+    """Спектральная плотность мощности всех каналов по Уэлчу.
+
+    nperseg — длина сегмента, overlap — доля перекрытия (0…0.9),
+    averages — по скольким последним сегментам усредняется спектр,
+    rows — высота водопада, waterfall_channel — канал водопада.
+    rate — частота отсчётов, Гц; если в feed() переданы метки времени,
+    она уточняется по ним.
+    """
+
+    def __init__(self, nperseg=1024, overlap=0.5, averages=8, rows=256,
+                 channels=CHANNELS, rate=1000.0, waterfall_channel=0):
+        if nperseg < 8:
+            raise ValueError("nperseg должен быть не меньше 8")
+        if not 0.0 <= overlap <= 0.9:
+            raise ValueError("overlap должен быть в диапазоне 0…0.9")
+        self.nperseg = int(nperseg)
+        self.step = max(int(round(self.nperseg * (1.0 - overlap))), 1)
+        self.overlap = overlap
+        self.averages = int(averages)
+        self.channels = tuple(channels)
+        self.rate = float(rate)
+        self.waterfall_channel = waterfall_channel
+        self.nfreq = self.nperseg // 2 + 1
+        self.window = np.hanning(self.nperseg).astype(np.float64)
+        self._window_power = float(np.sum(self.window ** 2))
+        # Сколько сегментов считать за один feed(): старые всё равно
+        # вытеснятся из усреднения и уедут за край водопада
+        self.max_segments = max(self.averages, 16)
+
+        n = len(self.channels)
+        self._pending = np.empty((n, 0), dtype=np.float64)
+        self._pending_t = np.empty(0, dtype=np.float64)
+        self._powers = np.zeros((self.averages, n, self.nfreq), dtype=np.float64)
+        self._sum = np.zeros((n, self.nfreq), dtype=np.float64)
+        self._slot = 0
+        self.segments = 0  # сегментов с начала (или с reset)
+        # Водопад: строка пишется дважды, как в RingBuffer, поэтому
+        # последние rows строк всегда лежат подряд
+        self.rows = int(rows)
+        self._waterfall = np.full((2 * self.rows, self.nfreq), -200.0, dtype=np.float32)
+        self._row = 0
+
+    def reset(self):
+        """Начать заново (разрыв в данных, смена устройства)"""
+        self._pending = self._pending[:, :0]
+        self._pending_t = self._pending_t[:0]
+        self._powers[:] = 0.0
+        self._sum[:] = 0.0
+        self._slot = 0
+        self.segments = 0
+        self._waterfall[:] = -200.0
+        self._row = 0
+
+    @property
+    def freqs(self):
+        return np.fft.rfftfreq(self.nperseg, 1.0 / self.rate)
+
+    def feed(self, data, times=None):
+        """Добавить отсчёты (channels, n) и метки времени (n,); число новых сегментов"""
+        data = np.asarray(data, dtype=np.float64)
+        self._pending = np.concatenate((self._pending, data), axis=1)
+        if times is not None:
+            self._pending_t = np.concatenate((self._pending_t, times))
+        available = self._pending.shape[1]
+        if available < self.nperseg:
+            return 0
+        count = (available - self.nperseg) // self.step + 1
+        skip = max(count - self.max_segments, 0)
+        starts = (np.arange(skip, count) * self.step)[:, None]
+        index = starts + np.arange(self.nperseg)
+        segments = self._pending[:, index]  # (channels, k, nperseg)
+        segments -= segments.mean(axis=2, keepdims=True)
+        power = np.abs(np.fft.rfft(segments * self.window, axis=2)) ** 2
+        power = power.transpose(1, 0, 2)  # (k, channels, nfreq)
+
+        if len(self._pending_t) >= available:
+            t = self._pending_t[index[-1]]
+            span = t[-1] - t[0]
+            if span > 0:
+                self.rate = (self.nperseg - 1) / span
+
+        for segment in power[-self.averages:]:
+            self._sum += segment - self._powers[self._slot]
+            self._powers[self._slot] = segment
+            self._slot = (self._slot + 1) % self.averages
+        self.segments += len(power)
+        self._add_rows(power[:, self.waterfall_channel])
+
+        consumed = count * self.step
+        self._pending = self._pending[:, consumed:]
+        self._pending_t = self._pending_t[consumed:]
+        return len(power)
+
+    def _scale(self):
+        """Множитель мощности → плотность (ед.²/Гц), односторонний спектр"""
+        scale = np.full(self.nfreq, 2.0 / (self.rate * self._window_power))
+        scale[0] /= 2.0
+        if self.nperseg % 2 == 0:
+            scale[-1] /= 2.0
+        return scale
+
+    def psd(self):
+        """(частоты (nfreq,), плотность (channels, nfreq)) — среднее последних сегментов"""
+        used = min(self.segments, self.averages)
+        if not used:
+            return self.freqs, np.zeros_like(self._sum)
+        # Бегущая сумма может уйти чуть ниже нуля из-за округления
+        return self.freqs, np.maximum(self._sum, 0.0) * (self._scale() / used)
+
+    def _add_rows(self, power):
+        rows = 10.0 * np.log10(np.maximum(power * self._scale(), _FLOOR))
+        for row in rows[-self.rows:]:
+            self._waterfall[self._row] = row
+            self._waterfall[self._row + self.rows] = row
+            self._row = (self._row + 1) % self.rows
+
+    def waterfall(self):
+        """Последние rows строк водопада в дБ, от старых к новым, без копирования"""
+        return self._waterfall[self._row:self._row + self.rows]
@@ -0,0 +1,134 @@
+"""Счётчики и гистограммы конвейера (без Qt).
+
+Каждое поле пишет один поток (поток чтения — счётчики и время
+декодирования, GUI — время отрисовки), поэтому блокировки не нужны:
+читатель снимка может увидеть значения из соседних моментов, но не
+испорченные. Всё, что делается на горячем пути, — сложение целых и
+одно обращение к массиву гистограммы.
+"""
+import math
+import time
+
+import numpy as np
+
+
+class Histogram:
+    """Гистограмма времён с логарифмическими корзинами.
+
+    От low до high (с), per_decade корзин на декаду; значения вне
+    диапазона попадают в крайние корзины. Процентили — по верхней
+    границе корзины, т. е. с точностью до ширины корзины (~26 %).
+    """
+
+    def __init__(self, low=1e-6, high=10.0, per_decade=10):
+        self.low = low
+        self.per_decade = per_decade
+        self.size = int(math.ceil(math.log10(high / low) * per_decade)) + 2
+        self.edges = low * 10.0 ** (np.arange(self.size - 1) / per_decade)
+        self.reset()
+
+    def reset(self):
+        self.counts = np.zeros(self.size, dtype=np.int64)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, value):
+        if value <= self.low:
+            index = 0
+        else:
+            index = min(int(math.log10(value / self.low) * self.per_decade) + 1, self.size - 1)
+        self.counts[index] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, q):
+        """Оценка q-го процентиля (0..100); None, если значений нет"""
+        counts = self.counts.copy()
+        n = int(counts.sum())
+        if not n:
+            return None
+        index = int(np.searchsorted(np.cumsum(counts), q / 100.0 * n))
+        if index >= len(self.edges):
+            return self.max
+        return min(float(self.edges[index]), self.max)
+
+    def summary(self, scale=1.0, digits=3):
+        """Словарь count/mean/p50/p95/p99/max; scale — перевод единиц (1e3 — мс)"""
+        def fmt(value):
+            return None if value is None else round(value * scale, digits)
+        return {
+            'count': self.count,
+            'mean': fmt(self.total / self.count if self.count else None),
+            'p50': fmt(self.percentile(50)),
+            'p95': fmt(self.percentile(95)),
+            'p99': fmt(self.percentile(99)),
+            'max': fmt(self.max if self.count else None),
+        }
+
+
+class PipelineStats:
+    """Счётчики одного потока чтения.
+
+    Счётчики декодера (контрольные суммы, байты ресинхронизации,
+    максимум буфера) берутся из самого PacketDecoder, очередей
+    потребителей (queues: имя → BlockQueue) — из очередей при снимке,
+    частота и джиттер — из timing (imu.timing.RateEstimator), потерянные
+    кадры — из sequence (SequenceTracker, если в схеме есть счётчик).
+    """
+
+    def __init__(self, decoder=None):
+        self.decoder = decoder
+        self.timing = None
+        self.sequence = None
+        self.queues = {}
+        self.decode_time = Histogram()
+        self.reset()
+
+    def reset(self):
+        self.bytes = 0
+        self.packets = 0
+        self.chunks = 0
+        self.read_errors = 0
+        self.queue_depth = 0  # отсчётов, ждущих выдачи пачкой
+        self.queue_high_water = 0
+        self.decode_time.reset()
+        self._previous = self.snapshot()
+
+    def snapshot(self):
+        """Текущие значения счётчиков (накопленные с начала чтения)"""
+        decoder = self.decoder
+        timing = self.timing
+        sequence = self.sequence
+        return {
+            'time': time.time(),
+            'bytes': self.bytes,
+            'packets': self.packets,
+            'chunks': self.chunks,
+            'protocol': decoder.schema.name if decoder and decoder.schema else None,
+            'protocol_undetected': bool(decoder and decoder.undetected),
+            'checksum_errors': decoder.checksum_errors if decoder else 0,
+            'resync_bytes': decoder.resync_bytes if decoder else 0,
+            'buffer_high_water': decoder.high_water if decoder else 0,
+            'read_errors': self.read_errors,
+            'queue_depth': self.queue_depth,
+            'queue_high_water': self.queue_high_water,
+            **(timing.snapshot() if timing else {'rate_hz': None, 'jitter_ms': None, 'drift_ppm': None}),
+            'lost_packets': sequence.lost if sequence else None,
+            'sequence_gaps': sequence.gaps if sequence else None,
+            'queues': {name: queue.counters() for name, queue in list(self.queues.items())},
+        }
+
+    def report(self):
+        """Снимок со скоростями с прошлого вызова и временем декодирования (мкс)"""
+        current = self.snapshot()
+        previous = self._previous
+        self._previous = current
+        elapsed = current['time'] - previous['time'] if previous else 0.0
+        for name in ('packets', 'bytes'):
+            delta = current[name] - previous[name] if previous else 0
+            current[f'{name}_per_s'] = round(delta / elapsed, 1) if elapsed > 0 else None
+        current['decode_us'] = self.decode_time.summary(scale=1e6, digits=1)
+        return current
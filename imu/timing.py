@@ -0,0 +1,256 @@
+"""Время отсчётов: пропуски по счётчику кадров, фактическая частота и
+передискретизация на равномерную сетку (без Qt).
+
+Всё работает блоками в потоке чтения: SequenceTracker разворачивает
+счётчик кадров схемы в номера отсчётов и считает потерянные кадры,
+RateEstimator по моментам прихода кусков оценивает частоту, джиттер
+и уход часов датчика относительно номинала, Resampler переводит блоки
+с метками времени хоста на сетку t = k / rate.
+"""
+import math
+
+import numpy as np
+
+
+class SequenceTracker:
+    """Пропуски по счётчику кадров (FrameSchema.counter).
+
+    Счётчик шириной bits бит растёт на 1 за кадр и переполняется.
+    Шаг больше 1 — потерянные кадры; шаг 0 или «назад» больше чем на
+    половину диапазона — повтор или перезапуск прошивки (repeats), такой
+    кадр считается следующим по порядку.
+    """
+
+    def __init__(self, bits):
+        self.bits = bits
+        self.modulus = 1 << bits
+        self.reset()
+
+    def reset(self):
+        self.last = None
+        self.position = -1  # номер последнего отсчёта от начала чтения
+        self.lost = 0
+        self.gaps = 0
+        self.max_gap = 0
+        self.repeats = 0
+
+    def update(self, counters):
+        """Номера отсчётов блока с учётом пропусков (int64)"""
+        counters = np.asarray(counters).astype(np.int64)
+        if not len(counters):
+            return np.empty(0, dtype=np.int64)
+        previous = np.empty_like(counters)
+        previous[0] = counters[0] - 1 if self.last is None else self.last
+        previous[1:] = counters[:-1]
+        steps = (counters - previous) % self.modulus
+        bad = (steps == 0) | (steps > self.modulus // 2)
+        if bad.any():
+            self.repeats += int(bad.sum())
+            steps[bad] = 1
+        gaps = steps[steps > 1]
+        if len(gaps):
+            self.gaps += len(gaps)
+            self.lost += int(gaps.sum()) - len(gaps)
+            self.max_gap = max(self.max_gap, int(gaps.max()) - 1)
+        positions = self.position + np.cumsum(steps)
+        self.last = int(counters[-1])
+        self.position = int(positions[-1])
+        return positions
+
+
+class RateEstimator:
+    """Фактическая частота отсчётов и джиттер прихода по часам хоста.
+
+    На каждый кусок — пара (время прихода, номер последнего отсчёта).
+    Прямая «время от номера» ведётся экспоненциально взвешенной регрессией
+    с постоянной времени tau (с): наклон — период отсчётов, СКО
+    отклонения прихода от прогноза прямой — джиттер. Если задан nominal
+    (Гц), drift_ppm — уход часов датчика относительно номинала.
+    """
+
+    def __init__(self, nominal=None, tau=10.0):
+        self.nominal = nominal
+        self.tau = tau
+        self.reset()
+
+    def reset(self):
+        self.updates = 0
+        self._t0 = None
+        self._last_time = None
+        self._mean_x = self._mean_y = 0.0
+        self._cov_xx = self._cov_xy = 0.0
+        self._residual_var = 0.0
+
+    @property
+    def period(self):
+        if self.updates < 3 or self._cov_xx <= 0:
+            return None
+        period = self._cov_xy / self._cov_xx
+        return period if period > 0 else None
+
+    @property
+    def rate(self):
+        """Оценка частоты, Гц (None — пока мало данных)"""
+        period = self.period
+        return None if period is None else 1.0 / period
+
+    @property
+    def jitter(self):
+        """СКО момента прихода относительно равномерного хода, с"""
+        return math.sqrt(self._residual_var) if self.updates >= 3 else None
+
+    @property
+    def drift_ppm(self):
+        rate = self.rate
+        if rate is None or not self.nominal:
+            return None
+        return (rate / self.nominal - 1.0) * 1e6
+
+    def update(self, arrival, position):
+        """Кусок пришёл в arrival (с) и закончился отсчётом номер position"""
+        if self._t0 is None:
+            self._t0 = arrival
+            self._mean_x, self._mean_y = float(position), 0.0
+            self._last_time = arrival
+            self.updates = 1
+            return
+        x, y = float(position), arrival - self._t0
+        period = self.period
+        if period is not None:
+            residual = y - (self._mean_y + period * (x - self._mean_x))
+        # Вес нового куска — по прошедшему времени, а не по числу кусков:
+        # оценка не зависит от размера куска; в начале — обычное среднее
+        alpha = 1.0 - math.exp(-max(arrival - self._last_time, 0.0) / self.tau)
+        alpha = max(alpha, 1.0 / (self.updates + 1))
+        self._last_time = arrival
+        dx, dy = x - self._mean_x, y - self._mean_y
+        self._mean_x += alpha * dx
+        self._mean_y += alpha * dy
+        self._cov_xx = (1.0 - alpha) * (self._cov_xx + alpha * dx * dx)
+        self._cov_xy = (1.0 - alpha) * (self._cov_xy + alpha * dx * dy)
+        if period is not None:
+            self._residual_var = (1.0 - alpha) * (self._residual_var + alpha * residual * residual)
+        self.updates += 1
+
+    def snapshot(self):
+        def fmt(value, scale=1.0, digits=3):
+            return None if value is None else round(value * scale, digits)
+        return {
+            'rate_hz': fmt(self.rate),
+            'jitter_ms': fmt(self.jitter, 1e3),
+            'drift_ppm': fmt(self.drift_ppm, digits=1),
+        }
+
+
+class Resampler:
+    """Блоки с полем t → отсчёты на равномерной сетке t = k / rate.
+
+    Сетка привязана к эпохе, поэтому у всех устройств с одной частотой
+    метки совпадают. Вещественные поля интерполируются линейно (с учётом
+    последнего отсчёта прошлого блока), целые (счётчик) берутся от
+    предыдущего отсчёта. Через паузу дольше max_gap (с) или скачок
+    времени назад сетка не тянется — продолжается после паузы.
+    """
+
+    def __init__(self, rate, max_gap=0.25):
+        if rate <= 0:
+            raise ValueError("Частота передискретизации должна быть больше нуля")
+        self.rate = float(rate)
+        self.max_gap = max_gap
+        self.reset()
+
+    def reset(self):
+        self._last = None  # последний отсчёт прошлого блока
+        self._next = None  # номер следующего узла сетки
+
+    def feed(self, block):
+        """Отсчёты сетки, попавшие в интервал до последнего отсчёта block"""
+        if not len(block):
+            return block[:0]
+        # Строки байт отсчётов: поля одного типа подряд — столбцы одной матрицы
+        block = np.ascontiguousarray(block)
+        rows = block.view(np.uint8).reshape(len(block), block.dtype.itemsize)
+        if self._last is not None:
+            rows = np.concatenate((self._last, rows))
+        t = _column(rows, block.dtype.fields['t'][1], 1, _TIME)[:, 0]
+        # Разрывы: пауза дольше max_gap или время назад (обычно их нет)
+        steps = t[1:] - t[:-1]
+        if len(steps) and (steps.max() > self.max_gap or steps.min() < 0):
+            breaks = np.flatnonzero((steps > self.max_gap) | (steps < 0)) + 1
+            segments = zip(np.concatenate(([0], breaks)), np.concatenate((breaks, [len(t)])))
+        else:
+            segments = [(0, len(t))]
+        parts = []
+        for start, end in segments:
+            first = math.ceil(t[start] * self.rate - 1e-9)
+            if start == 0 and self._next is not None:
+                first = max(first, self._next)
+            stop = math.floor(t[end - 1] * self.rate + 1e-9)
+            if stop >= first:
+                grid = np.arange(first, stop + 1) / self.rate
+                parts.append(_interpolate(rows[start:end], t[start:end], grid, block.dtype))
+            self._next = max(stop + 1, first)
+        self._last = rows[-1:].copy()
+        return _join(parts, block.dtype)
+
+
+def _groups(dtype):
+    """Поля dtype кроме t, сгруппированные в подряд идущие одного типа:
+    [(смещение, число полей, тип)]"""
+    groups = _GROUPS.get(dtype)
+    if groups is None:
+        groups = []
+        fields = sorted((offset, np.dtype(fmt)) for name, (fmt, offset, *_) in dtype.fields.items()
+                        if name != 't')
+        for offset, fmt in fields:
+            if groups:
+                start, count, group_fmt = groups[-1]
+                if group_fmt == fmt and start + count * fmt.itemsize == offset:
+                    groups[-1] = (start, count + 1, fmt)
+                    continue
+            groups.append((offset, 1, fmt))
+        _GROUPS[dtype] = groups
+    return groups
+
+
+_GROUPS = {}
+_TIME = np.dtype('<f8')
+
+
+def _column(rows, offset, count, fmt):
+    """Поля count подряд с offset как матрица (отсчёты × поля) без копии"""
+    return rows[:, offset:offset + count * fmt.itemsize].view(fmt)
+
+
+def _interpolate(rows, t, grid, dtype):
+    """Узлы grid внутри [t[0], t[-1]] по строкам отсчётов rows"""
+    # Индексы и веса — один раз на все поля (на малых блоках np.clip
+    # и np.divide(where=) заметно дороже простых ufunc)
+    index = np.maximum(np.minimum(np.searchsorted(t, grid, side='right') - 1, len(t) - 2), 0)
+    following = np.minimum(index + 1, len(t) - 1)
+    low_t = t[index]
+    span = t[following] - low_t
+    span[span <= 0] = np.inf  # повтор метки — берётся левый отсчёт
+    weight = (grid - low_t) / span
+    out = np.empty(len(grid), dtype=dtype)
+    out_rows = out.view(np.uint8).reshape(len(grid), dtype.itemsize)
+    previous = None
+    for offset, count, fmt in _groups(dtype):
+        values = _column(rows, offset, count, fmt)
+        if fmt.kind == 'f':
+            low = values[index]
+            result = low + weight[:, None] * (values[following] - low)
+        else:
+            # Целые (счётчик) — от предыдущего отсчёта
+            if previous is None:
+                previous = np.where(weight >= 1.0, following, index)
+            result = values[previous]
+        _column(out_rows, offset, count, fmt)[:] = result
+    out['t'] = grid
+    return out
+
+
+def _join(parts, dtype):
+    if not parts:
+        return np.empty(0, dtype=dtype)
+    return parts[0] if len(parts) == 1 else np.concatenate(parts)